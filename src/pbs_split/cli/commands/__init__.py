@@ -0,0 +1,6 @@
+"""
+Command implementations.
+
+Each module is imported by :mod:`pbs_split.cli.main_typer` only when its command
+runs, so that ``--help`` and shell completion do not pay for their imports.
+"""
@@ -0,0 +1,37 @@
+"""Stage timings and profiling for the --debug and --profile options."""
+
+import cProfile
+from pathlib import Path
+from time import perf_counter_ns
+
+import typer
+
+from pbs_split.instrument import disable_instruments, enable_instruments
+
+
+def start_instruments(ctx: typer.Context):
+    """Collect stage timings, and print them when the command is done."""
+    enable_instruments()
+
+    def echo_summary():
+        instruments = disable_instruments()
+        if instruments is None:
+            return
+        elapsed_ns = perf_counter_ns() - ctx.obj["START_TIME"]
+        for line in instruments.summary_lines(total_ns=elapsed_ns):
+            typer.echo(line, err=True)
+
+    ctx.call_on_close(echo_summary)
+
+
+def start_profile(ctx: typer.Context, profile_path: Path):
+    """Profile the command, and save the stats when it is done."""
+    profiler = cProfile.Profile()
+
+    def save_profile():
+        profiler.disable()
+        profiler.dump_stats(profile_path)
+        typer.echo(f"Profile saved to {profile_path}", err=True)
+
+    ctx.call_on_close(save_profile)
+    profiler.enable()
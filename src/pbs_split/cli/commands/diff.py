@@ -0,0 +1,36 @@
+"""The diff command."""
+
+from pathlib import Path
+
+import typer
+
+from pbs_split.cli.commands.split import load_rules_option
+from pbs_split.split.diff import diff_packages, iter_line_diffs
+
+
+def run_diff(
+    ctx: typer.Context,
+    old_path: Path,
+    new_path: Path,
+    lines: bool,
+    rules_path: Path | None,
+):
+    rules = load_rules_option(rules_path)
+    try:
+        trip_diff = diff_packages(old_path, new_path, rules=rules)
+    except (ValueError, ImportError) as error:
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+    for name in trip_diff.removed:
+        typer.echo(f"- {name}")
+    for name in trip_diff.added:
+        typer.echo(f"+ {name}")
+    for name in trip_diff.changed:
+        typer.echo(f"~ {name}")
+    typer.echo(
+        f"{len(trip_diff.added)} added, {len(trip_diff.removed)} removed, "
+        f"{len(trip_diff.changed)} changed, {trip_diff.unchanged} unchanged."
+    )
+    if lines:
+        for line in iter_line_diffs(trip_diff, rules=rules):
+            typer.echo(line, nl=False)
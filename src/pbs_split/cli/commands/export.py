@@ -0,0 +1,32 @@
+"""The export command."""
+
+from pathlib import Path
+
+import typer
+
+from pbs_split.split.bundle import BUNDLE_FILE_NAME, TripBundle
+
+
+def run_export(
+    ctx: typer.Context,
+    bundle_path: Path,
+    output_dir: Path,
+    trip_ids: list[str] | None,
+    verify: bool,
+):
+    if bundle_path.is_dir():
+        bundle_path = bundle_path / BUNDLE_FILE_NAME
+    try:
+        with TripBundle(bundle_path) as bundle:
+            missing = set(trip_ids or ()) - {
+                trip.trip_id for trip in bundle.trips(trip_ids or None)
+            }
+            paths = bundle.export(output_dir, trip_ids or None, verify=verify)
+    except ValueError as error:
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"Exported {len(paths)} trips from {bundle_path} into {output_dir}")
+    for trip_id in sorted(missing):
+        typer.echo(f"Trip {trip_id} not found in {bundle_path}", err=True)
+    if missing:
+        raise typer.Exit(code=1)
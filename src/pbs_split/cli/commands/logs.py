@@ -0,0 +1,93 @@
+"""
+Logging setup for the verbosity, --log-dir, --log-json, --log-queue-policy and
+--metrics-file options.
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+import typer
+
+from pbs_split.snippets.logging.json_lines import JsonLinesFormatter
+from pbs_split.snippets.logging.logging import (
+    QueuePolicy,
+    queue_handler,
+    rotating_file_handler,
+)
+from pbs_split.split.splitter import metrics_logger
+
+STDERR_FORMAT = "%(levelname)s:%(name)s: %(message)s"
+
+
+def log_level(verbosity: int, debug: bool) -> int:
+    """Map the cli verbosity to a log level."""
+    if debug or verbosity >= 3:
+        return logging.DEBUG
+    if verbosity == 2:
+        return logging.INFO
+    return logging.WARNING
+
+
+def _queue_to(
+    ctx: typer.Context,
+    target_logger: logging.Logger,
+    level: int,
+    handlers: list[logging.Handler],
+    policy: QueuePolicy = "drop",
+):
+    """
+    Log from `target_logger` to `handlers`, from a background thread.
+
+    With the "drop" policy, records are dropped and counted when the queue is
+    full, with "block" the logging thread waits for room. The listener is
+    stopped, flushing any queued records, when the command is done.
+    """
+    handler, listener = queue_handler(handlers, policy=policy)
+    previous_level = target_logger.level
+    target_logger.addHandler(handler)
+    target_logger.setLevel(level)
+
+    def stop_logging():
+        listener.stop()
+        target_logger.removeHandler(handler)
+        target_logger.setLevel(previous_level)
+        for target in handlers:
+            target.close()
+        if handler.dropped:
+            typer.echo(f"{handler.dropped} log records dropped.", err=True)
+
+    ctx.call_on_close(stop_logging)
+
+
+def start_logging(
+    ctx: typer.Context,
+    level: int,
+    log_dir: Path | None = None,
+    json_lines: bool = False,
+    policy: QueuePolicy = "drop",
+):
+    """Log to stderr, and optionally a rotating file, from a background thread."""
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setLevel(level)
+    handlers: list[logging.Handler] = [stream_handler]
+    if log_dir is not None:
+        handlers.append(
+            rotating_file_handler(
+                log_dir=log_dir, file_name="pbs_split", log_level=level
+            )
+        )
+    if json_lines:
+        for target in handlers:
+            target.setFormatter(JsonLinesFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(STDERR_FORMAT))
+    _queue_to(ctx, logging.getLogger("pbs_split"), level, handlers, policy)
+
+
+def start_metrics(ctx: typer.Context, metrics_path: Path, policy: QueuePolicy = "drop"):
+    """Append a JSON-lines metrics record for each split file to `metrics_path`."""
+    metrics_path.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.FileHandler(metrics_path, encoding="utf-8")
+    file_handler.setFormatter(JsonLinesFormatter())
+    _queue_to(ctx, metrics_logger, logging.INFO, [file_handler], policy)
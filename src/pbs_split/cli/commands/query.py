@@ -0,0 +1,37 @@
+"""The query command."""
+
+from pathlib import Path
+
+import typer
+
+from pbs_split.split.search import find_segments, search
+
+
+def _duration(minutes: int) -> str:
+    return f"{minutes // 60}.{minutes % 60:02d}"
+
+
+def run_query(ctx: typer.Context, query_text: str, paths: list[Path], count_only: bool):
+    segment_paths = find_segments(paths)
+    if not segment_paths:
+        typer.echo("No search index found, split with --search first.", err=True)
+        raise typer.Exit(code=1)
+    matched = 0
+    try:
+        for segment, number in search(segment_paths, query_text):
+            matched += 1
+            if count_only:
+                continue
+            columns = segment.columns
+            typer.echo(
+                f"{segment.package}  {segment.trips[number]:<8}"
+                f"  credit {_duration(columns['credit'][number]):>6}"
+                f"  tafb {_duration(columns['tafb'][number]):>6}"
+                f"  days {columns['days'][number]}"
+                f"  report {columns['report'][number] // 60:02d}"
+                f"{columns['report'][number] % 60:02d}"
+            )
+    except ValueError as error:
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"{matched} trips.")
@@ -0,0 +1,25 @@
+"""The show command."""
+
+from pathlib import Path
+
+import typer
+
+from pbs_split.cli.commands.split import load_rules_option
+from pbs_split.split.index import load_or_build_index, read_trip
+
+
+def run_show(
+    ctx: typer.Context, input_path: Path, trip_id: str, rules_path: Path | None
+):
+    rules = load_rules_option(rules_path)
+    try:
+        split_index = load_or_build_index(input_path, rules=rules)
+    except ValueError as error:
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+    try:
+        text = read_trip(input_path, split_index, trip_id, rules=rules)
+    except KeyError:
+        typer.echo(f"Trip {trip_id} not found in {input_path}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(text, nl=False)
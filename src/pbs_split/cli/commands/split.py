@@ -0,0 +1,279 @@
+"""The split and split-many commands."""
+
+import hashlib
+from pathlib import Path
+from time import perf_counter_ns
+
+import typer
+
+from pbs_split.snippets.hash.file_hash import make_hashed_file
+from pbs_split.split.batch import DEFAULT_PATTERN, collect_inputs, split_many
+from pbs_split.split.cache import (
+    CACHE_FILE_NAME,
+    CacheStats,
+    SplitCache,
+    cached_split_file,
+)
+from pbs_split.split.checkpoint import check_resumable, split_file_checkpointed
+from pbs_split.split.chunked import split_file_chunked
+from pbs_split.split.formats import (
+    FsyncPolicy,
+    OutputFormat,
+    WriterOptions,
+    make_writer,
+)
+from pbs_split.split.index import check_indexable, split_file_with_index
+from pbs_split.split.rules import BoundaryRules, load_rules
+from pbs_split.split.search import (
+    SearchIndexingWriter,
+    SegmentBuilder,
+    finish_search_index,
+    update_search_index,
+)
+from pbs_split.split.splitter import SplitResult, SplitWriter, split_file, throughput
+
+
+def echo_cache_stats(cache_stats: CacheStats):
+    typer.echo(
+        f"Cache: {cache_stats.hits} hits, {cache_stats.misses} misses, "
+        f"{cache_stats.bytes_skipped} bytes skipped"
+    )
+
+
+def load_rules_option(rules_path: Path | None) -> BoundaryRules | None:
+    if rules_path is None:
+        return None
+    try:
+        return load_rules(rules_path)
+    except ValueError as error:
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+
+
+def _split(
+    input_path: Path,
+    output_dir: Path,
+    no_cache: bool,
+    rebuild: bool,
+    output_format: OutputFormat,
+    index: bool,
+    rules: BoundaryRules | None = None,
+    checkpoint: bool = False,
+    resume: bool = False,
+    jobs: int = 1,
+    writer_options: WriterOptions | None = None,
+    search: bool = False,
+) -> tuple[SplitResult, SplitCache | None, bool | None]:
+    """
+    Split a file the way the options ask.
+
+    Returns:
+        The result, the cache if one was used, and whether the search segment
+        was rebuilt, None if none was asked for.
+    """
+    cache = None
+    search_rebuilt = None
+    if checkpoint:
+        result = split_file_checkpointed(
+            input_path, output_dir, output_format, rules=rules, resume=resume
+        )
+    elif no_cache:
+        builder = SegmentBuilder(rules) if search and (index or jobs <= 1) else None
+
+        def make_split_writer() -> SplitWriter:
+            writer = make_writer(output_format, output_dir, writer_options)
+            return writer if builder is None else SearchIndexingWriter(writer, builder)
+
+        hashed_file = None
+        if index:
+            hashed_file = make_hashed_file(input_path, hashlib.sha256())
+            result, _ = split_file_with_index(
+                input_path,
+                output_dir,
+                writer=make_split_writer(),
+                hashed_file=hashed_file,
+                rules=rules,
+            )
+        elif jobs > 1:
+            result = split_file_chunked(
+                input_path,
+                output_dir,
+                output_format,
+                jobs=jobs,
+                rules=rules,
+                options=writer_options,
+            )
+        else:
+            result = split_file(
+                input_path, output_dir, writer=make_split_writer(), rules=rules
+            )
+        if builder is not None:
+            finish_search_index(input_path, output_dir, builder, hashed_file)
+            search_rebuilt = True
+    else:
+        cache = SplitCache(output_dir / CACHE_FILE_NAME, rebuild=rebuild)
+        cached = cached_split_file(
+            input_path,
+            output_dir,
+            cache=cache,
+            output_format=output_format,
+            index=index,
+            rules=rules,
+            jobs=jobs,
+            writer_options=writer_options,
+            search=search,
+        )
+        cache.stats.update(cached.cache_stats)
+        if cached.new_entry is not None:
+            cache.add(cached.new_entry)
+            cache.save()
+        result = cached.result
+        search_rebuilt = cached.search_rebuilt
+    if search and search_rebuilt is None:
+        # Checkpointed and chunked splits are not indexed as they go.
+        _, search_rebuilt = update_search_index(input_path, output_dir, rules=rules)
+    return result, cache, search_rebuilt
+
+
+def run_split(
+    ctx: typer.Context,
+    input_path: Path,
+    output_dir: Path,
+    no_cache: bool,
+    rebuild: bool,
+    output_format: OutputFormat,
+    index: bool,
+    search: bool = False,
+    rules_path: Path | None = None,
+    checkpoint: bool = False,
+    resume: bool = False,
+    jobs: int = 1,
+    fsync: FsyncPolicy | None = None,
+    write_thread: bool = False,
+    manifest: bool = False,
+):
+    if jobs > 1 and (index or checkpoint):
+        # Indexed and checkpointed splits read the file in one pass.
+        raise typer.BadParameter(
+            "can not be combined with --index or --checkpoint.", param_hint="--jobs"
+        )
+    rules = load_rules_option(rules_path)
+    writer_options = None
+    if fsync is not None or write_thread or manifest:
+        writer_options = WriterOptions(
+            fsync=fsync or FsyncPolicy.NONE, background=write_thread, manifest=manifest
+        )
+    try:
+        if checkpoint and writer_options is not None:
+            raise ValueError(
+                "A checkpointed split can not use --fsync, --write-thread or "
+                "--manifest."
+            )
+        if index:
+            if checkpoint:
+                raise ValueError("A checkpointed split can not save an index.")
+            check_indexable(input_path)
+        if checkpoint:
+            check_resumable(input_path, output_format)
+    except ValueError as error:
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+    try:
+        result, cache, search_rebuilt = _split(
+            input_path,
+            output_dir,
+            no_cache,
+            rebuild,
+            output_format,
+            index,
+            rules,
+            checkpoint,
+            resume,
+            jobs,
+            writer_options,
+            search,
+        )
+    except (ImportError, ValueError) as error:
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+    elapsed_ns = perf_counter_ns() - ctx.obj["START_TIME"]
+    mb_per_second, pages_per_second = throughput(result.stats, elapsed_ns)
+    typer.echo(
+        f"Split {result.stats.units} trips from {result.stats.pages} pages "
+        f"of {input_path} into {output_dir}"
+    )
+    typer.echo(
+        f"Read {result.stats.bytes_read} bytes in {elapsed_ns / 1e9:.3f}s "
+        f"({mb_per_second:.2f} MB/s, {pages_per_second:.1f} pages/s)"
+    )
+    if cache is not None:
+        echo_cache_stats(cache.stats)
+    if search:
+        typer.echo(f"Search index {'rebuilt' if search_rebuilt else 'up to date'}")
+
+
+def run_split_many(
+    ctx: typer.Context,
+    source: str,
+    output_dir: Path,
+    jobs: int | None,
+    pattern: str | None,
+    no_cache: bool,
+    rebuild: bool,
+    output_format: OutputFormat,
+    search: bool = False,
+    rules_path: Path | None = None,
+):
+    rules = load_rules_option(rules_path)
+    input_paths = collect_inputs(source, pattern=pattern or DEFAULT_PATTERN)
+    if not input_paths:
+        typer.echo(f"No input files found for {source}", err=True)
+        raise typer.Exit(code=1)
+    cache = None
+    if not no_cache:
+        cache = SplitCache(output_dir / CACHE_FILE_NAME, rebuild=rebuild)
+    try:
+        items = split_many(
+            input_paths,
+            output_root=output_dir,
+            jobs=jobs,
+            cache=cache,
+            output_format=output_format,
+            rules=rules,
+            search=search,
+        )
+    except ValueError as error:
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+    failed = 0
+    total_bytes = 0
+    total_pages = 0
+    for item in items:
+        if item.result is None:
+            failed += 1
+            typer.echo(f"FAILED {item.input_path}: {item.error}", err=True)
+            continue
+        stats = item.result.stats
+        total_bytes += stats.bytes_read
+        total_pages += stats.pages
+        if ctx.obj["VERBOSITY"] > 1:
+            typer.echo(
+                f"Split {stats.units} trips from {stats.pages} pages "
+                f"of {item.input_path} into {item.output_dir}"
+            )
+    elapsed_ns = perf_counter_ns() - ctx.obj["START_TIME"]
+    typer.echo(
+        f"Split {len(items) - failed} of {len(items)} files, "
+        f"{total_bytes} bytes in {elapsed_ns / 1e9:.3f}s"
+    )
+    if cache is not None:
+        echo_cache_stats(cache.stats)
+    if search:
+        # Only the segments of packages whose content changed are rebuilt.
+        rebuilt = sum(bool(item.search_rebuilt) for item in items)
+        typer.echo(
+            f"Search index: {rebuilt} rebuilt, "
+            f"{len(items) - failed - rebuilt} up to date"
+        )
+    if failed:
+        raise typer.Exit(code=1)
@@ -0,0 +1,43 @@
+"""The stats command."""
+
+from pathlib import Path
+from time import perf_counter_ns
+
+import typer
+
+from pbs_split.cli.commands.split import load_rules_option
+from pbs_split.stats import concat_arrays, format_minutes, load_arrays, summarize
+
+
+def run_stats(
+    ctx: typer.Context,
+    paths: list[Path],
+    top_layovers: int,
+    rules_path: Path | None,
+):
+    rules = load_rules_option(rules_path)
+    try:
+        arrays = concat_arrays(load_arrays(path, rules) for path in paths)
+    except ValueError as error:
+        typer.echo(str(error), err=True)
+        raise typer.Exit(code=1)
+    for summary in summarize(arrays, top_layovers=top_layovers):
+        typer.echo(
+            f"{summary.base} {summary.equipment}: {summary.trips} trips, "
+            f"credit {format_minutes(summary.credit_total)} total, "
+            f"{format_minutes(summary.credit_mean)} mean "
+            f"({format_minutes(summary.credit_min)}-"
+            f"{format_minutes(summary.credit_max)}), "
+            f"block {format_minutes(summary.block_mean)} mean, "
+            f"TAFB {format_minutes(summary.tafb_mean)} mean, "
+            f"credit/TAFB {summary.credit_per_tafb:.3f}"
+        )
+        days = " ".join(f"{day}={count}" for day, count in summary.days.items())
+        typer.echo(f"  days: {days}")
+        layovers = ", ".join(
+            f"{station} {count}" for station, count in summary.layovers
+        )
+        typer.echo(f"  layovers: {layovers}")
+    if ctx.obj["VERBOSITY"] > 1:
+        elapsed_ns = perf_counter_ns() - ctx.obj["START_TIME"]
+        typer.echo(f"Summarized {len(arrays)} trips in {elapsed_ns / 1e9:.3f}s")
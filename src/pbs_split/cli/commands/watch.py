@@ -0,0 +1,63 @@
+"""The watch command."""
+
+from pathlib import Path
+
+import typer
+
+from pbs_split.cli.commands.split import echo_cache_stats, load_rules_option
+from pbs_split.split.batch import DEFAULT_PATTERN, BatchItem
+from pbs_split.split.cache import CACHE_FILE_NAME, SplitCache
+from pbs_split.split.formats import OutputFormat
+from pbs_split.split.watch import WatchService
+
+
+def echo_item(item: BatchItem):
+    if item.result is None:
+        typer.echo(f"FAILED {item.input_path}: {item.error}", err=True)
+        return
+    stats = item.result.stats
+    cached = " (cached)" if item.result.cached else ""
+    typer.echo(
+        f"Split {stats.units} trips from {stats.pages} pages "
+        f"of {item.input_path} into {item.output_dir}{cached}"
+    )
+
+
+def run_watch(
+    ctx: typer.Context,
+    directory: Path,
+    output_dir: Path,
+    jobs: int | None,
+    pattern: str | None,
+    quiet: float,
+    poll: bool,
+    no_cache: bool,
+    output_format: OutputFormat,
+    rules_path: Path | None,
+):
+    rules = load_rules_option(rules_path)
+    cache = None
+    if not no_cache:
+        cache = SplitCache(output_dir / CACHE_FILE_NAME)
+    service = WatchService(
+        directory,
+        output_dir,
+        pattern=pattern or DEFAULT_PATTERN,
+        jobs=jobs,
+        quiet_s=quiet,
+        polling=poll,
+        cache=cache,
+        output_format=output_format,
+        rules=rules,
+        on_item=echo_item,
+    )
+    typer.echo(f"Watching {directory}, press Ctrl-C to stop.")
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        typer.echo("Stopping.")
+    typer.echo(
+        f"Split {service.processed} files, skipped {service.skipped} duplicates."
+    )
+    if cache is not None:
+        echo_cache_stats(cache.stats)
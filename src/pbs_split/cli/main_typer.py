@@ -1,15 +1,60 @@
-"""Command-line interface."""
+"""
+Command-line interface.
 
+Only the command signatures live here. Each command imports its implementation
+from :mod:`pbs_split.cli.commands` when it runs, so that ``--help`` and shell
+completion stay fast no matter what the commands depend on.
+"""
+
+# pylint: disable=import-outside-toplevel
+
+from pathlib import Path
 from time import perf_counter_ns
-from typing import Annotated
+from typing import Annotated, Literal
 
 import typer
 
+from pbs_split.split.formats import FsyncPolicy, OutputFormat
+
 
 def default_options(
     ctx: typer.Context,
-    debug: Annotated[bool, typer.Option(help="Enable debug output.")] = False,
+    debug: Annotated[
+        bool,
+        typer.Option(help="Enable debug output, and print stage timings at exit."),
+    ] = False,
     verbosity: Annotated[int, typer.Option("-v", help="Verbosity.", count=True)] = 1,
+    profile: Annotated[
+        Path | None,
+        typer.Option(
+            help="Run the command under cProfile, and save the stats to this file.",
+            dir_okay=False,
+        ),
+    ] = None,
+    log_dir: Annotated[
+        Path | None,
+        typer.Option(
+            help="Also write the log to a rotating file in this directory.",
+            file_okay=False,
+        ),
+    ] = None,
+    log_json: Annotated[
+        bool, typer.Option("--log-json", help="Write the log as JSON lines.")
+    ] = False,
+    log_queue_policy: Annotated[
+        Literal["drop", "block"],
+        typer.Option(
+            help="When the log queue is full, drop and count records, or block "
+            "until there is room."
+        ),
+    ] = "drop",
+    metrics_file: Annotated[
+        Path | None,
+        typer.Option(
+            help="Append a JSON-lines metrics record for each split file to this file.",
+            dir_okay=False,
+        ),
+    ] = None,
 ):
     """"""
 
@@ -18,10 +63,79 @@ def default_options(
     ctx.obj["DEBUG"] = debug
     typer.echo(f"Verbosity: {verbosity}")
     ctx.obj["VERBOSITY"] = verbosity
+    if debug or verbosity > 1 or log_dir is not None:
+        from pbs_split.cli.commands.logs import log_level, start_logging
+
+        start_logging(
+            ctx, log_level(verbosity, debug), log_dir, log_json, log_queue_policy
+        )
+    if metrics_file is not None:
+        from pbs_split.cli.commands.logs import start_metrics
+
+        start_metrics(ctx, metrics_file, log_queue_policy)
+    if debug:
+        from pbs_split.cli.commands.debug import start_instruments
+
+        start_instruments(ctx)
+    if profile is not None:
+        from pbs_split.cli.commands.debug import start_profile
+
+        start_profile(ctx, profile)
 
 
 app = typer.Typer(callback=default_options)
 
+NoCacheOption = Annotated[
+    bool, typer.Option("--no-cache", help="Do not use or update the split cache.")
+]
+RebuildOption = Annotated[
+    bool, typer.Option("--rebuild", help="Ignore cached results and split again.")
+]
+SearchOption = Annotated[
+    bool,
+    typer.Option("--search", help="Update the search index used by the query command."),
+]
+RulesOption = Annotated[
+    Path | None,
+    typer.Option(
+        "--rules",
+        help="A TOML file of boundary patterns, for other package layouts.",
+        exists=True,
+        dir_okay=False,
+    ),
+]
+FormatOption = Annotated[
+    OutputFormat,
+    typer.Option(
+        "--format",
+        help="The output format. text.* formats compress each trip file, "
+        "tar.* formats write one compressed archive, sqlite writes one database.",
+    ),
+]
+
+FsyncOption = Annotated[
+    FsyncPolicy | None,
+    typer.Option(
+        "--fsync",
+        help="Write text trip files atomically, syncing them to disk never, "
+        "once per batch, or per file.",
+    ),
+]
+WriteThreadOption = Annotated[
+    bool,
+    typer.Option(
+        "--write-thread",
+        help="Write text trip files atomically, on a background thread.",
+    ),
+]
+ManifestOption = Annotated[
+    bool,
+    typer.Option(
+        "--manifest",
+        help="Write text trip files atomically, with a trips.sha256 manifest.",
+    ),
+]
+
 
 @app.command()
 def hello(
@@ -31,5 +145,317 @@ def hello(
     typer.echo(f"Hello  {name}!")
 
 
+@app.command()
+def split(
+    ctx: typer.Context,
+    input_path: Annotated[
+        Path,
+        typer.Argument(
+            help="The bid-package text file, optionally compressed, or PDF.",
+            exists=True,
+            file_okay=True,
+            dir_okay=False,
+            readable=True,
+        ),
+    ],
+    output_dir: Annotated[
+        Path,
+        typer.Argument(
+            help="The directory for the split trips.", file_okay=False, dir_okay=True
+        ),
+    ],
+    no_cache: NoCacheOption = False,
+    rebuild: RebuildOption = False,
+    output_format: FormatOption = OutputFormat.TEXT,
+    index: Annotated[
+        bool, typer.Option("--index", help="Save a page and trip offset index.")
+    ] = False,
+    search: SearchOption = False,
+    rules: RulesOption = None,
+    checkpoint: Annotated[
+        bool,
+        typer.Option(
+            "--checkpoint",
+            help="Save checkpoints as the split goes, so it can be resumed. "
+            "Bypasses the cache.",
+        ),
+    ] = False,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume",
+            help="Carry on from the last checkpoint in OUTPUT_DIR, if any. "
+            "Implies --checkpoint.",
+        ),
+    ] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            help="Split an uncompressed text file in this many parallel chunks. "
+            "Can not be combined with --index or --checkpoint.",
+        ),
+    ] = 1,
+    fsync: FsyncOption = None,
+    write_thread: WriteThreadOption = False,
+    manifest: ManifestOption = False,
+):
+    """Split a bid-package text file, optionally compressed, or PDF, into one file per trip."""
+    from pbs_split.cli.commands.split import run_split
+
+    run_split(
+        ctx,
+        input_path,
+        output_dir,
+        no_cache,
+        rebuild,
+        output_format,
+        index,
+        search,
+        rules,
+        checkpoint or resume,
+        resume,
+        jobs,
+        fsync,
+        write_thread,
+        manifest,
+    )
+
+
+@app.command("split-many")
+def split_many_files(
+    ctx: typer.Context,
+    source: Annotated[
+        str,
+        typer.Argument(help="A directory, or a glob pattern matching the input files."),
+    ],
+    output_dir: Annotated[
+        Path,
+        typer.Argument(
+            help="Each file is split into a sub directory of this directory.",
+            file_okay=False,
+            dir_okay=True,
+        ),
+    ],
+    jobs: Annotated[
+        int | None,
+        typer.Option("--jobs", "-j", help="Worker processes. Defaults to cpu count."),
+    ] = None,
+    pattern: Annotated[
+        str | None,
+        typer.Option(
+            help="File pattern used when SOURCE is a directory. Defaults to *.txt."
+        ),
+    ] = None,
+    no_cache: NoCacheOption = False,
+    rebuild: RebuildOption = False,
+    output_format: FormatOption = OutputFormat.TEXT,
+    search: SearchOption = False,
+    rules: RulesOption = None,
+):
+    """Split many bid-package text files in parallel."""
+    from pbs_split.cli.commands.split import run_split_many
+
+    run_split_many(
+        ctx,
+        source,
+        output_dir,
+        jobs,
+        pattern,
+        no_cache,
+        rebuild,
+        output_format,
+        search,
+        rules,
+    )
+
+
+@app.command()
+def watch(
+    ctx: typer.Context,
+    directory: Annotated[
+        Path,
+        typer.Argument(
+            help="The directory to watch for bid-package text files.",
+            exists=True,
+            file_okay=False,
+            dir_okay=True,
+        ),
+    ],
+    output_dir: Annotated[
+        Path,
+        typer.Argument(
+            help="Each file is split into a sub directory of this directory.",
+            file_okay=False,
+            dir_okay=True,
+        ),
+    ],
+    jobs: Annotated[
+        int | None,
+        typer.Option("--jobs", "-j", help="Worker processes. Defaults to cpu count."),
+    ] = None,
+    pattern: Annotated[
+        str | None,
+        typer.Option(help="File pattern to watch for. Defaults to *.txt."),
+    ] = None,
+    quiet: Annotated[
+        float,
+        typer.Option(help="Seconds a file must be unchanged before it is split."),
+    ] = 2.0,
+    poll: Annotated[
+        bool, typer.Option("--poll", help="Poll the directory instead of inotify.")
+    ] = False,
+    no_cache: NoCacheOption = False,
+    output_format: FormatOption = OutputFormat.TEXT,
+    rules: RulesOption = None,
+):
+    """Split new and changed bid packages as they land in a directory."""
+    from pbs_split.cli.commands.watch import run_watch
+
+    run_watch(
+        ctx,
+        directory,
+        output_dir,
+        jobs,
+        pattern,
+        quiet,
+        poll,
+        no_cache,
+        output_format,
+        rules,
+    )
+
+
+@app.command()
+def show(
+    ctx: typer.Context,
+    input_path: Annotated[
+        Path,
+        typer.Argument(
+            help="The bid-package text file.",
+            exists=True,
+            file_okay=True,
+            dir_okay=False,
+            readable=True,
+        ),
+    ],
+    trip_id: Annotated[str, typer.Argument(help="The trip id, e.g. 1234.")],
+    rules: RulesOption = None,
+):
+    """Show one trip, using the offset index saved by split --index."""
+    from pbs_split.cli.commands.show import run_show
+
+    run_show(ctx, input_path, trip_id, rules)
+
+
+@app.command()
+def export(
+    ctx: typer.Context,
+    bundle_path: Annotated[
+        Path,
+        typer.Argument(
+            help="A trip bundle, or a split directory holding one.", exists=True
+        ),
+    ],
+    output_dir: Annotated[
+        Path,
+        typer.Argument(
+            help="The directory for the trip files.", file_okay=False, dir_okay=True
+        ),
+    ],
+    trip_ids: Annotated[
+        list[str] | None,
+        typer.Argument(help="The trips to export. Defaults to every trip."),
+    ] = None,
+    verify: Annotated[
+        bool, typer.Option(help="Check each trip against its content hash.")
+    ] = True,
+):
+    """Write trips from a bundle made by split --format sqlite to files."""
+    from pbs_split.cli.commands.export import run_export
+
+    run_export(ctx, bundle_path, output_dir, trip_ids, verify)
+
+
+@app.command()
+def diff(
+    ctx: typer.Context,
+    old_path: Annotated[
+        Path,
+        typer.Argument(
+            help="The earlier bid package, trip bundle, or split directory.",
+            exists=True,
+        ),
+    ],
+    new_path: Annotated[
+        Path,
+        typer.Argument(
+            help="The later bid package, trip bundle, or split directory.", exists=True
+        ),
+    ],
+    lines: Annotated[
+        bool, typer.Option("--lines", help="Show a line diff of each changed trip.")
+    ] = False,
+    rules: RulesOption = None,
+):
+    """List the trips added, removed and changed between two bid packages."""
+    from pbs_split.cli.commands.diff import run_diff
+
+    run_diff(ctx, old_path, new_path, lines, rules)
+
+
+@app.command()
+def query(
+    ctx: typer.Context,
+    query_text: Annotated[
+        str,
+        typer.Argument(
+            metavar="QUERY",
+            help='Conditions, e.g. "layover=NRT days=4 credit>20 or base=LAX".',
+        ),
+    ],
+    paths: Annotated[
+        list[Path],
+        typer.Argument(
+            help="Split directories, or directories of them, indexed with --search.",
+            exists=True,
+        ),
+    ],
+    count_only: Annotated[
+        bool, typer.Option("--count", help="Only show the number of matching trips.")
+    ] = False,
+):
+    """Find trips from the search index, without reading trip text."""
+    from pbs_split.cli.commands.query import run_query
+
+    run_query(ctx, query_text, paths, count_only)
+
+
+@app.command()
+def stats(
+    ctx: typer.Context,
+    paths: Annotated[
+        list[Path],
+        typer.Argument(
+            help="Bid-package text files, columnar trip files, or split directories"
+            " holding a columnar trip file.",
+            exists=True,
+        ),
+    ],
+    top_layovers: Annotated[
+        int, typer.Option(help="Number of most common layover stations to show.")
+    ] = 5,
+    rules: RulesOption = None,
+):
+    """Summarize credit, block, TAFB, days and layovers per base and equipment."""
+    try:
+        from pbs_split.cli.commands.stats import run_stats
+    except ImportError:
+        typer.echo("stats requires numpy, pip install pbs-split[stats]", err=True)
+        raise typer.Exit(code=1)
+    run_stats(ctx, paths, top_layovers, rules)
+
+
 if __name__ == "__main__":
     app()
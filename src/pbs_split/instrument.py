@@ -0,0 +1,169 @@
+"""
+Lightweight timing and counting instrumentation.
+
+Instrumentation is off by default, and costs next to nothing while off. When it
+is enabled, code reports time spent per stage, e.g. read, boundary, parse,
+write and hash, along with counters like pages, trips and bytes::
+
+    instruments = enable_instruments()
+    with timer("hash"):
+        ...
+    count("bytes", 1024)
+    print("\\n".join(instruments.summary_lines()))
+
+Stages may nest, e.g. parse time is also part of write time for writers that
+parse trips. Instruments live in the current process, worker processes collect
+their own and return them to be merged.
+"""
+
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter_ns
+from types import TracebackType
+from typing import Callable, Iterable, Iterator, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+T = TypeVar("T")
+
+_NULL_TIMER = nullcontext()
+
+
+class _Timer:
+    __slots__ = ("instruments", "stage", "start")
+
+    def __init__(self, instruments: "Instruments", stage: str) -> None:
+        self.instruments = instruments
+        self.stage = stage
+        self.start = 0
+
+    def __enter__(self) -> "_Timer":
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.instruments.add_time(self.stage, perf_counter_ns() - self.start)
+
+
+@dataclass
+class Instruments:
+    times_ns: dict[str, int] = field(default_factory=dict)
+    calls: dict[str, int] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+
+    def add_time(self, stage: str, elapsed_ns: int, calls: int = 1):
+        self.times_ns[stage] = self.times_ns.get(stage, 0) + elapsed_ns
+        self.calls[stage] = self.calls.get(stage, 0) + calls
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def timer(self, stage: str) -> _Timer:
+        return _Timer(self, stage)
+
+    def timed_call(self, stage: str, func: Callable[P, R]) -> Callable[P, R]:
+        """Wrap `func` so that each call is timed as `stage`."""
+
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(stage, perf_counter_ns() - start)
+
+        return wrapper
+
+    def timed_iter(self, stage: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Time each step of an iterator as `stage`."""
+        iterator = iter(iterable)
+        elapsed_ns = 0
+        steps = 0
+        try:
+            while True:
+                start = perf_counter_ns()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed_ns += perf_counter_ns() - start
+                    return
+                elapsed_ns += perf_counter_ns() - start
+                steps += 1
+                yield item
+        finally:
+            self.add_time(stage, elapsed_ns, calls=steps)
+
+    def merge(self, other: "Instruments"):
+        for stage, elapsed_ns in other.times_ns.items():
+            self.add_time(stage, elapsed_ns, calls=other.calls.get(stage, 0))
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def summary_lines(self, total_ns: int | None = None) -> list[str]:
+        """
+        Format the timers and counters as a table.
+
+        Args:
+            total_ns: The wall clock time, used to show each stage's share.
+        """
+        lines = [f"{'Stage':<12} {'Calls':>10} {'Seconds':>10} {'Share':>7}"]
+        for stage, elapsed_ns in sorted(
+            self.times_ns.items(), key=lambda item: item[1], reverse=True
+        ):
+            share = f"{elapsed_ns / total_ns:.1%}" if total_ns else ""
+            lines.append(
+                f"{stage:<12} {self.calls.get(stage, 0):>10} "
+                f"{elapsed_ns / 1e9:>10.4f} {share:>7}"
+            )
+        if total_ns:
+            lines.append(f"{'total':<12} {'':>10} {total_ns / 1e9:>10.4f}")
+        if self.counters:
+            lines.append(f"{'Counter':<12} {'Value':>10}")
+            for name, value in self.counters.items():
+                lines.append(f"{name:<12} {value:>10}")
+        return lines
+
+
+_current: Instruments | None = None
+
+
+def enable_instruments(instruments: Instruments | None = None) -> Instruments:
+    """
+    Start collecting instrumentation in this process.
+
+    Args:
+        instruments: Collect into these instruments, rather than new ones.
+    """
+    global _current  # pylint: disable=global-statement
+    _current = Instruments() if instruments is None else instruments
+    return _current
+
+
+def disable_instruments() -> Instruments | None:
+    """Stop collecting instrumentation, returning what was collected."""
+    global _current  # pylint: disable=global-statement
+    instruments, _current = _current, None
+    return instruments
+
+
+def current_instruments() -> Instruments | None:
+    return _current
+
+
+def timer(stage: str) -> AbstractContextManager:
+    """Time a block as `stage`, a no-op while instrumentation is off."""
+    if _current is None:
+        return _NULL_TIMER
+    return _current.timer(stage)
+
+
+def count(name: str, value: int = 1):
+    """Add to a counter, a no-op while instrumentation is off."""
+    if _current is not None:
+        _current.count(name, value)
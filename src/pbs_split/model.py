@@ -0,0 +1,101 @@
+"""
+Compact in-memory model of a parsed bid package.
+
+A month of trips for a large base is tens of thousands of objects, so the model
+classes use ``__slots__``, store times as integer minutes, and intern the
+strings that repeat across trips, like station codes and equipment.
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import Iterator
+
+
+def intern(value: str) -> str:
+    """Intern a string that is repeated across many trips."""
+    return sys.intern(value)
+
+
+@dataclass(slots=True)
+class FlightLeg:
+    day: int
+    flight: str
+    equipment: str
+    departure_station: str
+    departure_time: int
+    arrival_station: str
+    arrival_time: int
+    block: int
+
+
+@dataclass(slots=True)
+class DutyPeriod:
+    report: int
+    release: int = 0
+    block: int = 0
+    credit: int = 0
+    duty: int = 0
+    legs: list[FlightLeg] = field(default_factory=list)
+    layover_station: str = ""
+    layover_rest: int = 0
+
+
+@dataclass(slots=True)
+class Trip:
+    """
+    A trip, also known as a pairing or sequence.
+
+    All times are in minutes. Report and release times are minutes after
+    midnight, local time.
+    """
+
+    trip_id: str
+    ops: int
+    base: str
+    equipment: str
+    page: int
+    block: int = 0
+    credit: int = 0
+    tafb: int = 0
+    duty_periods: list[DutyPeriod] = field(default_factory=list)
+
+    @property
+    def days(self) -> int:
+        return max(
+            (leg.day for duty in self.duty_periods for leg in duty.legs), default=0
+        )
+
+    @property
+    def report(self) -> int:
+        return self.duty_periods[0].report if self.duty_periods else 0
+
+    def layover_stations(self) -> list[str]:
+        return [
+            duty.layover_station for duty in self.duty_periods if duty.layover_station
+        ]
+
+    def stations(self) -> set[str]:
+        stations = set()
+        for duty in self.duty_periods:
+            for leg in duty.legs:
+                stations.add(leg.departure_station)
+                stations.add(leg.arrival_station)
+        return stations
+
+
+@dataclass(slots=True)
+class Page:
+    number: int
+    base: str
+    equipment: str
+    trips: list[Trip] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class BidPackage:
+    source: str
+    pages: list[Page] = field(default_factory=list)
+
+    def trips(self) -> Iterator[Trip]:
+        for page in self.pages:
+            yield from page.trips
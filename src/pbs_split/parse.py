@@ -0,0 +1,152 @@
+"""
+Parse split trips into the in-memory model.
+
+Times in the bid package are either clock times, ``HHMM``, or durations in
+hours and minutes, ``H.MM``. Both are stored as integer minutes.
+"""
+
+import logging
+import re
+from pathlib import Path
+
+from pbs_split.model import BidPackage, DutyPeriod, FlightLeg, Page, Trip, intern
+from pbs_split.split.rules import BoundaryRules
+from pbs_split.split.splitter import (
+    DEFAULT_ENCODING,
+    SplitUnit,
+    iter_split_units,
+    open_raw_lines,
+)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+TRIP_RE = re.compile(r"^\s*SEQ\s+(?P<trip_id>\d+)\s+(?P<ops>\d+)\s+OPS\b")
+REPORT_RE = re.compile(r"^\s*RPT\s+(?P<report>\d{4})\b")
+LEG_RE = re.compile(
+    r"^\s*(?P<day>\d+)\s+(?P<flight>\d+)\s+(?P<equipment>\S+)\s+"
+    r"(?P<departure_station>[A-Z]{3})\s+(?P<departure_time>\d{4})\s+"
+    r"(?P<arrival_station>[A-Z]{3})\s+(?P<arrival_time>\d{4})\s+"
+    r"(?P<block>\d+\.\d{2})\b"
+)
+RELEASE_RE = re.compile(
+    r"^\s*RLS\s+(?P<release>\d{4})\s+BLK\s+(?P<block>\d+\.\d{2})\s+"
+    r"CRD\s+(?P<credit>\d+\.\d{2})\s+DUTY\s+(?P<duty>\d+\.\d{2})\b"
+)
+LAYOVER_RE = re.compile(r"^\s*LAYOVER\s+(?P<station>[A-Z]{3})\s+(?P<rest>\d+\.\d{2})\b")
+TOTAL_RE = re.compile(
+    r"^\s*TTL\s+BLK\s+(?P<block>\d+\.\d{2})\s+CRD\s+(?P<credit>\d+\.\d{2})\s+"
+    r"TAFB\s+(?P<tafb>\d+\.\d{2})\b"
+)
+
+
+class ParseError(ValueError):
+    """Raised when a trip can not be parsed."""
+
+
+def clock_minutes(value: str) -> int:
+    """Convert a ``HHMM`` clock time to minutes after midnight."""
+    return int(value[:-2]) * 60 + int(value[-2:])
+
+
+def duration_minutes(value: str) -> int:
+    """Convert a ``H.MM`` duration to minutes."""
+    hours, minutes = value.split(".")
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_trip(unit: SplitUnit) -> Trip:
+    """
+    Parse a split trip.
+
+    Args:
+        unit: The split trip.
+
+    Raises:
+        ParseError: If the trip does not start with a valid ``SEQ`` line.
+
+    Returns:
+        The parsed trip.
+    """
+    lines = unit.text.splitlines()
+    if not lines or (match := TRIP_RE.match(lines[0])) is None:
+        raise ParseError(f"Trip {unit.trip_id} has no SEQ line.")
+    trip = Trip(
+        trip_id=match["trip_id"],
+        ops=int(match["ops"]),
+        base=intern(unit.base),
+        equipment=intern(unit.equipment),
+        page=unit.page,
+    )
+    duty: DutyPeriod | None = None
+    for line in lines[1:]:
+        if match := LEG_RE.match(line):
+            if duty is None:
+                duty = DutyPeriod(report=0)
+                trip.duty_periods.append(duty)
+            duty.legs.append(
+                FlightLeg(
+                    day=int(match["day"]),
+                    flight=match["flight"],
+                    equipment=intern(match["equipment"]),
+                    departure_station=intern(match["departure_station"]),
+                    departure_time=clock_minutes(match["departure_time"]),
+                    arrival_station=intern(match["arrival_station"]),
+                    arrival_time=clock_minutes(match["arrival_time"]),
+                    block=duration_minutes(match["block"]),
+                )
+            )
+        elif match := REPORT_RE.match(line):
+            duty = DutyPeriod(report=clock_minutes(match["report"]))
+            trip.duty_periods.append(duty)
+        elif (match := RELEASE_RE.match(line)) and duty is not None:
+            duty.release = clock_minutes(match["release"])
+            duty.block = duration_minutes(match["block"])
+            duty.credit = duration_minutes(match["credit"])
+            duty.duty = duration_minutes(match["duty"])
+        elif (match := LAYOVER_RE.match(line)) and duty is not None:
+            duty.layover_station = intern(match["station"])
+            duty.layover_rest = duration_minutes(match["rest"])
+        elif match := TOTAL_RE.match(line):
+            trip.block = duration_minutes(match["block"])
+            trip.credit = duration_minutes(match["credit"])
+            trip.tafb = duration_minutes(match["tafb"])
+    return trip
+
+
+def parse_package(
+    input_path: Path,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> BidPackage:
+    """
+    Parse a bid-package text or PDF file into the in-memory model.
+
+    Trips that fail to parse are logged and skipped.
+
+    Args:
+        input_path: The bid-package text file, or PDF.
+        encoding: The text encoding of the input.
+        rules: The boundary rules. Defaults to the standard layout.
+
+    Returns:
+        The parsed bid package.
+    """
+    package = BidPackage(source=str(input_path))
+    page: Page | None = None
+    with open_raw_lines(input_path, encoding=encoding) as raw_lines:
+        for unit in iter_split_units(raw_lines, encoding=encoding, rules=rules):
+            try:
+                trip = parse_trip(unit)
+            except ParseError as error:
+                logger.warning("%s", error)
+                continue
+            if page is None or page.number != unit.page:
+                page = Page(
+                    number=unit.page,
+                    base=trip.base,
+                    equipment=trip.equipment,
+                )
+                package.pages.append(page)
+            page.trips.append(trip)
+    return package
@@ -0,0 +1,92 @@
+####################################################
+#                                                  #
+#       src/snippets/hash/async_hash.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T10:05:51-07:00            #
+# Last Modified: 2026-10-18T17:05:51.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Asyncio counterparts of the hash functions.
+
+File reads are blocking, so they are run in an executor to keep the event loop
+responsive. Pass a bounded executor to limit how many files are read at once.
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterable, Callable
+
+from pbs_split.snippets.hash.file_hash import (
+    HashedFileProtocol,
+    hash_file,
+    hashed_file_result_factory,
+)
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+
+async def async_bytes_iterator_hash(
+    bytes_iterator: AsyncIterable[bytes],
+    hasher: "_Hash",
+) -> str:
+    """
+    Get the hash digest of an async bytes iterator as a hexidecimal string.
+
+    Args:
+        bytes_iterator: The async byte iterator
+        hasher: The hash function from :py:mod:`hashlib`
+
+    Returns:
+         The hexidecimal str from `hexdigest()`
+    """
+    async for block in bytes_iterator:
+        hasher.update(block)
+    return hasher.hexdigest()
+
+
+async def async_hash_file(
+    file_path: Path,
+    hasher: "_Hash",
+    block_size: int | None = None,
+    executor: Executor | None = None,
+) -> str:
+    """
+    Calculate the hash digest for a file without blocking the event loop.
+
+    Args:
+        file_path: The path for a file to be opened in binary mode.
+        hasher: The hasher used to generate the hexdigest.
+        block_size: The block size used to read the file. Defaults to a size
+            chosen by the file size.
+        executor: The executor used to read the file. Defaults to the event loop
+            default executor.
+
+    Returns:
+        A hexidecimal string representing the file hash.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        partial(hash_file, file_path=file_path, hasher=hasher, block_size=block_size),
+    )
+
+
+async def async_make_hashed_file(
+    file_path: Path,
+    hasher: "_Hash",
+    block_size: int | None = None,
+    executor: Executor | None = None,
+    result_factory: Callable[
+        [Path, str, str], HashedFileProtocol
+    ] = hashed_file_result_factory,
+):
+    hash_str = await async_hash_file(
+        file_path=file_path, hasher=hasher, block_size=block_size, executor=executor
+    )
+    return result_factory(file_path, hash_str, hasher.name)
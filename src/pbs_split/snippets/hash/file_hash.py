@@ -5,20 +5,83 @@
 ####################################################
 # Created by: Chad Lowe                            #
 # Created on: 2023-02-28T08:31:08-07:00            #
-# Last Modified: 2023-03-01T15:20:06.269228+00:00  #
+# Last Modified: 2026-10-18T19:02:47.000000+00:00  #
 # Source: https://github.com/DonalChilde/snippets  #
 ####################################################
 
+import io
+import mmap
+import os
+import stat
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, BinaryIO, Callable, Protocol
+from typing import TYPE_CHECKING, BinaryIO, Callable, Literal, Protocol
 
 if TYPE_CHECKING:
     from hashlib import _Hash
 
 
+HashReadMode = Literal["auto", "read", "readinto", "mmap"]
+
+# Regular files at least this large are hashed through mmap in auto mode.
+MMAP_THRESHOLD = 2**20 * 16
+
+
+def adaptive_block_size(file_size: int) -> int:
+    """
+    Choose a read block size suited to the size of a file.
+
+    Small files are read in a single block, large files in blocks of up to 1M.
+
+    Args:
+        file_size: The file size in bytes.
+
+    Returns:
+        The block size in bytes.
+    """
+    if file_size <= 2**10 * 64:
+        return max(file_size, 2**12)
+    if file_size <= 2**20 * 16:
+        return 2**10 * 256
+    return 2**20
+
+
+def _file_size(file_handle: BinaryIO) -> int | None:
+    """The size of a regular file, or None for streams without a file number."""
+    try:
+        stat_result = os.fstat(file_handle.fileno())
+    except (OSError, ValueError, io.UnsupportedOperation):
+        return None
+    if not stat.S_ISREG(stat_result.st_mode):
+        return None
+    return stat_result.st_size
+
+
+def _hash_read(file_handle: BinaryIO, hasher: "_Hash", block_size: int):
+    block = file_handle.read(block_size)
+    while block:
+        hasher.update(block)
+        block = file_handle.read(block_size)
+
+
+def _hash_readinto(file_handle: BinaryIO, hasher: "_Hash", block_size: int):
+    # One buffer is reused for every read, instead of a new bytes per block.
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    while bytes_read := file_handle.readinto(buffer):  # type: ignore[attr-defined]
+        hasher.update(view[:bytes_read])
+
+
+def _hash_mmap(file_handle: BinaryIO, hasher: "_Hash"):
+    with mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        hasher.update(mapped)
+
+
 def hash_binary_file(
-    file_handle: BinaryIO, hasher: "_Hash", block_size: int = 2**10 * 64
+    file_handle: BinaryIO,
+    hasher: "_Hash",
+    block_size: int | None = None,
+    mode: HashReadMode = "auto",
 ) -> str:
     """
     Calculate the hash digest for a file as a hexidecimal string.
@@ -26,23 +89,49 @@ def hash_binary_file(
     https://stackoverflow.com/a/3431835/105844
     https://www.pythonmorsels.com/reading-binary-files-in-python/
 
+    The file can be read with plain ``read()`` calls, with ``readinto()`` into a
+    single reused buffer, or through ``mmap``. In ``auto`` mode, regular files of
+    at least :data:`MMAP_THRESHOLD` bytes use ``mmap``, everything else uses
+    ``readinto``.
+
     Args:
         file_handle: The file handle for a file opened in binary mode.
         hasher: The hasher used to generate the hexdigest.
-        block_size: The block size used to read the file. Defaults to 2**10*64 (64K).
+        block_size: The block size used to read the file. Defaults to a size
+            chosen by :func:`adaptive_block_size`, or 64K if the file size is
+            unknown.
+        mode: How the file is read. Defaults to "auto".
 
     Returns:
         A hexidecimal string representing the file hash.
     """
     with file_handle:
-        block = file_handle.read(block_size)
-        while block:
-            hasher.update(block)
-            block = file_handle.read(block_size)
+        file_size = _file_size(file_handle)
+        if mode == "auto":
+            if file_size is not None and file_size >= MMAP_THRESHOLD:
+                mode = "mmap"
+            else:
+                mode = "readinto"
+        if block_size is None:
+            block_size = (
+                2**10 * 64 if file_size is None else adaptive_block_size(file_size)
+            )
+        if mode == "mmap" and file_size:
+            _hash_mmap(file_handle, hasher)
+        elif mode in ("readinto", "mmap"):
+            _hash_readinto(file_handle, hasher, block_size)
+        else:
+            _hash_read(file_handle, hasher, block_size)
     return hasher.hexdigest()
 
 
-def hash_file(file_path: Path, hasher: "_Hash", block_size: int = 2**10 * 64) -> str:
+def hash_file(
+    file_path: Path,
+    hasher: "_Hash",
+    block_size: int | None = None,
+    mode: HashReadMode = "auto",
+    opener: Callable[[Path], BinaryIO] | None = None,
+) -> str:
     """
     Calculate the hash digest for a file as a hexidecimal string.
 
@@ -52,14 +141,28 @@ def hash_file(file_path: Path, hasher: "_Hash", block_size: int = 2**10 * 64) ->
     Args:
         file_path: The path for a file to be opened in binary mode.
         hasher: The hasher used to generate the hexdigest.
-        block_size: The block size used to read the file. Defaults to 2**10*64 (64K).
+        block_size: The block size used to read the file. Defaults to a size
+            chosen by :func:`adaptive_block_size`.
+        mode: How the file is read, see :func:`hash_binary_file`. Defaults to "auto".
+        opener: Opens the file as a binary stream, e.g. to hash the decompressed
+            content of a compressed file. The stream is read in blocks, never
+            through mmap. Defaults to the raw bytes of the file.
 
     Returns:
         A hexidecimal string representing the file hash.
     """
+    if opener is not None:
+        # The stream may report the file number of an underlying file.
+        hex_digest = hash_binary_file(
+            file_handle=opener(file_path),
+            hasher=hasher,
+            block_size=block_size or 2**20,
+            mode="read" if mode == "read" else "readinto",
+        )
+        return hex_digest
     with open(file_path, mode="rb") as file_handle:
         hex_digest = hash_binary_file(
-            file_handle=file_handle, hasher=hasher, block_size=block_size
+            file_handle=file_handle, hasher=hasher, block_size=block_size, mode=mode
         )
     return hex_digest
 
@@ -86,10 +189,13 @@ def hashed_file_result_factory(
 def make_hashed_file(
     file_path: Path,
     hasher: "_Hash",
-    block_size: int = 2**10 * 64,
+    block_size: int | None = None,
     result_factory: Callable[
         [Path, str, str], HashedFileProtocol
     ] = hashed_file_result_factory,
+    opener: Callable[[Path], BinaryIO] | None = None,
 ):
-    hash_str = hash_file(file_path=file_path, hasher=hasher, block_size=block_size)
+    hash_str = hash_file(
+        file_path=file_path, hasher=hasher, block_size=block_size, opener=opener
+    )
     return result_factory(file_path, hash_str, hasher.name)
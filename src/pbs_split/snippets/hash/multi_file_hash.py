@@ -0,0 +1,154 @@
+####################################################
+#                                                  #
+#     src/snippets/hash/multi_file_hash.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T09:12:40-07:00            #
+# Last Modified: 2026-10-18T16:12:40.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+Calculate several hash digests for a file from a single read pass.
+
+Each block read from the file is fed to every hasher, so adding a second
+algorithm costs cpu time, but no extra I/O.
+"""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Sequence
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+
+def hash_binary_file_multi(
+    file_handle: BinaryIO,
+    hashers: Sequence["_Hash"],
+    block_size: int = 2**10 * 64,
+) -> dict[str, str]:
+    """
+    Calculate several hash digests for a file, reading it once.
+
+    Args:
+        file_handle: The file handle for a file opened in binary mode.
+        hashers: The hashers used to generate the hexdigests. Hasher names
+            should be unique.
+        block_size: The block size used to read the file. Defaults to 2**10*64 (64K).
+
+    Returns:
+        A dict of hasher name to hexidecimal digest.
+    """
+    with file_handle:
+        block = file_handle.read(block_size)
+        while block:
+            for hasher in hashers:
+                hasher.update(block)
+            block = file_handle.read(block_size)
+    return {hasher.name: hasher.hexdigest() for hasher in hashers}
+
+
+def hash_file_multi(
+    file_path: Path, hashers: Sequence["_Hash"], block_size: int = 2**10 * 64
+) -> dict[str, str]:
+    """
+    Calculate several hash digests for a file, reading it once.
+
+    Args:
+        file_path: The path for a file to be opened in binary mode.
+        hashers: The hashers used to generate the hexdigests. Hasher names
+            should be unique.
+        block_size: The block size used to read the file. Defaults to 2**10*64 (64K).
+
+    Returns:
+        A dict of hasher name to hexidecimal digest.
+    """
+    with open(file_path, mode="rb") as file_handle:
+        digests = hash_binary_file_multi(
+            file_handle=file_handle, hashers=hashers, block_size=block_size
+        )
+    return digests
+
+
+@dataclass
+class MultiHashedFile:
+    """
+    A file with a digest for each of several hash methods.
+
+    `file_hash` and `hash_method` hold the primary digest, the first method
+    hashed, so a MultiHashedFile is a
+    :class:`~pbs_split.snippets.hash.file_hash.HashedFileProtocol`.
+    """
+
+    file_path: Path
+    file_hash: str
+    hash_method: str
+    # Hash method, to hexidecimal digest.
+    digests: dict[str, str]
+
+
+def make_multi_hashed_file(
+    file_path: Path,
+    hash_methods: Sequence[str] = ("sha256",),
+    block_size: int = 2**10 * 64,
+) -> MultiHashedFile:
+    """
+    Hash a file with several algorithms, reading it once.
+
+    Args:
+        file_path: The file to hash.
+        hash_methods: Names of algorithms accepted by :py:func:`hashlib.new`.
+        block_size: The block size used to read the file. Defaults to 2**10*64 (64K).
+
+    Returns:
+        The file path, with a digest for each hash method, the first being the
+        primary digest.
+    """
+    if not hash_methods:
+        raise ValueError("At least one hash method is needed.")
+    hashers = [hashlib.new(hash_method) for hash_method in hash_methods]
+    digests = hash_file_multi(
+        file_path=file_path, hashers=hashers, block_size=block_size
+    )
+    primary = hashers[0].name
+    return MultiHashedFile(
+        file_path=file_path,
+        file_hash=digests[primary],
+        hash_method=primary,
+        digests=digests,
+    )
+
+
+def make_multi_hashed_files(
+    file_paths: Sequence[Path],
+    hash_methods: Sequence[str] = ("sha256",),
+    block_size: int = 2**10 * 64,
+    max_workers: int | None = None,
+) -> list[MultiHashedFile]:
+    """
+    Hash many files concurrently, using a thread pool.
+
+    :py:mod:`hashlib` releases the GIL while hashing large buffers, so threads
+    give real parallelism here without the overhead of worker processes.
+
+    Args:
+        file_paths: The files to hash.
+        hash_methods: Names of algorithms accepted by :py:func:`hashlib.new`.
+        block_size: The block size used to read the files. Defaults to 2**10*64 (64K).
+        max_workers: Maximum number of threads. Defaults to the
+            :py:class:`~concurrent.futures.ThreadPoolExecutor` default.
+
+    Returns:
+        The hashed files, in the same order as `file_paths`.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            lambda file_path: make_multi_hashed_file(
+                file_path=file_path, hash_methods=hash_methods, block_size=block_size
+            ),
+            file_paths,
+        )
+        return list(results)
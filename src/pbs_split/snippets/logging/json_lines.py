@@ -0,0 +1,96 @@
+####################################################
+#                                                  #
+#      src/snippets/logging/json_lines.py
+#                                                  #
+####################################################
+# Created by: Chad Lowe                            #
+# Created on: 2026-10-18T10:41:02-07:00            #
+# Last Modified: 2026-10-18T17:41:02.000000+00:00  #
+# Source: https://github.com/DonalChilde/snippets  #
+####################################################
+"""
+A JSON-lines log formatter.
+
+Each record is formatted as one JSON object per line. The layout is worked out
+once, when the formatter is made, so formatting a record only encodes its
+values. Structured data can be attached to a record with ``extra``::
+
+    logger.info("split", extra={"metrics": {"pages": 12}})
+"""
+
+import json
+import logging
+from json.encoder import encode_basestring
+from typing import Any, Sequence
+
+DEFAULT_JSON_FIELDS = {
+    "time": "created",
+    "level": "levelname",
+    "logger": "name",
+    "message": "message",
+}
+DEFAULT_EXTRA_FIELDS = ("metrics",)
+
+
+def _encode(value: Any) -> str:
+    value_type = type(value)
+    if value_type is str:
+        return encode_basestring(value)
+    if value_type is int or value_type is float:
+        return repr(value)
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Format log records as JSON lines.
+
+    Args:
+        fields: JSON key to LogRecord attribute. The attribute "message" is the
+            formatted message. Defaults to time, level, logger and message.
+        extra_fields: Attributes added with ``extra``, included under their own
+            name when present on a record. Defaults to "metrics".
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, str] | None = None,
+        extra_fields: Sequence[str] = DEFAULT_EXTRA_FIELDS,
+    ) -> None:
+        super().__init__()
+        if fields is None:
+            fields = DEFAULT_JSON_FIELDS
+        if not fields:
+            raise ValueError("At least one field is needed.")
+        self._layout = tuple(
+            (f"{',' if idx else '{'}{encode_basestring(key)}:", attribute)
+            for idx, (key, attribute) in enumerate(fields.items())
+        )
+        self._extra = tuple(
+            (f",{encode_basestring(name)}:", name) for name in extra_fields
+        )
+
+    def format(self, record: logging.LogRecord) -> str:
+        parts = []
+        for prefix, attribute in self._layout:
+            parts.append(prefix)
+            if attribute == "message":
+                parts.append(_encode(record.getMessage()))
+            else:
+                parts.append(_encode(getattr(record, attribute, None)))
+        record_dict = record.__dict__
+        for prefix, name in self._extra:
+            if (value := record_dict.get(name)) is not None:
+                parts.append(prefix)
+                parts.append(_encode(value))
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            parts.append(',"exc_info":')
+            parts.append(_encode(record.exc_text))
+        parts.append("}")
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(fields={[a for _, a in self._layout]!r})"
@@ -5,7 +5,7 @@
 ####################################################
 # Created by: Chad Lowe                            #
 # Created on: 2022-10-31T08:12:18-07:00            #
-# Last Modified: 2022-12-04T01:11:10.071840+00:00  #
+# Last Modified: 2026-10-18T09:30:00.000000+00:00  #
 # Source: https://github.com/DonalChilde/snippets  #
 ####################################################
 """
@@ -13,8 +13,10 @@ Convenience functions for logging.
 
 """
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Literal
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
@@ -22,6 +24,9 @@ logger.addHandler(logging.NullHandler())
 DEFAULT_FORMAT = (
     "%(asctime)s %(levelname)s:%(funcName)s: %(message)s [in %(pathname)s:%(lineno)d]"
 )
+DEFAULT_QUEUE_SIZE = 10_000
+
+QueuePolicy = Literal["drop", "block"]
 
 
 def rotating_file_handler(
@@ -122,3 +127,135 @@ def add_handlers_to_target_logger(
         )
         target_logger.addHandler(handler)
     target_logger.info("Added handlers from %s to %s", source_logger, target_logger)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    A QueueHandler for a bounded queue.
+
+    When the queue is full, records are either dropped and counted, or the
+    logging thread blocks until there is room.
+
+    Args:
+        log_queue: The queue, shared with a QueueListener.
+        policy: "drop" or "block". Defaults to "drop".
+        timeout: With the "block" policy, the most seconds to wait for room
+            before dropping the record. Defaults to None, wait forever.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        policy: QueuePolicy = "drop",
+        timeout: float | None = None,
+    ) -> None:
+        super().__init__(log_queue)
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown queue policy {policy!r}")
+        self.policy = policy
+        self.timeout = timeout
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the args into the message, so the record no longer refers
+        # to objects that may change. Formatting is left to the listener thread,
+        # unlike QueueHandler, which formats and copies every record here.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self.policy == "block":
+                self.queue.put(record, block=True, timeout=self.timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"policy={self.policy!r}, maxsize={self.queue.maxsize!r})"
+        )
+
+
+class BoundedQueueListener(QueueListener):
+    """
+    A QueueListener for a bounded queue.
+
+    QueueListener puts its stop sentinel without waiting, which raises
+    ``queue.Full`` if the queue is full when stopping. This waits for room.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def queue_handler(
+    handlers: list[logging.Handler],
+    max_size: int = DEFAULT_QUEUE_SIZE,
+    policy: QueuePolicy = "drop",
+    timeout: float | None = None,
+) -> tuple[BoundedQueueHandler, BoundedQueueListener]:
+    """
+    Move the work of `handlers` to a background thread.
+
+    Records are put on a bounded queue by the returned handler, and written by
+    `handlers` from the listener thread, so logging does not block on I/O. The
+    listener is started, call its ``stop`` method to flush the queue.
+
+    Args:
+        handlers: The handlers that do the writing. Their levels are respected.
+        max_size: The most records held in the queue.
+        policy: "drop" or "block", what to do when the queue is full.
+        timeout: With the "block" policy, the most seconds to wait for room.
+
+    Returns:
+        The handler to add to a logger, and the started listener.
+    """
+    log_queue: queue.Queue = queue.Queue(maxsize=max_size)
+    handler = BoundedQueueHandler(log_queue, policy=policy, timeout=timeout)
+    listener = BoundedQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return handler, listener
+
+
+def rotating_file_queue_logger(
+    logger_name: str,
+    log_dir: Path,
+    log_level: int,
+    logfile_name: str | None = None,
+    formater: logging.Formatter | None = None,
+    max_size: int = DEFAULT_QUEUE_SIZE,
+    policy: QueuePolicy = "drop",
+) -> tuple[logging.Logger, QueueListener]:
+    """
+    Configures a logger with a rotating file handler, run from a background
+    thread.
+
+    Like :func:`rotating_file_logger`, but file writes and rotation happen in a
+    QueueListener thread. Stop the returned listener before exiting.
+
+    Args:
+        logger_name: The name of the logger.
+        log_dir: The log directory.
+        log_level: The log level.
+        max_size: The most records held in the queue.
+        policy: "drop" or "block", what to do when the queue is full.
+
+    Returns:
+        The logger, and the started listener.
+    """
+    logger_ = logging.getLogger(logger_name)
+    if logfile_name is None:
+        logfile_name = logger_name
+    file_handler = rotating_file_handler(
+        log_dir=log_dir, file_name=logfile_name, log_level=log_level, formater=formater
+    )
+    handler, listener = queue_handler([file_handler], max_size=max_size, policy=policy)
+    logger_.addHandler(handler)
+    logger_.setLevel(log_level)
+    logger_.info("Queued rotating file logger initialized with %r", file_handler)
+    return logger_, listener
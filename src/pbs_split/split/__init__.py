@@ -0,0 +1 @@
+"""Split PBS bid-package text into individual trips."""
@@ -0,0 +1,111 @@
+"""
+Write split trips into a single compressed tar archive.
+
+The archive is written as a stream, one member per trip, named as
+:class:`~pbs_split.split.splitter.TextDirectoryWriter` would name the file. A
+bid package split this way is one file on disk rather than thousands of small
+ones, and it can be read with ``tar`` or :mod:`tarfile`.
+"""
+
+import logging
+import tarfile
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from pbs_split.split.compression import Compression, compressed_name, open_compressed
+from pbs_split.split.splitter import DEFAULT_ENCODING, SplitUnit, TextDirectoryWriter
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+ARCHIVE_NAME = "trips.tar"
+
+
+class ArchiveWriter(TextDirectoryWriter):
+    """
+    Write each trip as a member of one tar archive in `output_dir`.
+
+    The archive is named ``trips.tar`` plus the compression suffix, e.g.
+    ``trips.tar.zst``. Members have a fixed time and mode, so the same trips
+    always make the same archive. The archive is written under a ``.tmp`` name,
+    and only renamed into place once complete.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        compression: Compression | str = Compression.GZIP,
+        suffix: str = ".txt",
+    ) -> None:
+        super().__init__(output_dir=output_dir, suffix=suffix)
+        self.compression = Compression(compression)
+        self.archive_path = output_dir / compressed_name(ARCHIVE_NAME, self.compression)
+        self._tmp_path = self.archive_path.with_name(f"{self.archive_path.name}.tmp")
+        self._file: BinaryIO | None = None
+        self._tar: tarfile.TarFile | None = None
+
+    def _open(self) -> tarfile.TarFile:
+        self._file = open_compressed(self._tmp_path, "wb", self.compression)
+        # Stream mode, the compressed file is only ever appended to.
+        self._tar = tarfile.open(
+            fileobj=self._file, mode="w|", format=tarfile.PAX_FORMAT
+        )
+        return self._tar
+
+    def write(self, unit: SplitUnit) -> None:
+        tar = self._tar if self._tar is not None else self._open()
+        data = unit.text.encode(DEFAULT_ENCODING)
+        member = tarfile.TarInfo(self.file_name(unit))
+        member.size = len(data)
+        member.mode = 0o644
+        tar.addfile(member, BytesIO(data))
+
+    def close(self) -> list[Path]:
+        if self._tar is None:
+            self._open()
+        assert self._tar is not None and self._file is not None
+        try:
+            self._tar.close()
+        finally:
+            self._file.close()
+            self._tar = None
+            self._file = None
+        self._tmp_path.replace(self.archive_path)
+        return [self.archive_path]
+
+    def abort(self):
+        """Discard the archive, leaving any earlier archive in place."""
+        try:
+            # Closing the tar ends the temporary file, which is then removed.
+            if self._tar is not None:
+                self._tar.close()
+        finally:
+            if self._file is not None:
+                self._file.close()
+            self._tar = None
+            self._file = None
+            self._tmp_path.unlink(missing_ok=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"output_dir={self.output_dir!r}, "
+            f"compression={self.compression.value!r})"
+        )
+
+
+def iter_archive(archive_path: Path) -> Iterator[tuple[str, str]]:
+    """
+    Read the trips back from an archive, in the order they were written.
+
+    Yields:
+        The member name, and the trip text.
+    """
+    with open_compressed(archive_path) as file_handle:
+        with tarfile.open(fileobj=file_handle, mode="r|") as tar:
+            for member in tar:
+                extracted = tar.extractfile(member)
+                if extracted is None:
+                    continue
+                yield member.name, extracted.read().decode(DEFAULT_ENCODING)
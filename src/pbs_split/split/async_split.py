@@ -0,0 +1,140 @@
+"""
+Asyncio entry point for splitting bid packages.
+
+Splitting and hashing are blocking, so they run on a bounded thread pool. The
+pool size also limits how many files are read at once, so a burst of new
+bid packages does not oversubscribe disk I/O.
+"""
+
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from types import TracebackType
+from typing import Sequence
+from weakref import WeakKeyDictionary
+
+from pbs_split.snippets.hash.async_hash import async_make_hashed_file
+from pbs_split.snippets.hash.file_hash import HashedFileProtocol
+from pbs_split.split.compression import input_stem
+from pbs_split.split.splitter import DEFAULT_ENCODING, SplitResult, split_file
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class AsyncSplitter:
+    """
+    Split and hash bid packages from asyncio code.
+
+    Use as an async context manager, so the thread pool is shut down when done::
+
+        async with AsyncSplitter(max_concurrency=2) as splitter:
+            result = await splitter.split(input_path, output_dir)
+
+    Args:
+        max_concurrency: The maximum number of files read at once.
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> None:
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="pbs-split"
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def split(
+        self, input_path: Path, output_dir: Path, encoding: str = DEFAULT_ENCODING
+    ) -> SplitResult:
+        """Split one file, see :func:`~pbs_split.split.splitter.split_file`."""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor,
+                partial(
+                    split_file,
+                    input_path=input_path,
+                    output_dir=output_dir,
+                    encoding=encoding,
+                ),
+            )
+
+    async def split_many(
+        self, input_paths: Sequence[Path], output_root: Path
+    ) -> list[SplitResult | BaseException]:
+        """
+        Split many files, each into a sub directory of `output_root`.
+
+        Returns:
+            The result or the raised exception for each input, in input order.
+        """
+        return await asyncio.gather(
+            *(
+                self.split(input_path, output_root / input_stem(input_path))
+                for input_path in input_paths
+            ),
+            return_exceptions=True,
+        )
+
+    async def hash_file(self, file_path: Path) -> HashedFileProtocol:
+        """Hash a file with sha256, sharing the concurrency limit with splits."""
+        async with self._semaphore:
+            return await async_make_hashed_file(
+                file_path, hashlib.sha256(), executor=self._executor
+            )
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncSplitter":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(max_concurrency={self.max_concurrency!r})"
+
+
+# The shared splitter of each event loop, as an asyncio.Semaphore belongs to one.
+_default_splitters: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncSplitter]" = (
+    WeakKeyDictionary()
+)
+
+
+def default_splitter() -> AsyncSplitter:
+    """
+    The splitter shared by every :func:`async_split_file` call on the running
+    event loop, limited to `DEFAULT_MAX_CONCURRENCY` files at once.
+    """
+    loop = asyncio.get_running_loop()
+    splitter = _default_splitters.get(loop)
+    if splitter is None:
+        splitter = _default_splitters[loop] = AsyncSplitter()
+    return splitter
+
+
+async def async_split_file(
+    input_path: Path,
+    output_dir: Path,
+    encoding: str = DEFAULT_ENCODING,
+    splitter: AsyncSplitter | None = None,
+) -> SplitResult:
+    """
+    Split one file without blocking the event loop.
+
+    Args:
+        input_path: The bid-package file.
+        output_dir: The directory for the split output.
+        encoding: The text encoding of the input.
+        splitter: The splitter whose concurrency limit the split shares.
+            Defaults to :func:`default_splitter`.
+    """
+    if splitter is None:
+        splitter = default_splitter()
+    return await splitter.split(input_path, output_dir, encoding=encoding)
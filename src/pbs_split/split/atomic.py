@@ -0,0 +1,264 @@
+"""
+Atomic, batched output for the text formats.
+
+:class:`AtomicTextWriter` writes a file per trip, as
+:class:`~pbs_split.split.splitter.TextDirectoryWriter` does, with:
+
+* atomic files. Each trip is written to a hidden temporary file,
+  ``.<name>.<pid>.tmp``, which is renamed over its final name once complete, so
+  a crash never leaves a half written trip, and a file from an earlier split is
+  either kept whole or replaced whole.
+* batches. Trips are held until `batch_size` of them can be written together.
+* a choice of fsync policy, see :class:`~pbs_split.split.formats.FsyncPolicy`:
+
+  * ``none``, leave syncing to the operating system.
+  * ``batch``, write every file of a batch, then sync each, rename them all, and
+    sync the directory once. Syncing after the whole batch is written lets the
+    filesystem write the batch out together.
+  * ``file``, sync each file before its rename, and the directory after it.
+
+* an optional background thread, which writes each batch while the splitter
+  goes on to the next, so parsing and writing overlap.
+* content hashes. The sha256 of each trip text is computed as it is written,
+  and kept in :attr:`AtomicTextWriter.hashes`, optionally saved as a
+  ``trips.sha256`` manifest in the format of ``sha256sum``. For a compressed
+  format the hash is of the uncompressed text, as
+  :func:`~pbs_split.snippets.hash.file_hash.hash_file` with
+  :func:`~pbs_split.split.compression.open_compressed` as opener gives.
+
+Files are only in place once the writer is closed, so :meth:`write` returns
+None, and :meth:`close` the files in the order they were written. After a failed
+split, :meth:`abort` drops the held and queued batches, and saves no manifest.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from queue import Empty, Queue
+from typing import Iterable
+
+from pbs_split.snippets.hash.bytes_iterator_hash import bytes_iterator_hash
+from pbs_split.split.compression import Compression, open_compressed
+from pbs_split.split.formats import FsyncPolicy
+from pbs_split.split.splitter import DEFAULT_ENCODING, SplitUnit, TextDirectoryWriter
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_BATCH_SIZE = 256
+# Batches waiting for the background thread, before the splitter waits too.
+MAX_PENDING_BATCHES = 4
+MANIFEST_FILE_NAME = "trips.sha256"
+HASH_METHOD = "sha256"
+
+Batch = list[tuple[str, str]]
+
+
+def _fsync_path(path: Path):
+    file_descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(file_descriptor)
+    finally:
+        os.close(file_descriptor)
+
+
+def save_manifest(
+    output_dir: Path, hashes: Iterable[tuple[str, str]], sync: bool = False
+) -> Path:
+    """
+    Save a ``trips.sha256`` manifest, as ``sha256sum`` would write it.
+
+    Args:
+        output_dir: The directory of the files.
+        hashes: The name and sha256 of each file, in order.
+        sync: Sync the manifest to disk before it is renamed into place.
+
+    Returns:
+        The manifest.
+    """
+    manifest_path = output_dir / MANIFEST_FILE_NAME
+    tmp_path = output_dir / f".{MANIFEST_FILE_NAME}.{os.getpid()}.tmp"
+    with open(tmp_path, mode="w", encoding=DEFAULT_ENCODING) as file_handle:
+        file_handle.writelines(f"{digest}  {name}\n" for name, digest in hashes)
+        if sync:
+            file_handle.flush()
+            os.fsync(file_handle.fileno())
+    tmp_path.replace(manifest_path)
+    return manifest_path
+
+
+class AtomicTextWriter(TextDirectoryWriter):
+    """
+    Write each trip to its own text file, atomically, in batches.
+
+    Args:
+        output_dir: The directory for the files.
+        suffix: The file suffix.
+        compression: The compression of each file.
+        fsync: When files are synced to disk.
+        batch_size: The number of trips written together.
+        background: Write batches on a background thread.
+        manifest: Save the hash of each trip to ``trips.sha256`` when closed.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        suffix: str = ".txt",
+        compression: Compression | str = Compression.NONE,
+        fsync: FsyncPolicy | str = FsyncPolicy.NONE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        background: bool = False,
+        manifest: bool = False,
+    ) -> None:
+        super().__init__(output_dir=output_dir, suffix=suffix, compression=compression)
+        self.fsync = FsyncPolicy(fsync)
+        self.batch_size = batch_size
+        self.manifest = manifest
+        # File name, to the sha256 of the trip text.
+        self.hashes: dict[str, str] = {}
+        self._pid = os.getpid()
+        self._batch: Batch = []
+        self._outputs: list[Path] = []
+        self._error: BaseException | None = None
+        self._aborted = False
+        self._queue: Queue[Batch | None] | None = None
+        self._thread: threading.Thread | None = None
+        if background:
+            self._queue = Queue(maxsize=MAX_PENDING_BATCHES)
+            self._thread = threading.Thread(
+                target=self._run, name=f"writer {output_dir}", daemon=True
+            )
+            self._thread.start()
+
+    def write(self, unit: SplitUnit) -> None:  # type: ignore[override]
+        self.write_named(self.file_name(unit), unit.text)
+
+    def write_named(self, name: str, text: str) -> Path:
+        """Hold a trip for the file `name`, written with its batch."""
+        output_file = self.output_dir / name
+        self._outputs.append(output_file)
+        self._batch.append((name, text))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+        return output_file
+
+    def flush(self):
+        """Write the held trips, or hand them to the background thread."""
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        if self._queue is None:
+            self._write_batch(batch)
+            return
+        self._raise_error()
+        self._queue.put(batch)
+
+    def _run(self):
+        assert self._queue is not None
+        while (batch := self._queue.get()) is not None:
+            # Keep taking batches after an error, so the splitter never blocks.
+            if self._error is not None or self._aborted:
+                continue
+            try:
+                self._write_batch(batch)
+            except BaseException as error:  # pylint: disable=broad-exception-caught
+                self._error = error
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _write_file(self, path: Path, data: bytes, sync: bool):
+        if self.compression == Compression.NONE:
+            with open(path, mode="wb") as file_handle:
+                file_handle.write(data)
+                if sync:
+                    file_handle.flush()
+                    os.fsync(file_handle.fileno())
+            return
+        with open_compressed(path, "wb", self.compression) as file_handle:
+            file_handle.write(data)
+        if sync:
+            _fsync_path(path)
+
+    def _write_batch(self, batch: Batch):
+        per_file = self.fsync == FsyncPolicy.FILE
+        renames = []
+        for name, text in batch:
+            data = text.encode(DEFAULT_ENCODING)
+            self.hashes[name] = bytes_iterator_hash(
+                iter((data,)), hashlib.new(HASH_METHOD)
+            )
+            tmp_path = self.output_dir / f".{name}.{self._pid}.tmp"
+            try:
+                self._write_file(tmp_path, data, per_file)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            if per_file:
+                tmp_path.replace(self.output_dir / name)
+                _fsync_path(self.output_dir)
+            else:
+                renames.append((tmp_path, self.output_dir / name))
+        if self.fsync == FsyncPolicy.BATCH:
+            for tmp_path, _ in renames:
+                _fsync_path(tmp_path)
+        for tmp_path, output_file in renames:
+            tmp_path.replace(output_file)
+        if renames and self.fsync == FsyncPolicy.BATCH:
+            _fsync_path(self.output_dir)
+        logger.debug("Wrote %s trips to %s.", len(batch), self.output_dir)
+
+    def save_manifest(self) -> Path:
+        """Save the hash of each trip, in output order."""
+        return save_manifest(
+            self.output_dir,
+            ((output.name, self.hashes[output.name]) for output in self._outputs),
+            sync=self.fsync != FsyncPolicy.NONE,
+        )
+
+    def close(self) -> list[Path]:
+        try:
+            self.flush()
+        finally:
+            if self._thread is not None:
+                assert self._queue is not None
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+        self._raise_error()
+        outputs = list(self._outputs)
+        if self.manifest:
+            outputs.append(self.save_manifest())
+        return outputs
+
+    def abort(self):
+        """
+        Drop the trips not yet written, and stop the background thread without
+        writing its queued batches. Files of batches already written are kept.
+        """
+        self._batch = []
+        self._aborted = True
+        if self._thread is not None:
+            assert self._queue is not None
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except Empty:
+                    break
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        for tmp_path in self.output_dir.glob(f".*.{self._pid}.tmp"):
+            tmp_path.unlink(missing_ok=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"output_dir={self.output_dir!r}, suffix={self.suffix!r}, "
+            f"compression={self.compression.value!r}, fsync={self.fsync.value!r}, "
+            f"batch_size={self.batch_size!r}, background={self._queue is not None!r})"
+        )
@@ -0,0 +1,322 @@
+"""
+Split many bid-package files in parallel.
+
+Each input file is split in a worker process into its own sub directory of the
+output directory. Results are returned in input order, regardless of the order
+in which the workers finish, and an error in one file does not stop the others.
+"""
+
+import logging
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from glob import glob
+from multiprocessing.queues import Queue
+from pathlib import Path
+from typing import Sequence
+
+from pbs_split.instrument import (
+    Instruments,
+    current_instruments,
+    disable_instruments,
+    enable_instruments,
+)
+from pbs_split.snippets.hash.file_hash import HashedFileProtocol
+from pbs_split.split.cache import (
+    CacheEntry,
+    CacheStats,
+    SplitCache,
+    cached_split_file,
+)
+from pbs_split.split.compression import input_stem
+from pbs_split.split.formats import OutputFormat, make_writer
+from pbs_split.split.rules import BoundaryRules
+from pbs_split.split.search import (
+    SearchIndexingWriter,
+    SegmentBuilder,
+    finish_search_index,
+)
+from pbs_split.split.splitter import (
+    SplitResult,
+    SplitWriter,
+    log_metrics,
+    metrics_logger,
+    split_file,
+)
+from pbs_split.split.worker_logging import init_worker_logging, worker_logging
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_PATTERN = "*.txt"
+
+
+@dataclass
+class BatchItem:
+    input_path: Path
+    output_dir: Path
+    result: SplitResult | None = None
+    error: str | None = None
+    cache_stats: CacheStats | None = None
+    new_entry: CacheEntry | None = None
+    instruments: Instruments | None = None
+    # Whether the search segment was rebuilt, None if none was asked for.
+    search_rebuilt: bool | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def collect_inputs(source: str, pattern: str = DEFAULT_PATTERN) -> list[Path]:
+    """
+    Collect the input files for a batch split.
+
+    Args:
+        source: A directory, or a glob pattern matching the input files.
+        pattern: The glob pattern used when `source` is a directory.
+
+    Returns:
+        The input files, sorted by path.
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        paths = source_path.glob(pattern)
+    else:
+        paths = (Path(match) for match in glob(source, recursive=True))
+    return sorted(path for path in paths if path.is_file())
+
+
+def output_dirs(input_paths: Sequence[Path], output_root: Path) -> list[Path]:
+    """
+    Assign an output directory, named after the file stem, to each input.
+
+    A compression suffix is not part of the stem, ``package.txt.gz`` is split
+    into ``package``.
+
+    Raises:
+        ValueError: If two inputs share a file stem.
+    """
+    seen: dict[str, Path] = {}
+    for input_path in input_paths:
+        stem = input_stem(input_path)
+        if stem in seen:
+            raise ValueError(
+                f"{input_path} and {seen[stem]} would be split into "
+                f"the same directory, {output_root / stem}"
+            )
+        seen[stem] = input_path
+    return [output_root / input_stem(input_path) for input_path in input_paths]
+
+
+def split_one(
+    input_path: Path,
+    output_dir: Path,
+    manifest_path: Path | None = None,
+    rebuild: bool = False,
+    output_format: OutputFormat = OutputFormat.TEXT,
+    instrument: bool = False,
+    hashed_file: HashedFileProtocol | None = None,
+    rules: BoundaryRules | None = None,
+    search: bool = False,
+) -> BatchItem:
+    """
+    Split one file, capturing any error in the returned item.
+
+    If `manifest_path` is given, the split cache is consulted, and any new
+    cache entry is returned in the item, to be saved by the caller. If
+    `instrument` is set, the timers and counters for this file are returned in
+    the item, to be merged by the caller. A known `hashed_file` saves the cache
+    from hashing the input again. If `search` is set, the search segment of the
+    file is saved with its output, built as the file is split.
+    """
+    item = BatchItem(input_path=input_path, output_dir=output_dir)
+    outer = None
+    if instrument:
+        outer = disable_instruments()
+        item.instruments = enable_instruments()
+    try:
+        if manifest_path is None:
+            writer: SplitWriter = make_writer(output_format, output_dir)
+            builder = None
+            if search:
+                builder = SegmentBuilder(rules)
+                writer = SearchIndexingWriter(writer, builder)
+            item.result = split_file(
+                input_path=input_path,
+                output_dir=output_dir,
+                writer=writer,
+                rules=rules,
+            )
+            if builder is not None:
+                finish_search_index(input_path, output_dir, builder, hashed_file)
+                item.search_rebuilt = True
+        else:
+            cache = SplitCache(manifest_path, rebuild=rebuild)
+            cached = cached_split_file(
+                input_path,
+                output_dir,
+                cache=cache,
+                output_format=output_format,
+                hashed_file=hashed_file,
+                rules=rules,
+                search=search,
+            )
+            item.result = cached.result
+            item.cache_stats = cached.cache_stats
+            item.new_entry = cached.new_entry
+            item.search_rebuilt = cached.search_rebuilt
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        logger.exception("Error splitting %s", input_path)
+        item.error = f"{error.__class__.__name__}: {error}"
+    finally:
+        if instrument:
+            disable_instruments()
+            if outer is not None:
+                enable_instruments(outer)
+    return item
+
+
+def split_many(
+    input_paths: Sequence[Path],
+    output_root: Path,
+    jobs: int | None = None,
+    cache: SplitCache | None = None,
+    output_format: OutputFormat = OutputFormat.TEXT,
+    rules: BoundaryRules | None = None,
+    search: bool = False,
+) -> list[BatchItem]:
+    """
+    Split many bid-package files, using a process pool.
+
+    Args:
+        input_paths: The files to split.
+        output_root: Each file is split into a sub directory of this directory.
+        jobs: The number of worker processes. Defaults to the cpu count. A value
+            of 1 splits the files serially in this process.
+        cache: An optional split cache. Workers read the saved manifest, and
+            new entries are added to `cache` and saved once all files are done.
+        output_format: The output format.
+        rules: The boundary rules. Defaults to the standard layout.
+        search: Save the search segment of each file, built in its worker as the
+            file is split.
+
+    If instrumentation is enabled, the timers and counters of every file,
+    including those split in worker processes, are merged into it.
+
+    Returns:
+        One item per input file, in the same order as `input_paths`.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    dirs = output_dirs(input_paths, output_root)
+    manifest_path = None
+    rebuild = False
+    if cache is not None:
+        cache.save()
+        manifest_path = cache.manifest_path
+        rebuild = cache.rebuild
+    instruments = current_instruments()
+    instrument = instruments is not None
+    if jobs <= 1 or len(input_paths) <= 1:
+        items = [
+            split_one(
+                path,
+                out,
+                manifest_path,
+                rebuild,
+                output_format,
+                instrument,
+                None,
+                rules,
+                search,
+            )
+            for path, out in zip(input_paths, dirs)
+        ]
+    else:
+        items = _split_in_pool(
+            input_paths,
+            dirs,
+            jobs,
+            manifest_path,
+            rebuild,
+            output_format,
+            instrument,
+            rules,
+            search,
+        )
+        # Workers do not log metrics, see init_worker.
+        for item in items:
+            if item.result is not None:
+                log_metrics(item.result)
+    if instruments is not None:
+        for item in items:
+            if item.instruments is not None:
+                instruments.merge(item.instruments)
+    if cache is not None:
+        for item in items:
+            if item.cache_stats is not None:
+                cache.stats.update(item.cache_stats)
+            if item.new_entry is not None:
+                cache.add(item.new_entry)
+        cache.save()
+    return items
+
+
+def init_worker(
+    log_queue: "Queue[logging.LogRecord] | None" = None, level: int = logging.WARNING
+):
+    # Log records go to the parent, see worker_logging. Metrics are logged by
+    # the parent, once the results are back.
+    metrics_logger.disabled = True
+    init_worker_logging(log_queue, level)
+
+
+def _split_in_pool(
+    input_paths: Sequence[Path],
+    dirs: Sequence[Path],
+    jobs: int,
+    manifest_path: Path | None,
+    rebuild: bool,
+    output_format: OutputFormat,
+    instrument: bool,
+    rules: BoundaryRules | None,
+    search: bool,
+) -> list[BatchItem]:
+    with (
+        worker_logging() as log_args,
+        ProcessPoolExecutor(
+            max_workers=min(jobs, len(input_paths)),
+            initializer=init_worker,
+            initargs=log_args,
+        ) as executor,
+    ):
+        futures: list[Future[BatchItem]] = [
+            executor.submit(
+                split_one,
+                path,
+                out,
+                manifest_path,
+                rebuild,
+                output_format,
+                instrument,
+                None,
+                rules,
+                search,
+            )
+            for path, out in zip(input_paths, dirs)
+        ]
+    items: list[BatchItem] = []
+    for input_path, output_dir, future in zip(input_paths, dirs, futures):
+        try:
+            items.append(future.result())
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            # Worker failures, e.g. a broken process pool, land here.
+            items.append(
+                BatchItem(
+                    input_path=input_path,
+                    output_dir=output_dir,
+                    error=f"{error.__class__.__name__}: {error}",
+                )
+            )
+    return items
@@ -0,0 +1,60 @@
+"""
+Boundary detection for PBS bid-package text.
+
+The input is the text produced by pdf2txt from a bid package pdf. Pages are
+separated by a form feed, each page starts with a header line naming the base,
+equipment and page number, and every trip (pairing) starts with a ``SEQ`` line
+and ends with a ``TTL`` line::
+
+    BASE ORD  EQP 737  ISSUED 08APR2026  EFF 02MAY2026           PAGE 1
+    SEQ 1001   3 OPS   POSN CA FO
+    RPT 0600
+     1  2112  737  ORD 0700  LGA 1015  2.15
+    RLS 1045  BLK 2.15  CRD 5.00  DUTY 4.45
+    TTL  BLK 2.15  CRD 5.00  TAFB 4.45
+
+Only the lines needed to find page and trip boundaries are recognized here.
+"""
+
+import re
+from enum import Enum, auto
+
+PAGE_BREAK = "\f"
+
+PAGE_HEADER_RE = re.compile(
+    r"^\s*BASE\s+(?P<base>[A-Z]{3})\s+EQP\s+(?P<equipment>\S+).*?\bPAGE\s+(?P<page>\d+)\s*$"
+)
+TRIP_START_RE = re.compile(r"^\s*SEQ\s+(?P<trip_id>\d+)\b")
+TRIP_END_RE = re.compile(r"^\s*TTL\b")
+
+
+class LineKind(Enum):
+    PAGE_HEADER = auto()
+    TRIP_START = auto()
+    TRIP_END = auto()
+    BLANK = auto()
+    OTHER = auto()
+
+
+def classify_line(line: str) -> tuple[LineKind, re.Match[str] | None]:
+    """
+    Classify a single line of bid-package text.
+
+    Page breaks are expected to be stripped from the line before it is
+    classified.
+
+    Args:
+        line: The line to classify.
+
+    Returns:
+        The kind of line, and the match object if a pattern matched.
+    """
+    if not line.strip():
+        return LineKind.BLANK, None
+    if match := TRIP_START_RE.match(line):
+        return LineKind.TRIP_START, match
+    if match := TRIP_END_RE.match(line):
+        return LineKind.TRIP_END, match
+    if match := PAGE_HEADER_RE.match(line):
+        return LineKind.PAGE_HEADER, match
+    return LineKind.OTHER, None
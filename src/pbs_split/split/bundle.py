@@ -0,0 +1,286 @@
+"""
+Write split trips into a single SQLite database.
+
+A bundle holds every trip of a bid package in one file, with a table of trip
+id, page, byte range in the input, and the sha256 hash of the trip text. Rows
+are inserted in large batches, each in its own transaction, so a package of
+thousands of trips costs a handful of writes rather than thousands of file
+creations. The database is built under a temporary name and renamed into place
+when complete, so a reader never sees a partial bundle.
+
+Individual trips are read back, or exported as files on demand, with
+:class:`TripBundle`::
+
+    with TripBundle(path) as bundle:
+        text = bundle.text("12345")
+        bundle.export(output_dir)
+"""
+
+import hashlib
+import logging
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Iterable, Iterator
+
+from pbs_split.snippets.hash.bytes_iterator_hash import bytes_iterator_hash
+from pbs_split.split.splitter import DEFAULT_ENCODING, SplitUnit, TextDirectoryWriter
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+BUNDLE_FILE_NAME = "trips.sqlite"
+BUNDLE_VERSION = 1
+HASH_METHOD = "sha256"
+DEFAULT_BATCH_SIZE = 2000
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE trips (
+    row INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    trip_id TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    base TEXT NOT NULL,
+    equipment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    text BLOB NOT NULL
+);
+"""
+# Built after the rows are inserted, which is faster than updating as we go.
+INDEXES = "CREATE INDEX trips_trip_id ON trips (trip_id);"
+INSERT = (
+    "INSERT INTO trips (name, trip_id, page, base, equipment, offset, length, hash,"
+    " text) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+COLUMNS = "name, trip_id, page, base, equipment, offset, length, hash"
+
+
+def content_hash(data: bytes) -> str:
+    return bytes_iterator_hash(iter((data,)), hashlib.new(HASH_METHOD))
+
+
+class BundleWriter(TextDirectoryWriter):
+    """
+    Write split trips to a SQLite bundle in `output_dir`.
+
+    Trips are named as :class:`~pbs_split.split.splitter.TextDirectoryWriter`
+    would name their files, and held in memory until `batch_size` of them are
+    inserted together.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        file_name: str = BUNDLE_FILE_NAME,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        suffix: str = ".txt",
+    ) -> None:
+        super().__init__(output_dir=output_dir, suffix=suffix)
+        self.output_path = output_dir / file_name
+        self.batch_size = batch_size
+        self._tmp_path = self.output_path.with_name(f"{file_name}.tmp")
+        self._tmp_path.unlink(missing_ok=True)
+        # The bundle is only renamed into place once complete, so the journal
+        # and syncs that protect a live database are not needed.
+        self._connection = sqlite3.connect(self._tmp_path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.executescript(SCHEMA)
+        self._connection.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [("version", str(BUNDLE_VERSION)), ("hash_method", HASH_METHOD)],
+        )
+        self._batch: list[tuple] = []
+        self.rows = 0
+
+    def write(self, unit: SplitUnit) -> None:
+        data = unit.text.encode(DEFAULT_ENCODING)
+        self._batch.append(
+            (
+                self.file_name(unit),
+                unit.trip_id,
+                unit.page,
+                unit.base,
+                unit.equipment,
+                unit.offset,
+                unit.length,
+                content_hash(data),
+                data,
+            )
+        )
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert the held trips, in one transaction."""
+        if not self._batch:
+            return
+        with self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(INSERT, self._batch)
+        self.rows += len(self._batch)
+        logger.debug("Inserted %s trips into %s.", len(self._batch), self._tmp_path)
+        self._batch.clear()
+
+    def close(self) -> list[Path]:
+        try:
+            self.flush()
+            self._connection.execute(INDEXES)
+        finally:
+            self._connection.close()
+        self._tmp_path.replace(self.output_path)
+        return [self.output_path]
+
+    def abort(self):
+        """Discard the bundle, leaving any earlier bundle in place."""
+        self._batch.clear()
+        self._connection.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"output_path={self.output_path!r}, batch_size={self.batch_size!r})"
+        )
+
+
+@dataclass
+class BundledTrip:
+    """A row of the trips table, without the text."""
+
+    name: str
+    trip_id: str
+    page: int
+    base: str
+    equipment: str
+    offset: int
+    length: int
+    hash: str
+
+
+class TripBundle:
+    """
+    Read a SQLite bundle of split trips.
+
+    Use as a context manager, or call :meth:`close`.
+
+    Raises:
+        ValueError: If `path` is not a bundle of this version.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            # Read only, so a missing file is an error rather than a new database.
+            self._connection = sqlite3.connect(
+                f"{path.resolve().as_uri()}?mode=ro", uri=True
+            )
+        except sqlite3.DatabaseError as error:
+            raise ValueError(f"Could not open {path}: {error}") from error
+        try:
+            meta = dict(self._connection.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError as error:
+            self.close()
+            raise ValueError(f"{path} is not a trip bundle.") from error
+        if meta.get("version") != str(BUNDLE_VERSION):
+            self.close()
+            raise ValueError(f"{path} is not a version {BUNDLE_VERSION} trip bundle.")
+        self.hash_method = meta["hash_method"]
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT count(*) FROM trips").fetchone()[0]
+
+    def trips(self, trip_ids: Iterable[str] | None = None) -> Iterator[BundledTrip]:
+        """The trips, in input order, optionally only those with `trip_ids`."""
+        query = f"SELECT {COLUMNS} FROM trips"
+        if trip_ids is None:
+            rows = self._connection.execute(f"{query} ORDER BY row")
+        else:
+            ids = list(trip_ids)
+            rows = self._connection.execute(
+                f"{query} WHERE trip_id IN ({', '.join('?' * len(ids))}) ORDER BY row",
+                ids,
+            )
+        for row in rows:
+            yield BundledTrip(*row)
+
+    def find(self, trip_id: str) -> BundledTrip:
+        """
+        The first trip with `trip_id`.
+
+        Raises:
+            KeyError: If there is no such trip.
+        """
+        for trip in self.trips([trip_id]):
+            return trip
+        raise KeyError(trip_id)
+
+    def data(self, name: str, verify: bool = True) -> bytes:
+        """
+        The text of a trip as bytes, by name.
+
+        Raises:
+            KeyError: If there is no such trip.
+            ValueError: If `verify` and the text does not match its hash.
+        """
+        row = self._connection.execute(
+            "SELECT text, hash FROM trips WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        data, expected = row
+        if verify:
+            actual = bytes_iterator_hash(iter((data,)), hashlib.new(self.hash_method))
+            if actual != expected:
+                raise ValueError(f"{name} in {self.path} does not match its hash.")
+        return data
+
+    def text(self, trip_id: str, verify: bool = True) -> str:
+        """The text of the first trip with `trip_id`."""
+        return self.data(self.find(trip_id).name, verify).decode(DEFAULT_ENCODING)
+
+    def export(
+        self,
+        output_dir: Path,
+        trip_ids: Iterable[str] | None = None,
+        verify: bool = True,
+    ) -> list[Path]:
+        """
+        Write trips to files in `output_dir`, as a text split would.
+
+        Args:
+            output_dir: The directory for the files.
+            trip_ids: Only export these trips. Defaults to every trip.
+            verify: Check the text of each trip against its hash.
+
+        Returns:
+            The files written.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for trip in self.trips(trip_ids):
+            path = output_dir / trip.name
+            path.write_bytes(self.data(trip.name, verify))
+            paths.append(path)
+        return paths
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self) -> "TripBundle":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r})"
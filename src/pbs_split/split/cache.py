@@ -0,0 +1,325 @@
+"""
+An incremental split cache, backed by a JSON manifest.
+
+Each entry is keyed by the hash of the input file, the splitter version and the
+split options. A file whose entry is found, and whose outputs still exist with
+the recorded sizes, does not need to be split again.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any
+
+from pbs_split.instrument import timer
+from pbs_split.snippets.hash.file_hash import HashedFileProtocol, make_hashed_file
+from pbs_split.split.chunked import split_file_chunked
+from pbs_split.split.formats import OutputFormat, WriterOptions, make_writer
+from pbs_split.split.index import (
+    StaleIndexError,
+    build_index,
+    load_index,
+    split_file_with_index,
+)
+from pbs_split.split.rules import DEFAULT_RULES, BoundaryRules
+from pbs_split.split.search import (
+    SearchIndexingWriter,
+    SegmentBuilder,
+    finish_search_index,
+    update_search_index,
+)
+from pbs_split.split.splitter import (
+    DEFAULT_ENCODING,
+    SPLITTER_VERSION,
+    SplitResult,
+    SplitStats,
+    SplitWriter,
+    log_metrics,
+    split_file,
+)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+CACHE_FILE_NAME = ".pbs-split-cache.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    input_path: str
+    input_hash: str
+    hash_method: str
+    splitter_version: str
+    options: dict[str, Any]
+    output_dir: str
+    outputs: list[tuple[str, int]]
+    stats: dict[str, int]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    bytes_skipped: int = 0
+
+    def update(self, other: "CacheStats"):
+        self.hits += other.hits
+        self.misses += other.misses
+        self.bytes_skipped += other.bytes_skipped
+
+
+@dataclass
+class CachedSplit:
+    result: SplitResult
+    hashed_file: HashedFileProtocol
+    cache_stats: CacheStats = field(default_factory=CacheStats)
+    new_entry: CacheEntry | None = None
+    # Whether the search segment was rebuilt, None if none was asked for.
+    search_rebuilt: bool | None = None
+
+
+def cache_key(input_hash: str, options: dict[str, Any]) -> str:
+    """Make the cache key for an input hash, the splitter version, and options."""
+    key_data = json.dumps(
+        {
+            "input_hash": input_hash,
+            "splitter_version": SPLITTER_VERSION,
+            "options": options,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(key_data.encode()).hexdigest()
+
+
+class SplitCache:
+    """
+    A persistent manifest of previous split results.
+
+    Args:
+        manifest_path: The JSON manifest file.
+        rebuild: Ignore existing entries, so that every file is split again.
+            New entries are still recorded.
+    """
+
+    def __init__(self, manifest_path: Path, rebuild: bool = False) -> None:
+        self.manifest_path = manifest_path
+        self.rebuild = rebuild
+        self.entries: dict[str, CacheEntry] = {}
+        self.stats = CacheStats()
+        self.load()
+
+    def load(self):
+        if not self.manifest_path.is_file():
+            return
+        try:
+            data = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable cache manifest %s", self.manifest_path)
+            return
+        if data.get("version") != MANIFEST_VERSION:
+            logger.info("Ignoring cache manifest version %s", data.get("version"))
+            return
+        for key, value in data.get("entries", {}).items():
+            value["outputs"] = [tuple(output) for output in value["outputs"]]
+            self.entries[key] = CacheEntry(**value)
+
+    def save(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "entries": {key: asdict(entry) for key, entry in self.entries.items()},
+        }
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self.manifest_path.write_text(json.dumps(data, indent=1))
+
+    def lookup(self, key: str, output_dir: Path) -> CacheEntry | None:
+        """
+        Find a valid entry for `key` that was split into `output_dir`.
+
+        An entry is valid if all of its outputs exist with the recorded size.
+        """
+        if self.rebuild:
+            return None
+        entry = self.entries.get(key)
+        if entry is None or entry.output_dir != str(output_dir):
+            return None
+        for name, size in entry.outputs:
+            output_file = output_dir / name
+            if not output_file.is_file() or output_file.stat().st_size != size:
+                logger.info("Cache entry for %s has a stale output", entry.input_path)
+                return None
+        return entry
+
+    def add(self, entry: CacheEntry):
+        """Add an entry, replacing any older entries for the same output dir."""
+        stale = [
+            key
+            for key, value in self.entries.items()
+            if value.output_dir == entry.output_dir
+        ]
+        for key in stale:
+            del self.entries[key]
+        self.entries[entry.key] = entry
+
+
+def cached_split_file(
+    input_path: Path,
+    output_dir: Path,
+    cache: SplitCache,
+    encoding: str = DEFAULT_ENCODING,
+    output_format: OutputFormat | str = OutputFormat.TEXT,
+    index: bool = False,
+    hashed_file: HashedFileProtocol | None = None,
+    rules: BoundaryRules | None = None,
+    jobs: int = 1,
+    writer_options: WriterOptions | None = None,
+    search: bool = False,
+) -> CachedSplit:
+    """
+    Split a file, unless a valid result is found in the cache.
+
+    The new cache entry, if any, is returned rather than added to `cache`, so
+    that this can run in a worker process against a read only copy of the
+    manifest.
+
+    Args:
+        input_path: The bid-package text file, or PDF.
+        output_dir: The directory for the split output.
+        cache: The split cache.
+        encoding: The text encoding of the input.
+        output_format: The output format.
+        index: Save a sidecar index next to the input. On a cache hit, the
+            index is only rebuilt if it is missing or stale.
+        hashed_file: The sha256 hash of the input, if already known.
+        rules: The boundary rules. Defaults to the standard layout.
+        jobs: Split a text input in this many parallel chunks, see
+            :mod:`pbs_split.split.chunked`. The output is the same either way,
+            so it is not part of the key.
+        writer_options: How the files of a text format are written, see
+            :class:`~pbs_split.split.formats.WriterOptions`. Only a manifest
+            changes the output, and is keyed.
+        search: Save a search segment in `output_dir`, built as the file is
+            split. On a cache hit, the segment is only rebuilt if it is missing
+            or stale.
+
+    Returns:
+        The split result, along with cache details.
+    """
+    start = perf_counter_ns()
+    output_format = OutputFormat(output_format)
+    options = {"encoding": encoding, "output_format": output_format.value}
+    if rules is not None and rules.config_hash() != DEFAULT_RULES.config_hash():
+        # Only non default rules are keyed, so existing entries stay valid.
+        options["rules"] = rules.config_hash()
+    if writer_options is not None and writer_options.manifest:
+        options["manifest"] = True
+    if hashed_file is None:
+        with timer("hash"):
+            hashed_file = make_hashed_file(input_path, hashlib.sha256())
+    key = cache_key(hashed_file.file_hash, options)
+    entry = cache.lookup(key, output_dir)
+    if entry is not None:
+        stats = SplitStats(**entry.stats)
+        logger.info("Cache hit for %s", input_path)
+        if index:
+            try:
+                load_index(input_path, rules)
+            except (OSError, ValueError, StaleIndexError):
+                build_index(
+                    input_path, encoding=encoding, hashed_file=hashed_file, rules=rules
+                )
+        result = SplitResult(
+            input_path=input_path,
+            output_path=output_dir,
+            stats=stats,
+            elapsed_ns=perf_counter_ns() - start,
+            outputs=[output_dir / name for name, _ in entry.outputs],
+            cached=True,
+        )
+        log_metrics(result)
+        search_rebuilt = None
+        if search:
+            _, search_rebuilt = update_search_index(
+                input_path,
+                output_dir,
+                hashed_file=hashed_file,
+                encoding=encoding,
+                rules=rules,
+            )
+        return CachedSplit(
+            result=result,
+            hashed_file=hashed_file,
+            cache_stats=CacheStats(hits=1, bytes_skipped=stats.bytes_read),
+            search_rebuilt=search_rebuilt,
+        )
+    builder = SegmentBuilder(rules) if search and (index or jobs <= 1) else None
+
+    def make_split_writer() -> SplitWriter:
+        writer = make_writer(output_format, output_dir, writer_options)
+        return writer if builder is None else SearchIndexingWriter(writer, builder)
+
+    if index:
+        result, _ = split_file_with_index(
+            input_path=input_path,
+            output_dir=output_dir,
+            writer=make_split_writer(),
+            encoding=encoding,
+            hashed_file=hashed_file,
+            rules=rules,
+        )
+    elif jobs > 1:
+        result = split_file_chunked(
+            input_path,
+            output_dir,
+            output_format,
+            jobs=jobs,
+            encoding=encoding,
+            rules=rules,
+            options=writer_options,
+        )
+    else:
+        result = split_file(
+            input_path=input_path,
+            output_dir=output_dir,
+            writer=make_split_writer(),
+            encoding=encoding,
+            rules=rules,
+        )
+    search_rebuilt = None
+    if builder is not None:
+        finish_search_index(input_path, output_dir, builder, hashed_file)
+        search_rebuilt = True
+    elif search:
+        # Chunks are split in worker processes, so the segment is built after.
+        _, search_rebuilt = update_search_index(
+            input_path,
+            output_dir,
+            hashed_file=hashed_file,
+            encoding=encoding,
+            rules=rules,
+        )
+    new_entry = CacheEntry(
+        key=key,
+        input_path=str(input_path),
+        input_hash=hashed_file.file_hash,
+        hash_method=hashed_file.hash_method,
+        splitter_version=SPLITTER_VERSION,
+        options=options,
+        output_dir=str(output_dir),
+        outputs=[
+            (str(output.relative_to(output_dir)), output.stat().st_size)
+            for output in result.outputs
+        ],
+        stats=asdict(result.stats),
+    )
+    return CachedSplit(
+        result=result,
+        hashed_file=hashed_file,
+        cache_stats=CacheStats(misses=1),
+        new_entry=new_entry,
+        search_rebuilt=search_rebuilt,
+    )
@@ -0,0 +1,325 @@
+"""
+Resumable, checkpointed splitting.
+
+While a large package is split, a checkpoint is saved in the output directory
+every so many bytes of input, so a split that dies halfway can carry on from
+its last checkpoint rather than from the start of the input. A checkpoint
+records:
+
+* the hash of the input, and the split options, which must still match.
+* the byte offset just after the last trip closed by a ``TTL`` line, and the
+  page, base and equipment at that point.
+* the split stats so far.
+* a running hash of the trips written so far, each hash chaining the previous
+  one with the name and text of the next trip, so a resumed split ends with the
+  same hash as a split run straight through.
+
+The names of the files written are appended to a journal next to the
+checkpoint, and the checkpoint records how much of the journal it covers, so
+saving a checkpoint costs the same however many trips came before it. Both are
+removed when the split completes.
+
+Only the ``text`` formats, one file per trip, can be resumed. A PDF can not be
+resumed, as its offsets are into the extracted text.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, BinaryIO, Iterable
+
+from pbs_split.instrument import count, current_instruments, timer
+from pbs_split.snippets.hash.bytes_iterator_hash import bytes_iterator_hash
+from pbs_split.snippets.hash.file_hash import HashedFileProtocol, make_hashed_file
+from pbs_split.split.compression import is_compressed, open_compressed
+from pbs_split.split.formats import TEXT_FORMATS, OutputFormat, make_writer
+from pbs_split.split.pdf import is_pdf
+from pbs_split.split.rules import DEFAULT_RULES, BoundaryRules
+from pbs_split.split.splitter import (
+    DEFAULT_ENCODING,
+    SPLITTER_VERSION,
+    SplitContext,
+    SplitResult,
+    SplitStats,
+    TextDirectoryWriter,
+    iter_raw_lines,
+    iter_split_units,
+    log_metrics,
+)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+CHECKPOINT_FILE_NAME = ".pbs-split-checkpoint.json"
+JOURNAL_FILE_NAME = ".pbs-split-journal.txt"
+CHECKPOINT_VERSION = 1
+HASH_METHOD = "sha256"
+DEFAULT_CHECKPOINT_BYTES = 2**20 * 64
+# The chained output hash before any trip is written.
+EMPTY_DIGEST = hashlib.new(HASH_METHOD).hexdigest()
+
+
+@dataclass
+class SplitCheckpoint:
+    """The state of a split, saved so it can be carried on later."""
+
+    input_path: str
+    input_hash: str
+    hash_method: str
+    options: dict[str, Any]
+    context: dict[str, Any] = field(default_factory=lambda: asdict(SplitContext()))
+    stats: dict[str, int] = field(default_factory=lambda: asdict(SplitStats()))
+    last_unit: str = ""
+    outputs_digest: str = EMPTY_DIGEST
+    journal_size: int = 0
+
+    @property
+    def offset(self) -> int:
+        return self.context["offset"]
+
+    def save(self, checkpoint_path: Path):
+        """Save the checkpoint, replacing any earlier one in a single rename."""
+        data = {"version": CHECKPOINT_VERSION, **asdict(self)}
+        tmp_path = checkpoint_path.with_name(f"{checkpoint_path.name}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2))
+        tmp_path.replace(checkpoint_path)
+
+    @classmethod
+    def load(cls, checkpoint_path: Path) -> "SplitCheckpoint":
+        """
+        Raises:
+            ValueError: If the file is not a checkpoint of this version.
+        """
+        try:
+            data = json.loads(checkpoint_path.read_text())
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{checkpoint_path} is not a checkpoint.") from error
+        if data.pop("version", None) != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"{checkpoint_path} is not a version {CHECKPOINT_VERSION} checkpoint."
+            )
+        return cls(**data)
+
+
+def checkpoint_path_for(output_dir: Path) -> Path:
+    return output_dir / CHECKPOINT_FILE_NAME
+
+
+def chain_digest(previous: str, name: str, data: bytes) -> str:
+    """Chain the hash of the trips written so far with the next trip."""
+    return bytes_iterator_hash(
+        iter((bytes.fromhex(previous), name.encode(), b"\0", data)),
+        hashlib.new(HASH_METHOD),
+    )
+
+
+def check_resumable(input_path: Path, output_format: OutputFormat | str):
+    """
+    Raises:
+        ValueError: If a split of `input_path` to `output_format` can not be
+            resumed.
+    """
+    if is_pdf(input_path):
+        raise ValueError(f"A split of {input_path} can not be resumed, as it is a PDF.")
+    if OutputFormat(output_format) not in TEXT_FORMATS:
+        raise ValueError(
+            f"A split to {OutputFormat(output_format).value} can not be resumed, "
+            "use a text format."
+        )
+
+
+def _open_at(input_path: Path, offset: int) -> BinaryIO:
+    """Open the input, positioned at `offset` into its decompressed text."""
+    file_handle: BinaryIO = open_compressed(input_path)
+    if not is_compressed(input_path):
+        file_handle.seek(offset)
+        return file_handle
+    # A compressed stream can only be read forward, which still skips the split.
+    remaining = offset
+    while remaining and (block := file_handle.read(min(remaining, 2**20))):
+        remaining -= len(block)
+    return file_handle
+
+
+def _read_journal(journal_path: Path, size: int) -> list[tuple[str, str]]:
+    """
+    Cut the journal back to `size` bytes, dropping trips written after the
+    checkpoint, and read it.
+
+    Returns:
+        The trip id and file name of each trip written.
+    """
+    with open(journal_path, mode="r+b") as file_handle:
+        file_handle.truncate(size)
+        lines = file_handle.read().decode(DEFAULT_ENCODING).splitlines()
+    return [tuple(line.split("\t", 1)) for line in lines]  # type: ignore[misc]
+
+
+def split_file_checkpointed(
+    input_path: Path,
+    output_dir: Path,
+    output_format: OutputFormat | str = OutputFormat.TEXT,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+    resume: bool = False,
+    checkpoint_bytes: int = DEFAULT_CHECKPOINT_BYTES,
+    hashed_file: HashedFileProtocol | None = None,
+) -> SplitResult:
+    """
+    Split a package, saving checkpoints as it goes.
+
+    Args:
+        input_path: The bid-package text file, which may be compressed.
+        output_dir: The directory for the split output, and the checkpoint.
+        output_format: A ``text`` output format.
+        encoding: The text encoding of the input.
+        rules: The boundary rules. Defaults to the standard layout.
+        resume: Carry on from the checkpoint in `output_dir`, if there is one.
+            Otherwise any checkpoint is ignored, and the split starts over.
+        checkpoint_bytes: Save a checkpoint every this many bytes of input.
+        hashed_file: The sha256 hash of the input, if already known.
+
+    Raises:
+        ValueError: If the split can not be resumed, or the checkpoint does not
+            match the input or the options.
+
+    Returns:
+        The split result, with every output of the split, including those
+        written before resuming.
+    """
+    start = perf_counter_ns()
+    check_resumable(input_path, output_format)
+    output_format = OutputFormat(output_format)
+    if hashed_file is None:
+        with timer("hash"):
+            hashed_file = make_hashed_file(input_path, hashlib.new(HASH_METHOD))
+    options = {
+        "splitter_version": SPLITTER_VERSION,
+        "encoding": encoding,
+        "output_format": output_format.value,
+        "rules": (rules or DEFAULT_RULES).config_hash(),
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = checkpoint_path_for(output_dir)
+    journal_path = output_dir / JOURNAL_FILE_NAME
+    checkpoint = SplitCheckpoint(
+        input_path=str(input_path),
+        input_hash=hashed_file.file_hash,
+        hash_method=hashed_file.hash_method,
+        options=options,
+    )
+    written: list[tuple[str, str]] = []
+    if resume and checkpoint_path.is_file():
+        saved = SplitCheckpoint.load(checkpoint_path)
+        if (saved.input_hash, saved.hash_method) != (
+            checkpoint.input_hash,
+            checkpoint.hash_method,
+        ):
+            raise ValueError(
+                f"{input_path} has changed since the checkpoint in {output_dir}, "
+                "split it again without resuming."
+            )
+        if saved.options != options:
+            raise ValueError(
+                f"The checkpoint in {output_dir} was saved with other options, "
+                "split it again without resuming."
+            )
+        checkpoint = saved
+        written = _read_journal(journal_path, checkpoint.journal_size)
+        try:
+            digest = outputs_digest(output_dir / name for _, name in written)
+        except FileNotFoundError as error:
+            digest = str(error)
+        if digest != checkpoint.outputs_digest:
+            raise ValueError(
+                f"The trips split into {output_dir} before the checkpoint have "
+                "changed, split it again without resuming."
+            )
+        logger.info(
+            "Resuming the split of %s at byte %s, after trip %s.",
+            input_path,
+            checkpoint.offset,
+            checkpoint.last_unit,
+        )
+    else:
+        journal_path.write_bytes(b"")
+    writer = make_writer(output_format, output_dir)
+    assert isinstance(writer, TextDirectoryWriter)
+    for trip_id, _ in written:
+        writer.seen[trip_id] = writer.seen.get(trip_id, 0) + 1
+    outputs = [output_dir / name for _, name in written]
+    write = writer.write
+    if (instruments := current_instruments()) is not None:
+        write = instruments.timed_call("write", write)
+    context = SplitContext(**checkpoint.context)
+    stats = SplitStats(**checkpoint.stats)
+    resumed = SplitStats(**checkpoint.stats)
+    digest = checkpoint.outputs_digest
+    next_checkpoint = context.offset + checkpoint_bytes
+    with (
+        _open_at(input_path, context.offset) as file_handle,
+        open(journal_path, mode="ab") as journal,
+    ):
+        for unit in iter_split_units(
+            iter_raw_lines(file_handle, start=context.offset),
+            stats=stats,
+            encoding=encoding,
+            rules=rules,
+            context=context,
+        ):
+            output = write(unit)
+            outputs.append(output)
+            digest = chain_digest(
+                digest, output.name, unit.text.encode(DEFAULT_ENCODING)
+            )
+            journal.write(f"{unit.trip_id}\t{output.name}\n".encode(DEFAULT_ENCODING))
+            # Only a trip closed by a TTL line moves the context on.
+            if (
+                context.offset == unit.offset + unit.length
+                and context.offset >= next_checkpoint
+            ):
+                journal.flush()
+                checkpoint.context = asdict(context)
+                checkpoint.stats = asdict(stats)
+                checkpoint.last_unit = output.name
+                checkpoint.outputs_digest = digest
+                checkpoint.journal_size = journal.tell()
+                checkpoint.save(checkpoint_path)
+                next_checkpoint = context.offset + checkpoint_bytes
+                logger.debug("Checkpoint at byte %s of %s.", context.offset, input_path)
+    outputs.extend(writer.close())
+    checkpoint_path.unlink(missing_ok=True)
+    journal_path.unlink(missing_ok=True)
+    elapsed_ns = perf_counter_ns() - start
+    count("bytes", stats.bytes_read - resumed.bytes_read)
+    count("pages", stats.pages - resumed.pages)
+    count("trips", stats.units - resumed.units)
+    logger.info(
+        "Split %s into %s trips from %s pages in %sns, output hash %s.",
+        input_path,
+        stats.units,
+        stats.pages,
+        elapsed_ns,
+        digest,
+    )
+    result = SplitResult(
+        input_path=input_path,
+        output_path=output_dir,
+        stats=stats,
+        elapsed_ns=elapsed_ns,
+        outputs=outputs,
+    )
+    log_metrics(result)
+    return result
+
+
+def outputs_digest(outputs: Iterable[Path]) -> str:
+    """The chained hash of the files of a text split, as a checkpoint records it."""
+    digest = EMPTY_DIGEST
+    for output in outputs:
+        with open_compressed(output) as file_handle:
+            digest = chain_digest(digest, output.name, file_handle.read())
+    return digest
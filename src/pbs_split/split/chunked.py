@@ -0,0 +1,353 @@
+"""
+Split a single large package in parallel chunks.
+
+The input is cut into one byte range per worker, and each cut is moved forward
+to the next page break whose page opens with a page header, so a worker starting
+there begins with the same page, base and equipment as the serial splitter
+would have. Workers are handed the path and byte range, not the text, and read
+their range through ``mmap``.
+
+A trip belongs to the chunk it starts in. A worker carries on past the end of
+its range to finish its last trip, and skips the end of a trip that started in
+the chunk before, as the serial splitter skips any line outside a trip.
+
+Workers write their trips straight into the output directory. A file name only
+depends on the trips before it when its trip id is repeated, e.g. ``1234-2``,
+so once every chunk is done, the trips with a repeated id are split again from
+their offsets and written under the names the serial splitter gives them. The
+output is the same as :func:`~pbs_split.split.splitter.split_file`, file for
+file and byte for byte.
+
+Only uncompressed text inputs split to a ``text`` format can be chunked, other
+inputs are split serially.
+"""
+
+import logging
+import mmap
+import os
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import astuple, dataclass, field, replace
+from multiprocessing.queues import Queue
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Iterator
+
+from pbs_split.instrument import count
+from pbs_split.split.atomic import AtomicTextWriter, save_manifest
+from pbs_split.split.boundaries import PAGE_BREAK, LineKind
+from pbs_split.split.compression import is_compressed
+from pbs_split.split.formats import (
+    TEXT_FORMATS,
+    FsyncPolicy,
+    OutputFormat,
+    WriterOptions,
+    make_writer,
+)
+from pbs_split.split.pdf import is_pdf
+from pbs_split.split.rules import BoundaryRules, compile_rules
+from pbs_split.split.splitter import (
+    DEFAULT_ENCODING,
+    SplitResult,
+    SplitStats,
+    TextDirectoryWriter,
+    abort_writer,
+    iter_split_units,
+    log_metrics,
+    metrics_logger,
+    split_file,
+)
+from pbs_split.split.worker_logging import init_worker_logging, worker_logging
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Smaller chunks are not worth the cost of starting a worker.
+MIN_CHUNK_BYTES = 2**20 * 4
+PAGE_START = b"\n" + PAGE_BREAK.encode()
+
+
+@dataclass
+class ChunkResult:
+    """
+    The trips of one chunk, in order, as trip id, page and offset, and the
+    stats of its byte range.
+    """
+
+    start: int
+    end: int
+    stats: SplitStats
+    trips: list[tuple[str, int, int]] = field(default_factory=list)
+    # The hash of each trip, when a manifest is asked for.
+    hashes: list[str] = field(default_factory=list)
+
+
+def can_chunk(input_path: Path, output_format: OutputFormat | str) -> bool:
+    return (
+        not is_pdf(input_path)
+        and not is_compressed(input_path)
+        and OutputFormat(output_format) in TEXT_FORMATS
+    )
+
+
+def iter_mapped_lines(mapped: mmap.mmap, start: int) -> Iterator[tuple[int, bytes]]:
+    """
+    Iterate over the lines of a mapped file from `start`, as
+    :func:`~pbs_split.split.splitter.iter_raw_lines`.
+    """
+    mapped.seek(start)
+    readline = mapped.readline
+    offset = start
+    while raw_line := readline():
+        yield offset, raw_line
+        offset += len(raw_line)
+
+
+def _opens_with_header(
+    mapped: mmap.mmap, offset: int, encoding: str, rules: BoundaryRules | None
+) -> bool:
+    """Whether the first line with text from `offset` is a page header."""
+    classify = compile_rules(rules).classify
+    for _, raw_line in iter_mapped_lines(mapped, offset):
+        line = raw_line.decode(encoding, errors="replace").lstrip(PAGE_BREAK)
+        kind, _ = classify(line)
+        if kind != LineKind.BLANK:
+            return kind == LineKind.PAGE_HEADER
+    return False
+
+
+def page_aligned_cuts(
+    mapped: mmap.mmap,
+    chunks: int,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> list[int]:
+    """
+    Cut a mapped package into about `chunks` byte ranges, at page boundaries.
+
+    Returns:
+        The start of each range, the first being 0.
+    """
+    size = len(mapped)
+    cuts = [0]
+    for number in range(1, chunks):
+        target = max(size * number // chunks, cuts[-1] + 1)
+        # A page break at the start of a line, whose page opens with a header.
+        while (found := mapped.find(PAGE_START, target - 1)) != -1:
+            target = found + 1
+            if _opens_with_header(mapped, target, encoding, rules):
+                cuts.append(target)
+                break
+            target += 1
+        else:
+            break
+    return cuts
+
+
+def split_chunk(
+    input_path: Path,
+    output_dir: Path,
+    start: int,
+    end: int,
+    output_format: OutputFormat,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+    options: WriterOptions | None = None,
+) -> ChunkResult:
+    """
+    Split the trips starting in the byte range `start` to `end` of a package.
+
+    The manifest of `options` is left to the caller, which has every chunk.
+    """
+    manifest = options is not None and options.manifest
+    if options is not None:
+        options = replace(options, manifest=False)
+    writer = make_writer(output_format, output_dir, options)
+    stats = SplitStats()
+    result = ChunkResult(start=start, end=end, stats=stats)
+
+    def ranged_lines(lines: Iterator[tuple[int, bytes]]) -> Iterator[tuple[int, bytes]]:
+        for offset, raw_line in lines:
+            if offset == end:
+                # The lines past the end of the range belong to the next chunk.
+                result.stats = replace(stats)
+            yield offset, raw_line
+
+    with (
+        open(input_path, mode="rb") as file_handle,
+        mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        try:
+            for unit in iter_split_units(
+                ranged_lines(iter_mapped_lines(mapped, start)),
+                stats=stats,
+                encoding=encoding,
+                rules=rules,
+            ):
+                if unit.offset >= end:
+                    break
+                writer.write(unit)
+                result.trips.append((unit.trip_id, unit.page, unit.offset))
+        except BaseException:
+            abort_writer(writer)
+            raise
+        outputs = writer.close()
+    if manifest:
+        assert isinstance(writer, AtomicTextWriter)
+        result.hashes = [writer.hashes[output.name] for output in outputs]
+    result.stats.units = len(result.trips)
+    return result
+
+
+def init_chunk_worker(
+    log_queue: "Queue[logging.LogRecord] | None" = None, level: int = logging.WARNING
+):
+    # As batch.init_worker, metrics are logged by the parent.
+    metrics_logger.disabled = True
+    init_worker_logging(log_queue, level)
+
+
+def split_file_chunked(
+    input_path: Path,
+    output_dir: Path,
+    output_format: OutputFormat | str = OutputFormat.TEXT,
+    jobs: int | None = None,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+    min_chunk_bytes: int = MIN_CHUNK_BYTES,
+    options: WriterOptions | None = None,
+) -> SplitResult:
+    """
+    Split a package in parallel chunks, on a process pool.
+
+    Args:
+        input_path: The bid-package text file.
+        output_dir: The directory for the split output.
+        output_format: The output format.
+        jobs: The number of worker processes. Defaults to the cpu count.
+        encoding: The text encoding of the input.
+        rules: The boundary rules. Defaults to the standard layout.
+        min_chunk_bytes: The smallest chunk worth a worker.
+        options: How the files are written, see
+            :class:`~pbs_split.split.formats.WriterOptions`.
+
+    Returns:
+        The split result, the same as :func:`~pbs_split.split.splitter.split_file`
+        but for the elapsed time.
+    """
+    start = perf_counter_ns()
+    output_format = OutputFormat(output_format)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    size = input_path.stat().st_size
+    jobs = min(jobs, size // max(min_chunk_bytes, 1))
+    if jobs <= 1 or not can_chunk(input_path, output_format):
+        return split_file(
+            input_path,
+            output_dir,
+            writer=make_writer(output_format, output_dir, options),
+            encoding=encoding,
+            rules=rules,
+        )
+    with (
+        open(input_path, mode="rb") as file_handle,
+        mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        cuts = page_aligned_cuts(mapped, jobs, encoding, rules)
+    ranges = list(zip(cuts, cuts[1:] + [size]))
+    logger.info("Splitting %s in %s chunks.", input_path, len(ranges))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with (
+        worker_logging() as log_args,
+        ProcessPoolExecutor(
+            max_workers=len(ranges), initializer=init_chunk_worker, initargs=log_args
+        ) as executor,
+    ):
+        futures: list[Future[ChunkResult]] = [
+            executor.submit(
+                split_chunk,
+                input_path,
+                output_dir,
+                chunk_start,
+                chunk_end,
+                output_format,
+                encoding,
+                rules,
+                options,
+            )
+            for chunk_start, chunk_end in ranges
+        ]
+        chunks = [future.result() for future in futures]
+    stats = SplitStats()
+    for chunk in chunks:
+        stats = SplitStats(
+            *(
+                total + value
+                for total, value in zip(astuple(stats), astuple(chunk.stats))
+            )
+        )
+    manifest = options is not None and options.manifest
+    if options is not None:
+        options = replace(options, manifest=False)
+    writer = make_writer(output_format, output_dir, options)
+    assert isinstance(writer, TextDirectoryWriter)
+    trip_ids = Counter(trip_id for chunk in chunks for trip_id, _, _ in chunk.trips)
+    outputs: list[Path] = []
+    # The hash of each trip, or None for those written here.
+    hashes: list[str | None] = []
+    with (
+        open(input_path, mode="rb") as file_handle,
+        mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        for chunk in chunks:
+            for number, (trip_id, page, offset) in enumerate(chunk.trips):
+                name = writer.name_for(trip_id, page)
+                if trip_ids[trip_id] == 1:
+                    hashes.append(chunk.hashes[number] if manifest else None)
+                else:
+                    # Chunks may have written this name for another trip.
+                    unit = next(
+                        iter_split_units(
+                            iter_mapped_lines(mapped, offset),
+                            encoding=encoding,
+                            rules=rules,
+                        )
+                    )
+                    writer.write_named(name, unit.text)
+                    hashes.append(None)
+                outputs.append(output_dir / name)
+    # Any files written here are already in `outputs`.
+    writer.close()
+    if manifest:
+        assert isinstance(writer, AtomicTextWriter)
+        outputs.append(
+            save_manifest(
+                output_dir,
+                (
+                    (output.name, digest or writer.hashes[output.name])
+                    for output, digest in zip(outputs, hashes)
+                ),
+                sync=writer.fsync != FsyncPolicy.NONE,
+            )
+        )
+    elapsed_ns = perf_counter_ns() - start
+    count("bytes", stats.bytes_read)
+    count("pages", stats.pages)
+    count("trips", stats.units)
+    logger.info(
+        "Split %s into %s trips from %s pages in %sns, in %s chunks.",
+        input_path,
+        stats.units,
+        stats.pages,
+        elapsed_ns,
+        len(ranges),
+    )
+    result = SplitResult(
+        input_path=input_path,
+        output_path=output_dir,
+        stats=stats,
+        elapsed_ns=elapsed_ns,
+        outputs=outputs,
+    )
+    log_metrics(result)
+    return result
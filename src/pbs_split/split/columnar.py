@@ -0,0 +1,324 @@
+"""
+A compact columnar binary format for split trips.
+
+The file holds one fixed-width column per trip attribute, and a string table
+for the text values. Text columns store an index into the string table. Every
+column is 8 byte aligned, so a column can be used straight from an ``mmap``, or
+as a ``numpy.memmap``, without parsing.
+
+Layout, all values little-endian::
+
+    header        magic, version, column count, row count, string count,
+                  string table offset
+    directory     name, kind, typecode, offset and size of each column
+    columns       fixed-width column data
+    string table  (string count + 1) uint64 offsets into the string data
+    string data   utf-8 encoded strings
+"""
+
+import logging
+import mmap
+import shutil
+import struct
+import sys
+from array import array
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Iterator
+
+from pbs_split.instrument import timer
+from pbs_split.parse import ParseError, parse_trip
+from pbs_split.split.splitter import DEFAULT_ENCODING, SplitUnit
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+COLUMNAR_FILE_NAME = "trips.pbsc"
+MAGIC = b"PBSCOL\x00\x01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+DIRECTORY_ENTRY = struct.Struct("<16scc6xQQ")
+ALIGNMENT = 8
+
+# name: (kind, typecode). Kind "n" is numeric, kind "s" is a string table index.
+# "layovers" holds the layover stations of a trip, separated by spaces.
+COLUMNS: dict[str, tuple[str, str]] = {
+    "trip_id": ("s", "i"),
+    "base": ("s", "i"),
+    "equipment": ("s", "i"),
+    "page": ("n", "i"),
+    "ops": ("n", "i"),
+    "days": ("n", "i"),
+    "report": ("n", "i"),
+    "block": ("n", "i"),
+    "credit": ("n", "i"),
+    "tafb": ("n", "i"),
+    "duty_periods": ("n", "i"),
+    "legs": ("n", "i"),
+    "offset": ("n", "q"),
+    "length": ("n", "q"),
+    "layovers": ("s", "i"),
+    "text": ("s", "i"),
+}
+NUMPY_DTYPES = {"i": "<i4", "q": "<i8"}
+
+
+def _aligned(position: int) -> int:
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _native(data: memoryview, typecode: str) -> memoryview:
+    """Little-endian values as native values, a zero-copy view where possible."""
+    if sys.byteorder == "big":
+        values = array(typecode, data.tobytes())
+        values.byteswap()
+        return memoryview(values)
+    return data.cast(typecode)
+
+
+class ColumnarWriter:
+    """
+    Write split trips to a columnar binary file.
+
+    Numeric columns are kept in memory as compact arrays, while string data is
+    streamed to a temporary file, so memory use stays small for large inputs.
+    The columnar file is written when the writer is closed.
+    """
+
+    def __init__(self, output_dir: Path, file_name: str = COLUMNAR_FILE_NAME) -> None:
+        self.output_dir = output_dir
+        self.output_path = output_dir / file_name
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._columns = {
+            name: array(typecode) for name, (_, typecode) in COLUMNS.items()
+        }
+        self._string_offsets = array("Q", [0])
+        self._string_index: dict[str, int] = {}
+        self._strings_path = self.output_path.with_suffix(".strings.tmp")
+        self._strings = open(self._strings_path, mode="wb")
+
+    def add_string(self, value: str, dedupe: bool = True) -> int:
+        """Add a string to the string table, returning its index."""
+        if dedupe and (index := self._string_index.get(value)) is not None:
+            return index
+        index = len(self._string_offsets) - 1
+        encoded = value.encode(DEFAULT_ENCODING)
+        self._strings.write(encoded)
+        self._string_offsets.append(self._string_offsets[-1] + len(encoded))
+        if dedupe:
+            self._string_index[value] = index
+        return index
+
+    def write(self, unit: SplitUnit) -> Path | None:
+        layovers = ""
+        try:
+            with timer("parse"):
+                trip = parse_trip(unit)
+            values = {
+                "ops": trip.ops,
+                "days": trip.days,
+                "report": trip.report,
+                "block": trip.block,
+                "credit": trip.credit,
+                "tafb": trip.tafb,
+                "duty_periods": len(trip.duty_periods),
+                "legs": sum(len(duty.legs) for duty in trip.duty_periods),
+            }
+            layovers = " ".join(trip.layover_stations())
+        except ParseError as error:
+            logger.warning("%s", error)
+            values = {}
+        values["trip_id"] = self.add_string(unit.trip_id)
+        values["base"] = self.add_string(unit.base)
+        values["equipment"] = self.add_string(unit.equipment)
+        values["layovers"] = self.add_string(layovers)
+        values["text"] = self.add_string(unit.text, dedupe=False)
+        values["page"] = unit.page
+        values["offset"] = unit.offset
+        values["length"] = unit.length
+        for name, column in self._columns.items():
+            column.append(values.get(name, 0))
+        return None
+
+    def close(self) -> list[Path]:
+        self._strings.close()
+        row_count = len(self._columns["trip_id"])
+        position = HEADER.size + DIRECTORY_ENTRY.size * len(self._columns)
+        directory = []
+        column_data = []
+        for name, column in self._columns.items():
+            position = _aligned(position)
+            data = _little_endian(column)
+            kind, typecode = COLUMNS[name]
+            directory.append(
+                DIRECTORY_ENTRY.pack(
+                    name.encode(), kind.encode(), typecode.encode(), position, len(data)
+                )
+            )
+            column_data.append((position, data))
+            position += len(data)
+        string_table_offset = _aligned(position)
+        header = HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            len(self._columns),
+            row_count,
+            len(self._string_offsets) - 1,
+            string_table_offset,
+        )
+        with open(self.output_path, mode="wb") as file_handle:
+            file_handle.write(header)
+            for entry in directory:
+                file_handle.write(entry)
+            for position, data in column_data:
+                file_handle.write(b"\x00" * (position - file_handle.tell()))
+                file_handle.write(data)
+            file_handle.write(b"\x00" * (string_table_offset - file_handle.tell()))
+            file_handle.write(_little_endian(self._string_offsets))
+            with open(self._strings_path, mode="rb") as strings:
+                shutil.copyfileobj(strings, file_handle)
+        self._strings_path.unlink()
+        return [self.output_path]
+
+    def abort(self):
+        """Discard the trips, leaving any earlier columnar file in place."""
+        self._strings.close()
+        self._strings_path.unlink(missing_ok=True)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(output_dir={self.output_dir!r})"
+
+
+class ColumnarTrips:
+    """
+    Read a columnar trip file lazily, through ``mmap``.
+
+    Columns are returned as zero-copy views of the mapped file, or as byte
+    swapped copies on a big-endian host. Use as a context
+    manager, or call :meth:`close`, to release the mapping::
+
+        with ColumnarTrips(path) as trips:
+            credit = trips.column("credit")
+            first_ten = trips.rows(0, 10)
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = open(path, mode="rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        (
+            magic,
+            version,
+            column_count,
+            self.row_count,
+            self.string_count,
+            string_table_offset,
+        ) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} columnar file.")
+        self._directory: dict[str, tuple[str, str, int, int]] = {}
+        for idx in range(column_count):
+            name, kind, typecode, offset, size = DIRECTORY_ENTRY.unpack_from(
+                self._mmap, HEADER.size + idx * DIRECTORY_ENTRY.size
+            )
+            self._directory[name.rstrip(b"\x00").decode()] = (
+                kind.decode(),
+                typecode.decode(),
+                offset,
+                size,
+            )
+        string_table_size = (self.string_count + 1) * 8
+        self._string_offsets = _native(
+            self._view[string_table_offset : string_table_offset + string_table_size],
+            "Q",
+        )
+        self._string_data = string_table_offset + string_table_size
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._directory)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def raw_column(self, name: str) -> memoryview:
+        """
+        A zero-copy view of a column. On a big-endian host, the column is
+        copied and byte swapped.
+
+        String columns hold indexes into the string table, see :meth:`string`.
+        """
+        _, typecode, offset, size = self._directory[name]
+        return _native(self._view[offset : offset + size], typecode)
+
+    def column(self, name: str, start: int = 0, stop: int | None = None) -> Any:
+        """
+        The values of a column, for a slice of trips.
+
+        Numeric columns are returned as a memoryview, string columns as a list
+        of str.
+        """
+        kind = self._directory[name][0]
+        values = self.raw_column(name)[start:stop]
+        if kind == "s":
+            return [self.string(index) for index in values]
+        return values
+
+    def numpy_column(self, name: str) -> Any:
+        """
+        A column as a read only numpy array backed by the mapped file.
+
+        Requires numpy.
+        """
+        import numpy  # pylint: disable=import-outside-toplevel
+
+        _, typecode, offset, size = self._directory[name]
+        dtype = numpy.dtype(NUMPY_DTYPES[typecode])
+        return numpy.frombuffer(
+            self._mmap, dtype=dtype, count=size // dtype.itemsize, offset=offset
+        )
+
+    def string(self, index: int) -> str:
+        start = self._string_data + self._string_offsets[index]
+        stop = self._string_data + self._string_offsets[index + 1]
+        return str(self._view[start:stop], DEFAULT_ENCODING)
+
+    def rows(self, start: int = 0, stop: int | None = None) -> Iterator[dict[str, Any]]:
+        """Iterate over a slice of trips, as dicts of column name to value."""
+        columns = {name: self.column(name, start, stop) for name in self._directory}
+        for idx in range(len(range(self.row_count)[start:stop])):
+            yield {name: values[idx] for name, values in columns.items()}
+
+    def close(self):
+        self._string_offsets = None  # type: ignore[assignment]
+        self._view = None  # type: ignore[assignment]
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Columns handed out are still in use, the mapping is released
+            # when they are garbage collected.
+            logger.debug("%r closed with columns still in use.", self)
+        self._file.close()
+
+    def __enter__(self) -> "ColumnarTrips":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r})"
@@ -0,0 +1,125 @@
+"""
+Compressed input and output streams.
+
+Bid packages and split output can be gzip, xz or zstd compressed. The format is
+chosen by file suffix, and files are decompressed and compressed as streams, so
+no uncompressed copy is ever written to disk.
+
+zstd requires the zstandard package, ``pip install pbs-split[zstd]``. gzip and
+xz use the standard library.
+"""
+
+import gzip
+import io
+import lzma
+from enum import Enum
+from pathlib import Path
+from typing import BinaryIO, Literal
+
+ZSTD_REQUIRED = "zstd compression requires zstandard, pip install pbs-split[zstd]"
+
+
+class Compression(str, Enum):
+    NONE = "none"
+    GZIP = "gzip"
+    XZ = "xz"
+    ZSTD = "zstd"
+
+
+COMPRESSION_SUFFIXES = {
+    Compression.GZIP: ".gz",
+    Compression.XZ: ".xz",
+    Compression.ZSTD: ".zst",
+}
+# Levels chosen for speed over size, output is written as fast as it is split.
+DEFAULT_LEVELS = {Compression.GZIP: 6, Compression.XZ: 1, Compression.ZSTD: 3}
+
+
+def compression_for(path: Path) -> Compression:
+    """The compression of a file, from its suffix."""
+    suffix = path.suffix.lower()
+    for compression, compression_suffix in COMPRESSION_SUFFIXES.items():
+        if suffix == compression_suffix:
+            return compression
+    return Compression.NONE
+
+
+def is_compressed(path: Path) -> bool:
+    return compression_for(path) != Compression.NONE
+
+
+def compressed_name(name: str, compression: Compression | str) -> str:
+    """Add the suffix for `compression` to a file name."""
+    return name + COMPRESSION_SUFFIXES.get(Compression(compression), "")
+
+
+def uncompressed_path(path: Path) -> Path:
+    """The path without a compression suffix, e.g. ``package.txt.gz`` to ``package.txt``."""
+    if is_compressed(path):
+        return path.with_suffix("")
+    return path
+
+
+def input_stem(path: Path) -> str:
+    """The stem of an input file, ignoring any compression suffix."""
+    return uncompressed_path(path).stem
+
+
+def _open_zstd(path: Path, mode: Literal["rb", "wb"], level: int) -> BinaryIO:
+    # pylint: disable=import-outside-toplevel
+    try:
+        import zstandard
+    except ImportError as error:
+        raise ImportError(ZSTD_REQUIRED) from error
+
+    if mode == "rb":
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(path, mode="rb"), closefd=True
+        )
+        # The reader can not read lines, so buffer it.
+        return io.BufferedReader(reader)  # type: ignore[arg-type]
+    return zstandard.ZstdCompressor(level=level).stream_writer(
+        open(path, mode="wb"), closefd=True
+    )  # type: ignore[return-value]
+
+
+def open_compressed(
+    path: Path,
+    mode: Literal["rb", "wb"] = "rb",
+    compression: Compression | str | None = None,
+    level: int | None = None,
+) -> BinaryIO:
+    """
+    Open a possibly compressed file as a binary stream.
+
+    Reading yields the decompressed bytes, and bytes written are compressed.
+    Output is reproducible, gzip headers do not record a modification time.
+
+    Args:
+        path: The file.
+        mode: "rb" or "wb".
+        compression: The compression. Defaults to the compression for the
+            suffix of `path`, see :func:`compression_for`.
+        level: The compression level, when writing. Defaults to a fast level.
+
+    Returns:
+        A binary file object.
+
+    Raises:
+        ImportError: If zstd is needed, and zstandard is not installed.
+    """
+    compression = compression_for(path) if compression is None else compression
+    compression = Compression(compression)
+    if level is None:
+        level = DEFAULT_LEVELS.get(compression, 0)
+    if compression == Compression.GZIP:
+        return gzip.GzipFile(  # type: ignore[return-value]
+            path, mode=mode, compresslevel=level, mtime=0
+        )
+    if compression == Compression.XZ:
+        if mode == "rb":
+            return lzma.open(path, mode=mode)  # type: ignore[return-value]
+        return lzma.open(path, mode=mode, preset=level)  # type: ignore[return-value]
+    if compression == Compression.ZSTD:
+        return _open_zstd(path, mode, level)
+    return open(path, mode=mode)
@@ -0,0 +1,223 @@
+"""
+Compare the trips of two bid packages.
+
+Each side is split in a single streaming pass, keeping only a content hash per
+trip, so comparing two packages takes time linear in their trip counts and
+memory for one hash per trip. Trips are matched by trip id, a repeated trip id
+being numbered as in a text split, e.g. ``1234-2``. The text of changed trips
+is only read again when a line diff is asked for.
+
+A side can be a bid package, which may be compressed or a PDF, a SQLite
+bundle written by ``split --format sqlite``, whose stored hashes are used
+without reading the trips, or a directory of trip files written by a ``text``
+format split, hashed file by file. A package is split with the boundary rules
+given, the other sides were split already.
+"""
+
+import difflib
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from pbs_split.snippets.hash.bytes_iterator_hash import bytes_iterator_hash
+from pbs_split.snippets.hash.file_hash import hash_file
+from pbs_split.split.bundle import BUNDLE_FILE_NAME, HASH_METHOD, TripBundle
+from pbs_split.split.compression import input_stem, open_compressed, uncompressed_path
+from pbs_split.split.rules import BoundaryRules
+from pbs_split.split.splitter import DEFAULT_ENCODING, iter_named_units
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+BUNDLE_SUFFIX = ".sqlite"
+TRIP_SUFFIX = ".txt"
+
+
+@dataclass
+class TripDiff:
+    """
+    The trips added, removed and changed between two packages, by name.
+
+    Added and changed trips are in the order of the new package, removed trips
+    in the order of the old package.
+    """
+
+    old_path: Path
+    new_path: Path
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def identical(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+
+def bundle_path_for(path: Path) -> Path | None:
+    """The bundle for `path`, if it is a bundle or a split directory with one."""
+    if path.is_dir():
+        path = path / BUNDLE_FILE_NAME
+        return path if path.is_file() else None
+    return path if path.suffix == BUNDLE_SUFFIX else None
+
+
+def trip_files(split_dir: Path) -> dict[str, Path]:
+    """
+    The trip files of a text split directory, which may be compressed.
+
+    Returns:
+        Trip name to trip file, in name order.
+
+    Raises:
+        ValueError: `split_dir` holds no trip files.
+    """
+    files = {
+        input_stem(path): path
+        for path in sorted(split_dir.iterdir())
+        if not path.name.startswith(".")
+        and uncompressed_path(path).suffix == TRIP_SUFFIX
+        and path.is_file()
+    }
+    if not files:
+        raise ValueError(f"{split_dir} holds no SQLite bundle or trip files.")
+    return files
+
+
+def trip_hashes(
+    input_path: Path,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> dict[str, str]:
+    """
+    Hash each trip of a package or text split directory, or read the hashes
+    stored in a bundle.
+
+    Returns:
+        Trip name to the sha256 of the trip text, in package order, or name
+        order for a text split directory.
+    """
+    if (bundle_path := bundle_path_for(input_path)) is not None:
+        with TripBundle(bundle_path) as bundle:
+            if bundle.hash_method != HASH_METHOD:
+                raise ValueError(f"{bundle_path} is not hashed with {HASH_METHOD}.")
+            return {Path(trip.name).stem: trip.hash for trip in bundle.trips()}
+    if input_path.is_dir():
+        return {
+            name: hash_file(path, hashlib.new(HASH_METHOD), opener=open_compressed)
+            for name, path in trip_files(input_path).items()
+        }
+    return {
+        name: bytes_iterator_hash(
+            iter((unit.text.encode(DEFAULT_ENCODING),)), hashlib.new(HASH_METHOD)
+        )
+        for name, unit in iter_named_units(input_path, encoding, rules)
+    }
+
+
+def diff_hashes(old: dict[str, str], new: dict[str, str], diff: TripDiff) -> TripDiff:
+    """Fill in `diff` from the trip hashes of each side."""
+    for name, new_hash in new.items():
+        old_hash = old.get(name)
+        if old_hash is None:
+            diff.added.append(name)
+        elif old_hash != new_hash:
+            diff.changed.append(name)
+        else:
+            diff.unchanged += 1
+    diff.removed.extend(name for name in old if name not in new)
+    return diff
+
+
+def diff_packages(
+    old_path: Path,
+    new_path: Path,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> TripDiff:
+    """
+    Compare the trips of two packages.
+
+    Args:
+        old_path: The earlier package, or bundle.
+        new_path: The later package, or bundle.
+        encoding: The text encoding of the packages.
+        rules: The boundary rules. Defaults to the standard layout.
+
+    Returns:
+        The trips added, removed and changed.
+    """
+    old = trip_hashes(old_path, encoding, rules)
+    new = trip_hashes(new_path, encoding, rules)
+    logger.info(
+        "Comparing %s trips in %s with %s trips in %s.",
+        len(old),
+        old_path,
+        len(new),
+        new_path,
+    )
+    return diff_hashes(old, new, TripDiff(old_path=old_path, new_path=new_path))
+
+
+def trip_texts(
+    input_path: Path,
+    names: set[str],
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> dict[str, str]:
+    """
+    Read the text of the trips in `names` from a package, bundle, or text split
+    directory.
+    """
+    if (bundle_path := bundle_path_for(input_path)) is not None:
+        with TripBundle(bundle_path) as bundle:
+            return {
+                Path(trip.name).stem: bundle.data(trip.name).decode(DEFAULT_ENCODING)
+                for trip in bundle.trips()
+                if Path(trip.name).stem in names
+            }
+    if input_path.is_dir():
+        texts = {}
+        for name, path in trip_files(input_path).items():
+            if name in names:
+                with open_compressed(path) as file_handle:
+                    texts[name] = file_handle.read().decode(DEFAULT_ENCODING)
+        return texts
+    return {
+        name: unit.text
+        for name, unit in iter_named_units(input_path, encoding, rules)
+        if name in names
+    }
+
+
+def iter_line_diffs(
+    diff: TripDiff,
+    encoding: str = DEFAULT_ENCODING,
+    context: int = 3,
+    rules: BoundaryRules | None = None,
+) -> Iterator[str]:
+    """
+    A unified line diff of each changed trip.
+
+    Only the changed trips are held in memory. `rules` must be those the diff
+    was made with.
+
+    Yields:
+        The lines of the diff, each ending with a newline.
+    """
+    names = set(diff.changed)
+    old_texts = trip_texts(diff.old_path, names, encoding, rules)
+    new_texts = trip_texts(diff.new_path, names, encoding, rules)
+    for name in diff.changed:
+        old_lines = old_texts[name].splitlines(keepends=True)
+        new_lines = new_texts[name].splitlines(keepends=True)
+        for line in difflib.unified_diff(
+            old_lines,
+            new_lines,
+            fromfile=f"{diff.old_path}:{name}",
+            tofile=f"{diff.new_path}:{name}",
+            n=context,
+        ):
+            yield line if line.endswith("\n") else line + "\n"
@@ -0,0 +1,117 @@
+"""
+Output formats for split trips.
+
+This module is imported by the command-line interface to build its options, so
+writer modules are only imported when a writer is made.
+"""
+
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pbs_split.split.splitter import SplitWriter
+
+
+class OutputFormat(str, Enum):
+    TEXT = "text"
+    TEXT_GZIP = "text.gz"
+    TEXT_XZ = "text.xz"
+    TEXT_ZSTD = "text.zst"
+    ARCHIVE_GZIP = "tar.gz"
+    ARCHIVE_XZ = "tar.xz"
+    ARCHIVE_ZSTD = "tar.zst"
+    COLUMNAR = "columnar"
+    BUNDLE = "sqlite"
+
+
+# The compression of each compressed format, by name, to keep this module light.
+COMPRESSED_TEXT = {
+    OutputFormat.TEXT_GZIP: "gzip",
+    OutputFormat.TEXT_XZ: "xz",
+    OutputFormat.TEXT_ZSTD: "zstd",
+}
+# The formats written as one text file per trip.
+TEXT_FORMATS = {OutputFormat.TEXT, *COMPRESSED_TEXT}
+ARCHIVES = {
+    OutputFormat.ARCHIVE_GZIP: "gzip",
+    OutputFormat.ARCHIVE_XZ: "xz",
+    OutputFormat.ARCHIVE_ZSTD: "zstd",
+}
+
+
+class FsyncPolicy(str, Enum):
+    NONE = "none"
+    BATCH = "batch"
+    FILE = "file"
+
+
+@dataclass(frozen=True)
+class WriterOptions:
+    """
+    How the text formats write their files, see :mod:`pbs_split.split.atomic`.
+
+    Args:
+        fsync: When written files are synced to disk.
+        background: Write files on a background thread, while splitting goes on.
+        manifest: Write a ``trips.sha256`` manifest of the trip hashes.
+    """
+
+    fsync: FsyncPolicy = FsyncPolicy.NONE
+    background: bool = False
+    manifest: bool = False
+
+
+def make_writer(
+    output_format: OutputFormat | str,
+    output_dir: Path,
+    options: WriterOptions | None = None,
+) -> "SplitWriter":
+    """
+    Make the writer for an output format.
+
+    The ``text.*`` formats write a compressed file per trip, and the ``tar.*``
+    formats a single compressed archive of all the trips. The ``sqlite`` format
+    writes a single database, see :mod:`pbs_split.split.bundle`.
+
+    Args:
+        output_format: The output format.
+        output_dir: The directory for the split output.
+        options: Write the files of a text format atomically, in batches, see
+            :class:`~pbs_split.split.atomic.AtomicTextWriter`. The other formats
+            write a single file, and ignore them.
+
+    Returns:
+        The writer.
+    """
+    # pylint: disable=import-outside-toplevel
+    output_format = OutputFormat(output_format)
+    if output_format == OutputFormat.COLUMNAR:
+        from pbs_split.split.columnar import ColumnarWriter
+
+        return ColumnarWriter(output_dir=output_dir)
+    if output_format == OutputFormat.BUNDLE:
+        from pbs_split.split.bundle import BundleWriter
+
+        return BundleWriter(output_dir=output_dir)
+    if output_format in ARCHIVES:
+        from pbs_split.split.archive import ArchiveWriter
+
+        return ArchiveWriter(output_dir=output_dir, compression=ARCHIVES[output_format])
+    if options is not None:
+        from pbs_split.split.atomic import AtomicTextWriter
+
+        return AtomicTextWriter(
+            output_dir=output_dir,
+            compression=COMPRESSED_TEXT.get(output_format, "none"),
+            fsync=options.fsync,
+            background=options.background,
+            manifest=options.manifest,
+        )
+    from pbs_split.split.splitter import TextDirectoryWriter
+
+    return TextDirectoryWriter(
+        output_dir=output_dir,
+        compression=COMPRESSED_TEXT.get(output_format, "none"),
+    )
@@ -0,0 +1,312 @@
+"""
+A sidecar index of page and trip offsets for random access into a bid package.
+
+The index is stored next to the input as ``<input>.pbs-index.json``. It holds
+the byte offset and length of every page and trip, along with the input's size,
+modification time and hash, so a stale index can be detected. Size and time are
+checked first, and the input is only hashed again if they changed. The hash of
+the boundary rules is kept too, as other rules find other trips.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from io import BytesIO
+from pathlib import Path
+
+from pbs_split.instrument import timer
+from pbs_split.snippets.hash.file_hash import HashedFileProtocol, make_hashed_file
+from pbs_split.split.compression import is_compressed
+from pbs_split.split.pdf import is_pdf
+from pbs_split.split.rules import BoundaryRules, rules_hash
+from pbs_split.split.splitter import (
+    DEFAULT_ENCODING,
+    SplitResult,
+    SplitUnit,
+    SplitWriter,
+    abort_writer,
+    iter_raw_lines,
+    iter_split_units,
+    split_file,
+)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+INDEX_SUFFIX = ".pbs-index.json"
+INDEX_VERSION = 2
+
+
+class StaleIndexError(ValueError):
+    """Raised when an index no longer matches its input file."""
+
+
+@dataclass
+class SplitIndex:
+    input_path: str
+    input_size: int
+    input_mtime_ns: int
+    input_hash: str
+    hash_method: str
+    rules_hash: str
+    pages: list[tuple[int, int]] = field(default_factory=list)
+    trips: dict[str, tuple[int, int]] = field(default_factory=dict)
+
+    def save(self, index_path: Path):
+        data = {"version": INDEX_VERSION, **asdict(self)}
+        index_path.write_text(json.dumps(data))
+
+    @classmethod
+    def load(cls, index_path: Path) -> "SplitIndex":
+        data = json.loads(index_path.read_text())
+        if data.pop("version", None) != INDEX_VERSION:
+            raise StaleIndexError(
+                f"{index_path} is not a version {INDEX_VERSION} index."
+            )
+        data["pages"] = [tuple(span) for span in data["pages"]]
+        data["trips"] = {key: tuple(span) for key, span in data["trips"].items()}
+        return cls(**data)
+
+
+def index_path_for(input_path: Path) -> Path:
+    return input_path.with_name(f"{input_path.name}{INDEX_SUFFIX}")
+
+
+def check_indexable(input_path: Path):
+    """
+    Raises:
+        ValueError: If the input is a PDF or compressed, whose trip offsets can
+            not be read back directly.
+    """
+    if is_pdf(input_path):
+        raise ValueError(f"{input_path} is a PDF, only text files can be indexed.")
+    if is_compressed(input_path):
+        raise ValueError(
+            f"{input_path} is compressed, only uncompressed files can be indexed."
+        )
+
+
+class IndexBuilder:
+    """Collect page and trip offsets while a file is split."""
+
+    def __init__(self) -> None:
+        self.page_offsets: list[int] = []
+        self.trips: dict[str, tuple[int, int]] = {}
+
+    def add_page(self, offset: int):
+        self.page_offsets.append(offset)
+
+    def add_unit(self, unit: SplitUnit):
+        if unit.trip_id in self.trips:
+            logger.warning("Duplicate trip id %s not indexed.", unit.trip_id)
+            return
+        self.trips[unit.trip_id] = (unit.offset, unit.length)
+
+    def finish(
+        self,
+        input_path: Path,
+        hashed_file: HashedFileProtocol,
+        rules: BoundaryRules | None = None,
+    ) -> SplitIndex:
+        stat_result = input_path.stat()
+        ends = self.page_offsets[1:] + [stat_result.st_size]
+        return SplitIndex(
+            input_path=str(input_path),
+            input_size=stat_result.st_size,
+            input_mtime_ns=stat_result.st_mtime_ns,
+            input_hash=hashed_file.file_hash,
+            hash_method=hashed_file.hash_method,
+            rules_hash=rules_hash(rules),
+            pages=[(start, end - start) for start, end in zip(self.page_offsets, ends)],
+            trips=self.trips,
+        )
+
+
+class IndexingWriter:
+    """Wrap a writer, recording the offset of each trip in an index builder."""
+
+    def __init__(self, writer: SplitWriter, builder: IndexBuilder) -> None:
+        self.writer = writer
+        self.builder = builder
+
+    def write(self, unit: SplitUnit) -> Path | None:
+        self.builder.add_unit(unit)
+        return self.writer.write(unit)
+
+    def close(self) -> list[Path]:
+        return self.writer.close()
+
+    def abort(self):
+        abort_writer(self.writer)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(writer={self.writer!r})"
+
+
+def split_file_with_index(
+    input_path: Path,
+    output_dir: Path,
+    writer: SplitWriter,
+    encoding: str = DEFAULT_ENCODING,
+    hashed_file: HashedFileProtocol | None = None,
+    rules: BoundaryRules | None = None,
+) -> tuple[SplitResult, SplitIndex]:
+    """
+    Split a file, and save its sidecar index.
+
+    Args:
+        input_path: The bid-package text file.
+        output_dir: The directory for the split output.
+        writer: The writer used to store each trip.
+        encoding: The text encoding of the input.
+        hashed_file: The input hash, if already known.
+        rules: The boundary rules. Defaults to the standard layout.
+
+    Returns:
+        The split result and the index.
+    """
+    check_indexable(input_path)
+    if hashed_file is None:
+        with timer("hash"):
+            hashed_file = make_hashed_file(input_path, hashlib.sha256())
+    builder = IndexBuilder()
+    result = split_file(
+        input_path=input_path,
+        output_dir=output_dir,
+        writer=IndexingWriter(writer, builder),
+        encoding=encoding,
+        on_page=builder.add_page,
+        rules=rules,
+    )
+    index = builder.finish(input_path, hashed_file, rules)
+    index.save(index_path_for(input_path))
+    return result, index
+
+
+def build_index(
+    input_path: Path,
+    encoding: str = DEFAULT_ENCODING,
+    hashed_file: HashedFileProtocol | None = None,
+    save: bool = True,
+    rules: BoundaryRules | None = None,
+) -> SplitIndex:
+    """
+    Build the index for a file by scanning it, without writing split output.
+
+    Args:
+        input_path: The bid-package text file.
+        encoding: The text encoding of the input.
+        hashed_file: The input hash, if already known.
+        save: Save the index next to the input.
+        rules: The boundary rules. Defaults to the standard layout.
+
+    Returns:
+        The index.
+    """
+    check_indexable(input_path)
+    if hashed_file is None:
+        with timer("hash"):
+            hashed_file = make_hashed_file(input_path, hashlib.sha256())
+    builder = IndexBuilder()
+    with open(input_path, mode="rb") as file_handle:
+        for unit in iter_split_units(
+            iter_raw_lines(file_handle),
+            encoding=encoding,
+            on_page=builder.add_page,
+            rules=rules,
+        ):
+            builder.add_unit(unit)
+    index = builder.finish(input_path, hashed_file, rules)
+    if save:
+        index.save(index_path_for(input_path))
+    return index
+
+
+def load_index(input_path: Path, rules: BoundaryRules | None = None) -> SplitIndex:
+    """
+    Load the index for a file, checking that it is still valid.
+
+    Args:
+        input_path: The bid-package text file.
+        rules: The boundary rules. Defaults to the standard layout.
+
+    Raises:
+        FileNotFoundError: If there is no index.
+        StaleIndexError: If the input has changed since it was indexed, or it
+            was indexed with other rules.
+    """
+    index = SplitIndex.load(index_path_for(input_path))
+    if index.rules_hash != rules_hash(rules):
+        raise StaleIndexError(
+            f"The index for {input_path} was built with other boundary rules."
+        )
+    stat_result = input_path.stat()
+    if (
+        stat_result.st_size == index.input_size
+        and stat_result.st_mtime_ns == index.input_mtime_ns
+    ):
+        return index
+    with timer("hash"):
+        hashed_file = make_hashed_file(input_path, hashlib.new(index.hash_method))
+    if hashed_file.file_hash != index.input_hash:
+        raise StaleIndexError(f"The index for {input_path} is out of date.")
+    # Same content, so record the new size and time to skip hashing next time.
+    index.input_size = stat_result.st_size
+    index.input_mtime_ns = stat_result.st_mtime_ns
+    try:
+        index.save(index_path_for(input_path))
+    except OSError:
+        pass
+    return index
+
+
+def load_or_build_index(
+    input_path: Path,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> SplitIndex:
+    """Load the index for a file, building it if missing or stale."""
+    try:
+        return load_index(input_path, rules)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        logger.info("Rebuilding index for %s: %s", input_path, error)
+    try:
+        return build_index(input_path, encoding=encoding, rules=rules)
+    except OSError as error:
+        logger.warning("Could not save the index for %s: %s", input_path, error)
+        return build_index(input_path, encoding=encoding, save=False, rules=rules)
+
+
+def read_span(input_path: Path, span: tuple[int, int]) -> bytes:
+    offset, length = span
+    with open(input_path, mode="rb") as file_handle:
+        file_handle.seek(offset)
+        return file_handle.read(length)
+
+
+def read_trip(
+    input_path: Path,
+    index: SplitIndex,
+    trip_id: str,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> str:
+    """
+    Read one trip directly from the input, using the index.
+
+    `rules` are the boundary rules the index was built with.
+
+    Raises:
+        KeyError: If the trip is not in the index.
+
+    Returns:
+        The trip text, the same as the split output for the trip.
+    """
+    raw = read_span(input_path, index.trips[trip_id])
+    # Re-split the span to drop page headers from trips that span a page break.
+    for unit in iter_split_units(
+        iter_raw_lines(BytesIO(raw)), encoding=encoding, rules=rules
+    ):
+        return unit.text
+    return raw.decode(encoding, errors="replace")
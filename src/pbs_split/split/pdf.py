@@ -0,0 +1,149 @@
+"""
+Read bid packages directly from PDF.
+
+Text is extracted with pdfminer, the library behind ``pdf2txt``, in chunks of
+pages on a process pool. Chunks are handed to the splitter in page order as
+they complete, so extraction and splitting overlap, and the full text is never
+written to disk. Only a few chunks are extracted ahead of the splitter, which
+keeps memory use bounded.
+
+Byte offsets of split trips refer to the extracted text, so a PDF can not have
+an offset index.
+
+Requires pdfminer.six, ``pip install pbs-split[pdf]``.
+"""
+
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+from pbs_split.split.worker_logging import init_worker_logging, worker_logging
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+PDF_SUFFIX = ".pdf"
+DEFAULT_CHUNK_PAGES = 8
+PDF_REQUIRED = "PDF input requires pdfminer.six, pip install pbs-split[pdf]"
+
+
+def is_pdf(input_path: Path) -> bool:
+    return input_path.suffix.lower() == PDF_SUFFIX
+
+
+def pdf_page_count(input_path: Path) -> int:
+    # pylint: disable=import-outside-toplevel
+    try:
+        from pdfminer.pdfpage import PDFPage
+    except ImportError as error:
+        raise ImportError(PDF_REQUIRED) from error
+
+    with open(input_path, mode="rb") as file_handle:
+        return sum(1 for _ in PDFPage.get_pages(file_handle))
+
+
+def extract_pages(input_path: Path, start: int, stop: int) -> str:
+    """
+    Extract the text of pages `start` to `stop`, counted from 0.
+
+    Each page ends with a form feed, as in the output of ``pdf2txt``.
+    """
+    # pylint: disable=import-outside-toplevel
+    try:
+        from pdfminer.high_level import extract_text
+    except ImportError as error:
+        raise ImportError(PDF_REQUIRED) from error
+
+    return extract_text(input_path, page_numbers=range(start, stop))
+
+
+def default_jobs() -> int:
+    # Extract serially inside a worker process, e.g. one of split-many, rather
+    # than starting a pool per worker.
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return os.cpu_count() or 1
+
+
+def iter_pdf_text(
+    input_path: Path,
+    jobs: int | None = None,
+    chunk_pages: int = DEFAULT_CHUNK_PAGES,
+) -> Iterator[str]:
+    """
+    Extract the text of a PDF, in page order, a chunk of pages at a time.
+
+    Args:
+        input_path: The PDF.
+        jobs: The number of worker processes. A value of 1 extracts in this
+            process. Defaults to the cpu count, or 1 inside a worker process.
+        chunk_pages: The number of pages extracted by each task.
+
+    Yields:
+        The text of each chunk of pages.
+    """
+    if jobs is None:
+        jobs = default_jobs()
+    page_count = pdf_page_count(input_path)
+    chunks = [
+        (start, min(start + chunk_pages, page_count))
+        for start in range(0, page_count, chunk_pages)
+    ]
+    if jobs <= 1 or len(chunks) <= 1:
+        for start, stop in chunks:
+            yield extract_pages(input_path, start, stop)
+        return
+    with worker_logging() as log_args:
+        executor = ProcessPoolExecutor(
+            max_workers=min(jobs, len(chunks)),
+            initializer=init_worker_logging,
+            initargs=log_args,
+        )
+        try:
+            pending: deque[Future[str]] = deque()
+            remaining = iter(chunks)
+            # Keep two chunks per worker ahead of the splitter.
+            for start, stop in remaining:
+                pending.append(executor.submit(extract_pages, input_path, start, stop))
+                if len(pending) >= jobs * 2:
+                    break
+            while pending:
+                text = pending.popleft().result()
+                if (chunk := next(remaining, None)) is not None:
+                    pending.append(executor.submit(extract_pages, input_path, *chunk))
+                yield text
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+
+def iter_pdf_lines(
+    input_path: Path,
+    jobs: int | None = None,
+    chunk_pages: int = DEFAULT_CHUNK_PAGES,
+    encoding: str = "utf-8",
+) -> Iterator[tuple[int, bytes]]:
+    """
+    Iterate over the lines of the text of a PDF, along with their byte offsets.
+
+    The same as :func:`~pbs_split.split.splitter.iter_raw_lines` over the text
+    file ``pdf2txt`` would write, without writing it.
+    """
+    offset = 0
+    partial = b""
+    for text in iter_pdf_text(input_path, jobs=jobs, chunk_pages=chunk_pages):
+        lines = text.encode(encoding).splitlines(keepends=True)
+        if not lines:
+            continue
+        lines[0] = partial + lines[0]
+        # A chunk ends with a form feed, which starts the first line of the
+        # next chunk.
+        partial = b"" if lines[-1].endswith(b"\n") else lines.pop()
+        for line in lines:
+            yield offset, line
+            offset += len(line)
+    if partial:
+        yield offset, partial
@@ -0,0 +1,179 @@
+"""
+Configurable boundary rules.
+
+Bid-package layouts differ a little between airlines and bases. The patterns
+that find page headers, trip starts and trip ends are declared as
+:class:`BoundaryRules`, and can be loaded from a TOML file::
+
+    name = "example"
+    trip_start = '^\\s*PAIRING\\s+(?P<trip_id>\\d+)\\b'
+    trip_end = '^\\s*TOTAL\\b'
+
+Rules that are left out keep the default pattern, see
+:mod:`pbs_split.split.boundaries`. The trip start pattern must capture
+``trip_id``, and the page header pattern ``base``, ``equipment`` and ``page``.
+
+The rules are compiled once into a single combined regex, with one alternative
+per rule, so each line is matched once rather than once per rule. Compiled
+matchers are cached by a hash of their rules, so every split using the same
+rules shares one matcher::
+
+    classify = compile_rules(load_rules(Path("layout.toml"))).classify
+"""
+
+import hashlib
+import json
+import re
+import tomllib
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Mapping
+
+from pbs_split.split.boundaries import (
+    PAGE_HEADER_RE,
+    TRIP_END_RE,
+    TRIP_START_RE,
+    LineKind,
+)
+
+# Rules in the order they are tried, which is the order of classify_line.
+RULE_KINDS = (
+    ("trip_start", LineKind.TRIP_START),
+    ("trip_end", LineKind.TRIP_END),
+    ("page_header", LineKind.PAGE_HEADER),
+)
+REQUIRED_GROUPS = {
+    "trip_start": {"trip_id"},
+    "trip_end": set(),
+    "page_header": {"base", "equipment", "page"},
+}
+GROUP_NAME_RE = re.compile(r"\(\?P([<=])(\w+)")
+
+Groups = Mapping[str, str]
+
+
+@dataclass(frozen=True)
+class BoundaryRules:
+    """The patterns that find page and trip boundaries."""
+
+    name: str = "default"
+    trip_start: str = TRIP_START_RE.pattern
+    trip_end: str = TRIP_END_RE.pattern
+    page_header: str = PAGE_HEADER_RE.pattern
+
+    def config_hash(self) -> str:
+        """A hash of the patterns. The name is not included."""
+        patterns = {key: value for key, value in asdict(self).items() if key != "name"}
+        return hashlib.sha256(json.dumps(patterns, sort_keys=True).encode()).hexdigest()
+
+
+DEFAULT_RULES = BoundaryRules()
+
+
+def rules_hash(rules: BoundaryRules | None = None) -> str:
+    """The config hash of `rules`, defaulting to :data:`DEFAULT_RULES`."""
+    return (rules or DEFAULT_RULES).config_hash()
+
+
+def load_rules(config_path: Path) -> BoundaryRules:
+    """
+    Load boundary rules from a TOML file.
+
+    Raises:
+        ValueError: If the file has unknown keys, or a pattern is not valid.
+    """
+    with open(config_path, mode="rb") as file_handle:
+        try:
+            config = tomllib.load(file_handle)
+        except tomllib.TOMLDecodeError as error:
+            raise ValueError(f"{config_path}: {error}") from error
+    known = {rule_field.name for rule_field in fields(BoundaryRules)}
+    if unknown := set(config) - known:
+        raise ValueError(
+            f"{config_path}: unknown keys {', '.join(sorted(unknown))}, "
+            f"use {', '.join(sorted(known))}."
+        )
+    rules = BoundaryRules(**{key: str(value) for key, value in config.items()})
+    compile_rules(rules)
+    return rules
+
+
+class RuleMatcher:
+    """
+    Classify lines with a single regex, combining every rule.
+
+    Each rule becomes a named alternative, and its groups are renamed so they
+    are unique in the combined pattern. The alternative that matched gives the
+    kind of line.
+
+    Raises:
+        ValueError: If a pattern is not valid, or lacks a required group.
+    """
+
+    def __init__(self, rules: BoundaryRules) -> None:
+        self.rules = rules
+        alternatives = []
+        # Alternative name, to the line kind and (group, renamed group) pairs.
+        self._kinds: dict[str, tuple[LineKind, tuple[tuple[str, str], ...]]] = {}
+        for number, (attribute, kind) in enumerate(RULE_KINDS):
+            pattern = getattr(rules, attribute)
+            try:
+                compiled = re.compile(pattern)
+            except re.error as error:
+                raise ValueError(f"{attribute} pattern {pattern!r}: {error}") from error
+            if missing := REQUIRED_GROUPS[attribute] - set(compiled.groupindex):
+                raise ValueError(
+                    f"{attribute} pattern {pattern!r} needs the groups "
+                    f"{', '.join(sorted(missing))}."
+                )
+            prefix = f"_{number}_"
+            renamed = GROUP_NAME_RE.sub(rf"(?P\1{prefix}\2", pattern)
+            alternatives.append(f"(?P<_{number}>{renamed})")
+            self._kinds[f"_{number}"] = (
+                kind,
+                tuple((name, prefix + name) for name in compiled.groupindex),
+            )
+        try:
+            self._regex = re.compile("|".join(alternatives))
+        except re.error as error:
+            raise ValueError(f"The rules can not be combined: {error}") from error
+        self._match = self._regex.match
+
+    def classify(self, line: str) -> tuple[LineKind, Groups | None]:
+        """
+        Classify a single line, as :func:`~pbs_split.split.boundaries.classify_line`.
+
+        Returns:
+            The kind of line, and the groups captured by the matching rule.
+        """
+        if not line.strip():
+            return LineKind.BLANK, None
+        if (match := self._match(line)) is None:
+            return LineKind.OTHER, None
+        # The wrapping group of a rule closes after any group inside it.
+        kind, groups = self._kinds[match.lastgroup]  # type: ignore[index]
+        return kind, {name: match[renamed] for name, renamed in groups}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(rules={self.rules.name!r})"
+
+
+_MATCHERS: dict[str, RuleMatcher] = {}
+
+
+def compile_rules(rules: BoundaryRules | None = None) -> RuleMatcher:
+    """
+    The compiled matcher for `rules`, compiling them only the first time.
+
+    Args:
+        rules: The boundary rules. Defaults to :data:`DEFAULT_RULES`.
+
+    Raises:
+        ValueError: If a pattern is not valid.
+    """
+    if rules is None:
+        rules = DEFAULT_RULES
+    key = rules.config_hash()
+    if (matcher := _MATCHERS.get(key)) is None:
+        matcher = _MATCHERS[key] = RuleMatcher(rules)
+    return matcher
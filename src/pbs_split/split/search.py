@@ -0,0 +1,450 @@
+"""
+An inverted search index over split trips.
+
+Each split package gets a search segment, saved next to its split output as
+``trips.pbs-search.json``. A segment numbers the trips of its package, and
+holds:
+
+* postings, the trips for each station, layover station, base and equipment.
+* columns of numeric values, credit, TAFB, report time and so on, with the
+  trips sorted by each column, so a range is found by binary search.
+
+Queries are answered from the segments alone, without reading trip text.
+A segment is built in the same pass as the split, by wrapping the split writer
+in a :class:`SearchIndexingWriter`. Re-splitting one package only rebuilds its
+own segment, and a segment whose input hash and boundary rules have not changed
+is not rebuilt at all.
+
+A query is a list of conditions, all of which must match. ``or`` separates
+alternative lists of conditions::
+
+    layover=NRT days=4 credit>20
+    equipment=787,777 report<=0600 or base=LAX tafb=48..72
+    station!=JFK credit=..5.30
+
+Values in a comma list match any of them, and ``low..high`` matches a range,
+either end of which may be left open. Durations are hours, optionally ``H.MM``
+or ``H:MM``. Report times are ``HHMM`` or ``HH:MM`` clock times.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from pbs_split.parse import ParseError, parse_trip
+from pbs_split.snippets.hash.file_hash import HashedFileProtocol, make_hashed_file
+from pbs_split.split.rules import BoundaryRules, rules_hash
+from pbs_split.split.splitter import (
+    DEFAULT_ENCODING,
+    SplitUnit,
+    SplitWriter,
+    abort_writer,
+    iter_split_units,
+    open_raw_lines,
+)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+SEARCH_FILE_NAME = "trips.pbs-search.json"
+SEARCH_VERSION = 2
+TERM_FIELDS = ("station", "layover", "base", "equipment")
+NUMERIC_FIELDS = ("credit", "tafb", "block", "report", "days", "legs", "ops", "page")
+DURATION_FIELDS = {"credit", "tafb", "block"}
+CLOCK_FIELDS = {"report"}
+CONDITION_RE = re.compile(r"^(?P<field>[a-z]+)(?P<op>!=|>=|<=|=|>|<)(?P<value>\S+)$")
+
+
+@dataclass
+class SearchSegment:
+    """The search index of one package."""
+
+    package: str
+    input_hash: str
+    hash_method: str
+    # The config hash of the boundary rules the package was split with.
+    rules_hash: str
+    trips: list[str] = field(default_factory=list)
+    # Field, to value, to the trips with that value.
+    terms: dict[str, dict[str, list[int]]] = field(default_factory=dict)
+    # Field, to the value for each trip.
+    columns: dict[str, list[int]] = field(default_factory=dict)
+    # Field, to the trips in order of their value.
+    order: dict[str, list[int]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.trips)
+
+    def save(self, segment_path: Path):
+        data = {"version": SEARCH_VERSION, **asdict(self)}
+        segment_path.write_text(json.dumps(data, separators=(",", ":")))
+
+    @classmethod
+    def load(cls, segment_path: Path) -> "SearchSegment":
+        """
+        Raises:
+            ValueError: If the file is not a search segment of this version.
+        """
+        data = json.loads(segment_path.read_text())
+        if data.pop("version", None) != SEARCH_VERSION:
+            raise ValueError(
+                f"{segment_path} is not a version {SEARCH_VERSION} search index."
+            )
+        return cls(**data)
+
+    def term_trips(self, field_name: str, values: Iterable[str]) -> set[int]:
+        postings = self.terms[field_name]
+        found: set[int] = set()
+        for value in values:
+            found.update(postings.get(value, ()))
+        return found
+
+    def range_trips(
+        self, field_name: str, low: int | None, high: int | None
+    ) -> set[int]:
+        """The trips with `low` <= value <= `high`, either end being open if None."""
+        column = self.columns[field_name]
+        order = self.order[field_name]
+        start = 0 if low is None else bisect_left(order, low, key=column.__getitem__)
+        stop = (
+            len(order)
+            if high is None
+            else bisect_right(order, high, key=column.__getitem__)
+        )
+        return set(order[start:stop])
+
+
+class SegmentBuilder:
+    """
+    Index trips for search as they are split.
+
+    Trips are named as :class:`~pbs_split.split.splitter.TextDirectoryWriter`
+    names their files, a repeated trip id being numbered, e.g. ``1234-2``. A
+    trip that can not be parsed is indexed by base and equipment only, with
+    zero for each numeric value.
+
+    Args:
+        rules: The boundary rules the package is split with, recorded in the
+            segment. Defaults to the standard layout.
+    """
+
+    def __init__(self, rules: BoundaryRules | None = None) -> None:
+        self.rules = rules
+        self.trips: list[str] = []
+        self.terms: dict[str, dict[str, list[int]]] = {name: {} for name in TERM_FIELDS}
+        self.columns: dict[str, list[int]] = {name: [] for name in NUMERIC_FIELDS}
+        self._seen: dict[str, int] = {}
+
+    def add_unit(self, unit: SplitUnit):
+        count = self._seen.get(unit.trip_id, 0) + 1
+        self._seen[unit.trip_id] = count
+        number = len(self.trips)
+        self.trips.append(unit.trip_id if count == 1 else f"{unit.trip_id}-{count}")
+        values = dict.fromkeys(NUMERIC_FIELDS, 0)
+        trip_terms = {"base": {unit.base}, "equipment": {unit.equipment}}
+        try:
+            trip = parse_trip(unit)
+        except ParseError as error:
+            logger.warning("%s", error)
+        else:
+            values.update(
+                credit=trip.credit,
+                tafb=trip.tafb,
+                block=trip.block,
+                report=trip.report,
+                days=trip.days,
+                legs=sum(len(duty.legs) for duty in trip.duty_periods),
+                ops=trip.ops,
+            )
+            trip_terms["station"] = trip.stations()
+            trip_terms["layover"] = set(trip.layover_stations())
+        values["page"] = unit.page
+        for field_name, field_values in trip_terms.items():
+            postings = self.terms[field_name]
+            for value in field_values:
+                postings.setdefault(value, []).append(number)
+        for field_name, value in values.items():
+            self.columns[field_name].append(value)
+
+    def finish(self, package: str, hashed_file: HashedFileProtocol) -> SearchSegment:
+        return SearchSegment(
+            package=package,
+            input_hash=hashed_file.file_hash,
+            hash_method=hashed_file.hash_method,
+            rules_hash=rules_hash(self.rules),
+            trips=self.trips,
+            terms=self.terms,
+            columns=self.columns,
+            order={
+                name: sorted(range(len(column)), key=column.__getitem__)
+                for name, column in self.columns.items()
+            },
+        )
+
+
+class SearchIndexingWriter:
+    """Wrap a writer, indexing each trip for search in a segment builder."""
+
+    def __init__(self, writer: SplitWriter, builder: SegmentBuilder) -> None:
+        self.writer = writer
+        self.builder = builder
+
+    def write(self, unit: SplitUnit) -> Path | None:
+        self.builder.add_unit(unit)
+        return self.writer.write(unit)
+
+    def close(self) -> list[Path]:
+        return self.writer.close()
+
+    def abort(self):
+        abort_writer(self.writer)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(writer={self.writer!r})"
+
+
+def build_segment(
+    input_path: Path,
+    hashed_file: HashedFileProtocol,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> SearchSegment:
+    """Split and parse a package, and index its trips, see :class:`SegmentBuilder`."""
+    builder = SegmentBuilder(rules)
+    with open_raw_lines(input_path, encoding=encoding) as raw_lines:
+        for unit in iter_split_units(raw_lines, encoding=encoding, rules=rules):
+            builder.add_unit(unit)
+    return builder.finish(input_path.name, hashed_file)
+
+
+def segment_path_for(output_dir: Path) -> Path:
+    return output_dir / SEARCH_FILE_NAME
+
+
+def update_search_index(
+    input_path: Path,
+    output_dir: Path,
+    hashed_file: HashedFileProtocol | None = None,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> tuple[SearchSegment, bool]:
+    """
+    Build the search segment for a package split into `output_dir`, unless the
+    saved segment already matches the input and the boundary rules.
+
+    Args:
+        input_path: The package.
+        output_dir: The split output directory, where the segment is saved.
+        hashed_file: The sha256 hash of the input, if already known.
+        encoding: The text encoding of the input.
+        rules: The boundary rules. Defaults to the standard layout.
+
+    Returns:
+        The segment, and whether it was rebuilt.
+    """
+    if hashed_file is None:
+        hashed_file = make_hashed_file(input_path, hashlib.sha256())
+    segment_path = segment_path_for(output_dir)
+    if segment_path.is_file():
+        try:
+            segment = SearchSegment.load(segment_path)
+        except (ValueError, TypeError) as error:
+            logger.info("Rebuilding %s: %s", segment_path, error)
+        else:
+            if (
+                segment.input_hash == hashed_file.file_hash
+                and segment.hash_method == hashed_file.hash_method
+                and segment.rules_hash == rules_hash(rules)
+            ):
+                return segment, False
+    segment = build_segment(input_path, hashed_file, encoding, rules)
+    return save_segment(segment, output_dir), True
+
+
+def save_segment(segment: SearchSegment, output_dir: Path) -> SearchSegment:
+    """Save the search segment of a package split into `output_dir`."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    segment.save(segment_path_for(output_dir))
+    logger.info("Indexed %s trips of %s.", len(segment), segment.package)
+    return segment
+
+
+def finish_search_index(
+    input_path: Path,
+    output_dir: Path,
+    builder: SegmentBuilder,
+    hashed_file: HashedFileProtocol | None = None,
+) -> SearchSegment:
+    """
+    Save the segment of a package indexed while it was split into `output_dir`.
+
+    Args:
+        input_path: The package.
+        output_dir: The split output directory, where the segment is saved.
+        builder: The builder of a :class:`SearchIndexingWriter` the package was
+            split with.
+        hashed_file: The sha256 hash of the input, if already known.
+    """
+    if hashed_file is None:
+        hashed_file = make_hashed_file(input_path, hashlib.sha256())
+    return save_segment(builder.finish(input_path.name, hashed_file), output_dir)
+
+
+def find_segments(paths: Iterable[Path]) -> list[Path]:
+    """
+    Find the search segments for `paths`.
+
+    A path can be a segment, a split directory, or a directory of split
+    directories, as written by ``split-many``.
+    """
+    found = []
+    for path in paths:
+        if path.is_file():
+            found.append(path)
+        elif (segment_path := segment_path_for(path)).is_file():
+            found.append(segment_path)
+        elif path.is_dir():
+            found.extend(sorted(path.glob(f"*/{SEARCH_FILE_NAME}")))
+    return found
+
+
+@dataclass
+class Condition:
+    field: str
+    op: str
+    values: list[str]
+
+    def __str__(self) -> str:
+        return f"{self.field}{self.op}{','.join(self.values)}"
+
+
+def parse_number(field_name: str, value: str) -> int:
+    """
+    Convert a query value to the units of its column.
+
+    Raises:
+        ValueError: If the value is not valid for the field.
+    """
+    try:
+        if field_name in DURATION_FIELDS:
+            hours, _, minutes = value.replace(":", ".").partition(".")
+            if minutes and len(minutes) != 2:
+                raise ValueError(value)
+            return int(hours) * 60 + int(minutes or 0)
+        if field_name in CLOCK_FIELDS:
+            value = value.replace(":", "").zfill(4)
+            return int(value[:-2]) * 60 + int(value[-2:])
+        return int(value)
+    except ValueError as error:
+        raise ValueError(f"{value!r} is not a valid {field_name}.") from error
+
+
+def parse_query(query: str) -> list[list[Condition]]:
+    """
+    Parse a query into alternative lists of conditions.
+
+    Raises:
+        ValueError: If the query is not valid.
+    """
+    groups: list[list[Condition]] = [[]]
+    for token in query.split():
+        if token.lower() == "or":
+            groups.append([])
+            continue
+        if token.lower() == "and":
+            continue
+        if (match := CONDITION_RE.match(token.lower())) is None:
+            raise ValueError(f"Can not parse the condition {token!r}.")
+        field_name, op = match["field"], match["op"]
+        values = [value for value in match["value"].split(",") if value]
+        if field_name in TERM_FIELDS:
+            if op not in ("=", "!="):
+                raise ValueError(f"{field_name} can only be compared with = or !=.")
+            values = [value.upper() for value in values]
+        elif field_name in NUMERIC_FIELDS:
+            for value in values:
+                for end in value.split("..", 1):
+                    if end:
+                        parse_number(field_name, end)
+            if op not in ("=", "!=") and (len(values) != 1 or ".." in values[0]):
+                raise ValueError(f"{token!r} compares with more than one value.")
+        else:
+            raise ValueError(
+                f"Unknown field {field_name!r}, "
+                f"use one of {', '.join(TERM_FIELDS + NUMERIC_FIELDS)}."
+            )
+        groups[-1].append(Condition(field_name, op, values))
+    if not all(groups):
+        raise ValueError(f"The query {query!r} has an empty condition list.")
+    return groups
+
+
+def _numeric_trips(segment: SearchSegment, condition: Condition) -> set[int]:
+    field_name = condition.field
+    if condition.op in ("=", "!="):
+        found: set[int] = set()
+        for value in condition.values:
+            if ".." in value:
+                low, high = value.split("..", 1)
+                found |= segment.range_trips(
+                    field_name,
+                    parse_number(field_name, low) if low else None,
+                    parse_number(field_name, high) if high else None,
+                )
+            else:
+                number = parse_number(field_name, value)
+                found |= segment.range_trips(field_name, number, number)
+        return found
+    number = parse_number(field_name, condition.values[0])
+    if condition.op == ">":
+        return segment.range_trips(field_name, number + 1, None)
+    if condition.op == ">=":
+        return segment.range_trips(field_name, number, None)
+    if condition.op == "<":
+        return segment.range_trips(field_name, None, number - 1)
+    return segment.range_trips(field_name, None, number)
+
+
+def match_segment(segment: SearchSegment, groups: list[list[Condition]]) -> list[int]:
+    """The trips of a segment matching a parsed query, in package order."""
+    everything = set(range(len(segment)))
+    matched: set[int] = set()
+    for conditions in groups:
+        found = everything
+        for condition in conditions:
+            if condition.field in TERM_FIELDS:
+                trips = segment.term_trips(condition.field, condition.values)
+            else:
+                trips = _numeric_trips(segment, condition)
+            if condition.op == "!=":
+                found = found - trips
+            else:
+                found = found & trips
+            if not found:
+                break
+        matched |= found
+    return sorted(matched)
+
+
+def search(
+    segment_paths: Iterable[Path], query: str
+) -> Iterator[tuple[SearchSegment, int]]:
+    """
+    Find the trips matching `query`.
+
+    Raises:
+        ValueError: If the query is not valid.
+
+    Yields:
+        The segment, and the number of each matching trip in the segment.
+    """
+    groups = parse_query(query)
+    for segment_path in segment_paths:
+        segment = SearchSegment.load(segment_path)
+        for number in match_segment(segment, groups):
+            yield segment, number
@@ -0,0 +1,444 @@
+"""
+Streaming splitter for PBS bid-package text.
+
+The input is read one line at a time, and each trip is yielded as soon as its
+closing line is seen, so memory use stays at roughly one trip regardless of the
+size of the input.
+"""
+
+import logging
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter_ns
+from typing import BinaryIO, Callable, Iterable, Iterator, Protocol
+
+from pbs_split.instrument import count, current_instruments
+from pbs_split.split.boundaries import PAGE_BREAK, LineKind
+from pbs_split.split.compression import Compression, compressed_name, open_compressed
+from pbs_split.split.pdf import is_pdf, iter_pdf_lines
+from pbs_split.split.rules import BoundaryRules, compile_rules
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+# Per-file metrics records, with the metrics attached as ``record.metrics``.
+# Records only go to the handlers of this logger, e.g. the --metrics-file sink,
+# not to the log of the package.
+metrics_logger = logging.getLogger("pbs_split.metrics")
+metrics_logger.addHandler(logging.NullHandler())
+metrics_logger.propagate = False
+
+DEFAULT_ENCODING = "utf-8"
+# Increment when a change to the splitter changes its output.
+SPLITTER_VERSION = "2"
+
+
+@dataclass
+class SplitUnit:
+    """A single trip, along with where it was found in the input."""
+
+    trip_id: str
+    page: int
+    base: str
+    equipment: str
+    offset: int
+    length: int
+    text: str
+
+
+@dataclass
+class SplitStats:
+    bytes_read: int = 0
+    lines: int = 0
+    pages: int = 0
+    units: int = 0
+
+
+@dataclass
+class SplitResult:
+    input_path: Path
+    output_path: Path
+    stats: SplitStats
+    elapsed_ns: int
+    outputs: list[Path] = field(default_factory=list)
+    cached: bool = False
+
+
+@dataclass
+class SplitContext:
+    """
+    Where the splitter was after the last trip closed by a ``TTL`` line, which
+    is enough to carry on splitting from `offset`.
+    """
+
+    offset: int = 0
+    page: int = 0
+    base: str = ""
+    equipment: str = ""
+
+
+class SplitWriter(Protocol):
+    """
+    Stores split trips.
+
+    `write` returns the file written for a trip, or None if the trip is held
+    for a file written later. `close` returns any files written when closing.
+
+    A writer may also have an ``abort`` method, called instead of `close` when
+    the split fails, which discards any output not yet in place.
+    """
+
+    def write(self, unit: SplitUnit) -> Path | None: ...
+
+    def close(self) -> list[Path]: ...
+
+
+def abort_writer(writer: SplitWriter):
+    """
+    Stop a writer after a failed split, discarding its output if it has an
+    ``abort`` method, or else closing it, keeping what it wrote.
+    """
+    abort = getattr(writer, "abort", None)
+    if abort is not None:
+        abort()
+    else:
+        writer.close()
+
+
+def iter_raw_lines(
+    file_handle: BinaryIO, start: int = 0
+) -> Iterator[tuple[int, bytes]]:
+    """
+    Iterate over the lines of a binary file, along with their byte offsets.
+
+    Args:
+        file_handle: A file opened in binary mode.
+        start: The byte offset of the current position of `file_handle`.
+
+    Yields:
+        The byte offset of the line, and the line as bytes.
+    """
+    offset = start
+    for raw_line in file_handle:
+        yield offset, raw_line
+        offset += len(raw_line)
+
+
+@contextmanager
+def open_raw_lines(
+    input_path: Path, encoding: str = DEFAULT_ENCODING
+) -> Iterator[Iterator[tuple[int, bytes]]]:
+    """
+    Open a bid package as raw lines, see :func:`iter_raw_lines`.
+
+    A PDF is read through :func:`~pbs_split.split.pdf.iter_pdf_lines`, and a
+    text file directly, decompressing it as it is read if it has a compression
+    suffix, see :func:`~pbs_split.split.compression.open_compressed`. Offsets
+    are into the decompressed text.
+    """
+    if is_pdf(input_path):
+        pdf_lines = iter_pdf_lines(input_path, encoding=encoding)
+        try:
+            yield pdf_lines
+        finally:
+            pdf_lines.close()
+        return
+    with open_compressed(input_path) as file_handle:
+        yield iter_raw_lines(file_handle)
+
+
+def iter_split_units(
+    raw_lines: Iterable[tuple[int, bytes]],
+    stats: SplitStats | None = None,
+    encoding: str = DEFAULT_ENCODING,
+    on_page: Callable[[int], None] | None = None,
+    rules: BoundaryRules | None = None,
+    context: SplitContext | None = None,
+) -> Iterator[SplitUnit]:
+    """
+    Split a stream of bid-package lines into trips.
+
+    Page headers found inside a trip that spans a page break are dropped from
+    the trip text. A trip that is not closed by a ``TTL`` line is ended by the
+    next ``SEQ`` line or by the end of the input.
+
+    Args:
+        raw_lines: Tuples of byte offset and raw line, see :func:`iter_raw_lines`.
+        stats: Optional stats object, updated in place as lines are consumed.
+        encoding: The text encoding of the input.
+        on_page: Optional callback, called with the byte offset of each page as
+            the page starts. A page starts at the page break that precedes it.
+        rules: The boundary rules. Defaults to the standard layout.
+        context: Optional context to carry on from, with `raw_lines` starting
+            at its offset. It is updated in place after each trip closed by a
+            ``TTL`` line.
+
+    Yields:
+        Each trip, as soon as it is complete.
+    """
+    if stats is None:
+        stats = SplitStats()
+    classify = compile_rules(rules).classify
+    if (instruments := current_instruments()) is not None:
+        raw_lines = instruments.timed_iter("read", raw_lines)
+        classify = instruments.timed_call("boundary", classify)
+    if context is None:
+        page = 0
+        base = ""
+        equipment = ""
+        in_page = False
+    else:
+        page = context.page
+        base = context.base
+        equipment = context.equipment
+        # A trip has closed, so a page has started.
+        in_page = context.offset > 0
+    page_offset = 0
+    trip_lines: list[str] = []
+    trip_id = ""
+    trip_page = 0
+    trip_start = 0
+    trip_end = 0
+
+    def make_unit() -> SplitUnit:
+        stats.units += 1
+        return SplitUnit(
+            trip_id=trip_id,
+            page=trip_page,
+            base=base,
+            equipment=equipment,
+            offset=trip_start,
+            length=trip_end - trip_start,
+            text="".join(trip_lines),
+        )
+
+    for offset, raw_line in raw_lines:
+        stats.bytes_read += len(raw_line)
+        stats.lines += 1
+        line = raw_line.decode(encoding, errors="replace")
+        if line.startswith(PAGE_BREAK):
+            in_page = False
+            page_offset = offset
+            line = line.lstrip(PAGE_BREAK)
+        kind, match = classify(line)
+        if kind == LineKind.BLANK:
+            if trip_lines:
+                trip_lines.append(line)
+            continue
+        if not in_page:
+            in_page = True
+            stats.pages += 1
+            page += 1
+            if on_page is not None:
+                on_page(page_offset)
+        if kind == LineKind.PAGE_HEADER:
+            assert match is not None
+            page = int(match["page"])
+            base = match["base"]
+            equipment = match["equipment"]
+            continue
+        if kind == LineKind.TRIP_START:
+            assert match is not None
+            if trip_lines:
+                logger.warning("Trip %s on page %s was not closed.", trip_id, page)
+                yield make_unit()
+            trip_lines = []
+            trip_id = match["trip_id"]
+            trip_page = page
+            trip_start = offset
+        if not trip_lines and kind != LineKind.TRIP_START:
+            continue
+        trip_lines.append(line)
+        trip_end = offset + len(raw_line)
+        if kind == LineKind.TRIP_END:
+            if context is not None:
+                context.offset = trip_end
+                context.page = page
+                context.base = base
+                context.equipment = equipment
+            yield make_unit()
+            trip_lines = []
+    if trip_lines:
+        logger.warning("Trip %s on page %s was not closed.", trip_id, page)
+        yield make_unit()
+
+
+def iter_named_units(
+    input_path: Path,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> Iterator[tuple[str, SplitUnit]]:
+    """
+    Split a bid package, naming each trip by its id.
+
+    A repeated trip id is numbered, as :class:`TextDirectoryWriter` names its
+    files, e.g. ``1234`` then ``1234-2``. `rules` are the boundary rules,
+    defaulting to the standard layout.
+    """
+    seen: dict[str, int] = {}
+    with open_raw_lines(input_path, encoding=encoding) as raw_lines:
+        for unit in iter_split_units(raw_lines, encoding=encoding, rules=rules):
+            count = seen.get(unit.trip_id, 0) + 1
+            seen[unit.trip_id] = count
+            yield unit.trip_id if count == 1 else f"{unit.trip_id}-{count}", unit
+
+
+class TextDirectoryWriter:
+    """
+    Write each trip to its own text file, named after the trip id.
+
+    With a `compression`, each file is compressed, and named with the
+    compression suffix, e.g. ``12345.txt.gz``. `seen` counts the files
+    written for each trip id, and can be restored to carry on a split.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        suffix: str = ".txt",
+        compression: Compression | str = Compression.NONE,
+    ) -> None:
+        self.output_dir = output_dir
+        self.compression = Compression(compression)
+        self.suffix = compressed_name(suffix, self.compression)
+        self.seen: dict[str, int] = {}
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    def file_name(self, unit: SplitUnit) -> str:
+        return self.name_for(unit.trip_id, unit.page)
+
+    def name_for(self, trip_id: str, page: int) -> str:
+        """The file name for the next trip with `trip_id`."""
+        count = self.seen.get(trip_id, 0) + 1
+        self.seen[trip_id] = count
+        if count == 1:
+            return f"{trip_id}{self.suffix}"
+        logger.warning("Duplicate trip id %s on page %s.", trip_id, page)
+        return f"{trip_id}-{count}{self.suffix}"
+
+    def write(self, unit: SplitUnit) -> Path:
+        return self.write_named(self.file_name(unit), unit.text)
+
+    def write_named(self, name: str, text: str) -> Path:
+        """Write a trip to the file `name`, in `output_dir`."""
+        output_file = self.output_dir / name
+        if self.compression == Compression.NONE:
+            output_file.write_text(text, encoding=DEFAULT_ENCODING)
+            return output_file
+        with open_compressed(output_file, "wb", self.compression) as file_handle:
+            file_handle.write(text.encode(DEFAULT_ENCODING))
+        return output_file
+
+    def close(self) -> list[Path]:
+        return []
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"output_dir={self.output_dir!r}, suffix={self.suffix!r}, "
+            f"compression={self.compression.value!r})"
+        )
+
+
+def split_file(
+    input_path: Path,
+    output_dir: Path,
+    writer: SplitWriter | None = None,
+    encoding: str = DEFAULT_ENCODING,
+    on_page: Callable[[int], None] | None = None,
+    rules: BoundaryRules | None = None,
+) -> SplitResult:
+    """
+    Split a bid-package text or PDF file into one output per trip.
+
+    Args:
+        input_path: The bid-package text file, which may be compressed, or PDF.
+        output_dir: The directory for the split output.
+        writer: The writer used to store each trip. Defaults to a
+            :class:`TextDirectoryWriter` for `output_dir`.
+        encoding: The text encoding of the input.
+        on_page: Optional callback, called with the byte offset of each page.
+        rules: The boundary rules. Defaults to the standard layout.
+
+    Returns:
+        The split result.
+    """
+    start = perf_counter_ns()
+    if writer is None:
+        writer = TextDirectoryWriter(output_dir=output_dir)
+    write = writer.write
+    if (instruments := current_instruments()) is not None:
+        write = instruments.timed_call("write", write)
+    stats = SplitStats()
+    outputs: list[Path] = []
+    with open_raw_lines(input_path, encoding=encoding) as raw_lines:
+        try:
+            for unit in iter_split_units(
+                raw_lines,
+                stats=stats,
+                encoding=encoding,
+                on_page=on_page,
+                rules=rules,
+            ):
+                logger.debug("Split trip %s from page %s.", unit.trip_id, unit.page)
+                if (output := write(unit)) is not None:
+                    outputs.append(output)
+        except BaseException:
+            abort_writer(writer)
+            raise
+        outputs.extend(writer.close())
+    elapsed_ns = perf_counter_ns() - start
+    count("bytes", stats.bytes_read)
+    count("pages", stats.pages)
+    count("trips", stats.units)
+    logger.info(
+        "Split %s into %s trips from %s pages in %sns.",
+        input_path,
+        stats.units,
+        stats.pages,
+        elapsed_ns,
+    )
+    result = SplitResult(
+        input_path=input_path,
+        output_path=output_dir,
+        stats=stats,
+        elapsed_ns=elapsed_ns,
+        outputs=outputs,
+    )
+    log_metrics(result)
+    return result
+
+
+def log_metrics(result: SplitResult):
+    """Log a metrics record for a split file, to the ``pbs_split.metrics`` logger."""
+    if not metrics_logger.isEnabledFor(logging.INFO):
+        return
+    metrics_logger.info(
+        "split %s",
+        result.input_path,
+        extra={
+            "metrics": {
+                "input_path": str(result.input_path),
+                "input_bytes": result.stats.bytes_read,
+                "pages": result.stats.pages,
+                "trips": result.stats.units,
+                "elapsed_ns": result.elapsed_ns,
+                "cache_hit": result.cached,
+            }
+        },
+    )
+
+
+def throughput(stats: SplitStats, elapsed_ns: int) -> tuple[float, float]:
+    """
+    Calculate the split throughput.
+
+    Args:
+        stats: The split stats.
+        elapsed_ns: The elapsed time in nanoseconds.
+
+    Returns:
+        Megabytes per second and pages per second.
+    """
+    seconds = max(elapsed_ns, 1) / 1e9
+    return stats.bytes_read / 2**20 / seconds, stats.pages / seconds
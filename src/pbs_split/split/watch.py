@@ -0,0 +1,370 @@
+"""
+Watch a directory, and split bid packages as they land.
+
+New and changed files are found with inotify, through the optional
+``inotify_simple`` package, or by polling the directory. A file is only split
+once it has stopped changing for a quiet period, so partly written files are
+not picked up. Each file is hashed first, and files whose content was already
+split are skipped. Splits run on a process pool that is started once and kept
+for the life of the watch, so each new file pays no startup cost.
+"""
+
+import hashlib
+import logging
+import os
+import signal
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor
+from concurrent.futures import wait as wait_futures
+from fnmatch import fnmatch
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Callable, Protocol
+
+from pbs_split.snippets.hash.file_hash import HashedFileProtocol, make_hashed_file
+from pbs_split.split.batch import DEFAULT_PATTERN, BatchItem, init_worker, split_one
+from pbs_split.split.cache import SplitCache
+from pbs_split.split.compression import input_stem
+from pbs_split.split.formats import OutputFormat
+from pbs_split.split.rules import BoundaryRules
+from pbs_split.split.splitter import log_metrics
+from pbs_split.split.worker_logging import worker_logging
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+DEFAULT_QUIET_S = 2.0
+DEFAULT_POLL_INTERVAL_S = 1.0
+
+Signature = tuple[int, int]
+
+
+def file_signature(path: Path) -> Signature | None:
+    """The size and modification time of a file, or None if it is not a file."""
+    try:
+        stat_result = path.stat()
+    except OSError:
+        return None
+    if not path.is_file():
+        return None
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+class DirectoryWatcher(Protocol):
+    """Reports files in a directory that may have been created or changed."""
+
+    def changes(self, timeout: float) -> set[Path]:
+        """Wait up to `timeout` seconds for changes."""
+
+    def close(self): ...
+
+
+class PollingWatcher:
+    """Find changed files by scanning the directory."""
+
+    def __init__(self, directory: Path, pattern: str = DEFAULT_PATTERN) -> None:
+        self.directory = directory
+        self.pattern = pattern
+        self._signatures: dict[Path, Signature] = {}
+        self._first = True
+
+    def scan(self) -> set[Path]:
+        changed = set()
+        signatures = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not fnmatch(entry.name, self.pattern) or not entry.is_file():
+                    continue
+                stat_result = entry.stat()
+                path = Path(entry.path)
+                signatures[path] = (stat_result.st_size, stat_result.st_mtime_ns)
+                if self._signatures.get(path) != signatures[path]:
+                    changed.add(path)
+        self._signatures = signatures
+        return changed
+
+    def changes(self, timeout: float) -> set[Path]:
+        # The first scan reports files that were already there.
+        if self._first:
+            self._first = False
+            return self.scan()
+        sleep(timeout)
+        return self.scan()
+
+    def close(self):
+        pass
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"directory={self.directory!r}, pattern={self.pattern!r})"
+        )
+
+
+class InotifyWatcher:
+    """
+    Find changed files with inotify.
+
+    Requires the ``inotify_simple`` package, ``pip install pbs-split[watch]``.
+    """
+
+    def __init__(self, directory: Path, pattern: str = DEFAULT_PATTERN) -> None:
+        # pylint: disable=import-outside-toplevel
+        from inotify_simple import INotify, flags
+
+        self.directory = directory
+        self.pattern = pattern
+        self._inotify = INotify()
+        self._inotify.add_watch(
+            directory,
+            flags.CREATE | flags.MODIFY | flags.CLOSE_WRITE | flags.MOVED_TO,
+        )
+        self._existing = {path for path in directory.glob(pattern) if path.is_file()}
+
+    def changes(self, timeout: float) -> set[Path]:
+        changed, self._existing = self._existing, set()
+        if changed:
+            return changed
+        for event in self._inotify.read(timeout=int(timeout * 1000)):
+            if event.name and fnmatch(event.name, self.pattern):
+                changed.add(self.directory / event.name)
+        return changed
+
+    def close(self):
+        self._inotify.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"directory={self.directory!r}, pattern={self.pattern!r})"
+        )
+
+
+def make_watcher(
+    directory: Path, pattern: str = DEFAULT_PATTERN, polling: bool = False
+) -> DirectoryWatcher:
+    """Watch with inotify if it is available, falling back to polling."""
+    if not polling:
+        try:
+            return InotifyWatcher(directory, pattern)
+        except (ImportError, OSError) as error:
+            logger.info("Polling %s, inotify is not available: %s", directory, error)
+    return PollingWatcher(directory, pattern)
+
+
+class Debouncer:
+    """
+    Hold changed files until they have stopped changing.
+
+    A file is ready once its size and modification time have not changed for
+    `quiet_s` seconds.
+    """
+
+    def __init__(
+        self, quiet_s: float = DEFAULT_QUIET_S, clock: Callable[[], float] = monotonic
+    ) -> None:
+        self.quiet_s = quiet_s
+        self.clock = clock
+        self._pending: dict[Path, tuple[Signature, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def touch(self, path: Path):
+        """Note that `path` may have changed."""
+        if (signature := file_signature(path)) is None:
+            self._pending.pop(path, None)
+            return
+        current = self._pending.get(path)
+        if current is None or current[0] != signature:
+            self._pending[path] = (signature, self.clock())
+
+    def ready(self) -> list[Path]:
+        """Remove and return the files that have been quiet long enough."""
+        now = self.clock()
+        ready = []
+        for path, (signature, since) in list(self._pending.items()):
+            current = file_signature(path)
+            if current is None:
+                del self._pending[path]
+            elif current != signature:
+                self._pending[path] = (current, now)
+            elif now - since >= self.quiet_s:
+                del self._pending[path]
+                ready.append(path)
+        return sorted(ready)
+
+
+def _init_watch_worker(*log_args):
+    # Ctrl-C reaches the whole process group. The service stops the pool
+    # itself, so workers ignore it rather than dying mid split.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_worker(*log_args)
+
+
+class WatchService:
+    """
+    Split bid packages as they land in a directory.
+
+    Args:
+        directory: The directory to watch.
+        output_root: Each file is split into a sub directory of this directory.
+        pattern: The file name pattern to watch for.
+        jobs: The number of worker processes. A value of 1 splits in this
+            process. Defaults to the cpu count.
+        quiet_s: How long a file must be unchanged before it is split.
+        poll_interval_s: How long to wait for changes between checks.
+        polling: Poll the directory, even if inotify is available.
+        cache: An optional split cache, saved after each split.
+        output_format: The output format.
+        rules: The boundary rules. Defaults to the standard layout.
+        on_item: Called with each finished split, in this process.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        output_root: Path,
+        pattern: str = DEFAULT_PATTERN,
+        jobs: int | None = None,
+        quiet_s: float = DEFAULT_QUIET_S,
+        poll_interval_s: float = DEFAULT_POLL_INTERVAL_S,
+        polling: bool = False,
+        cache: SplitCache | None = None,
+        output_format: OutputFormat = OutputFormat.TEXT,
+        rules: BoundaryRules | None = None,
+        on_item: Callable[[BatchItem], None] | None = None,
+    ) -> None:
+        self.directory = directory
+        self.output_root = output_root
+        self.pattern = pattern
+        self.jobs = jobs or os.cpu_count() or 1
+        self.poll_interval_s = poll_interval_s
+        self.polling = polling
+        self.cache = cache
+        self.output_format = output_format
+        self.rules = rules
+        self.on_item = on_item
+        self.debouncer = Debouncer(quiet_s)
+        # Content hash to the file it was first split from.
+        self.seen: dict[str, Path] = {}
+        self.processed = 0
+        self.skipped = 0
+        self._queue: deque[tuple[Path, HashedFileProtocol]] = deque()
+        self._in_flight: dict[Future[BatchItem], Path] = {}
+
+    def accept(self, path: Path) -> bool:
+        """Hash a ready file, and queue it unless its content was already split."""
+        try:
+            hashed_file = make_hashed_file(path, hashlib.sha256())
+        except OSError as error:
+            logger.warning("Could not hash %s: %s", path, error)
+            return False
+        if (first := self.seen.get(hashed_file.file_hash)) is not None:
+            logger.info("Skipping %s, the same content as %s", path, first)
+            self.skipped += 1
+            return False
+        # The output for this path is replaced, so forget its earlier content.
+        self.seen = {key: value for key, value in self.seen.items() if value != path}
+        self.seen[hashed_file.file_hash] = path
+        self._queue.append((path, hashed_file))
+        return True
+
+    def _finish(self, item: BatchItem, in_pool: bool):
+        self.processed += 1
+        if item.result is not None and in_pool:
+            log_metrics(item.result)
+        if self.cache is not None:
+            if item.cache_stats is not None:
+                self.cache.stats.update(item.cache_stats)
+            if item.new_entry is not None:
+                self.cache.add(item.new_entry)
+                self.cache.save()
+        if self.on_item is not None:
+            self.on_item(item)
+
+    def _split_args(self, path: Path, hashed_file: HashedFileProtocol) -> tuple:
+        manifest_path = None if self.cache is None else self.cache.manifest_path
+        rebuild = False if self.cache is None else self.cache.rebuild
+        return (
+            path,
+            self.output_root / input_stem(path),
+            manifest_path,
+            rebuild,
+            self.output_format,
+            False,
+            hashed_file,
+            self.rules,
+        )
+
+    def _dispatch(self, executor: Executor | None, block: bool):
+        """Start queued splits, keeping at most 2 per worker in flight."""
+        if executor is None:
+            while self._queue:
+                self._finish(
+                    split_one(*self._split_args(*self._queue.popleft())), False
+                )
+            return
+        done, _ = wait_futures(
+            self._in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED
+        )
+        for future in done:
+            path = self._in_flight.pop(future)
+            try:
+                item = future.result()
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                logger.exception("Worker failed")
+                item = BatchItem(
+                    input_path=path,
+                    output_dir=self.output_root / input_stem(path),
+                    error=f"{error.__class__.__name__}: {error}",
+                )
+            self._finish(item, True)
+        while self._queue and len(self._in_flight) < self.jobs * 2:
+            path, hashed_file = self._queue.popleft()
+            future = executor.submit(split_one, *self._split_args(path, hashed_file))
+            self._in_flight[future] = path
+
+    def run(self, stop: threading.Event | None = None, max_files: int | None = None):
+        """
+        Watch until `stop` is set, or `max_files` files have been split.
+
+        Files still being split when stopping are waited for.
+        """
+        if stop is None:
+            stop = threading.Event()
+        if self.cache is not None:
+            self.cache.save()
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        watcher = make_watcher(self.directory, self.pattern, polling=self.polling)
+        logger.info("Watching %s with %r", self.directory, watcher)
+        with worker_logging() as log_args:
+            executor = None
+            if self.jobs > 1:
+                executor = ProcessPoolExecutor(
+                    max_workers=self.jobs,
+                    initializer=_init_watch_worker,
+                    initargs=log_args,
+                )
+            try:
+                while not stop.is_set():
+                    if max_files is not None and self.processed >= max_files:
+                        break
+                    for path in watcher.changes(self.poll_interval_s):
+                        self.debouncer.touch(path)
+                    for path in self.debouncer.ready():
+                        self.accept(path)
+                    self._dispatch(executor, block=False)
+                while executor is not None and self._in_flight:
+                    self._dispatch(executor, block=True)
+            finally:
+                watcher.close()
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}("
+            f"directory={self.directory!r}, output_root={self.output_root!r})"
+        )
@@ -0,0 +1,76 @@
+"""
+Logging from pool worker processes.
+
+A forked worker inherits the handlers of the parent, which may be queues that
+no listener reads in the worker, or files the parent also writes. Workers drop
+those handlers, and put their records on a multiprocessing queue instead, which
+a listener thread in the parent hands to the parent's loggers. Records from
+workers are then filtered, formatted and written as if logged in the parent::
+
+    with worker_logging() as log_args:
+        with ProcessPoolExecutor(
+            initializer=init_worker_logging, initargs=log_args
+        ) as executor:
+            ...
+"""
+
+import logging
+import multiprocessing
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing.queues import Queue
+from typing import Iterator
+
+PACKAGE_LOGGER = "pbs_split"
+
+WorkerLogArgs = tuple["Queue[logging.LogRecord] | None", int]
+
+
+class _ParentLoggers:
+    """Hand each record to the parent's logger of the same name."""
+
+    def handle(self, record: logging.LogRecord):
+        target = logging.getLogger(record.name)
+        if target.isEnabledFor(record.levelno):
+            target.handle(record)
+
+
+@contextmanager
+def worker_logging() -> Iterator[WorkerLogArgs]:
+    """
+    Forward the log records of pool workers to the parent, while in the context.
+
+    Shut the pool down before leaving the context, so every record is handled.
+
+    Yields:
+        The initargs for :func:`init_worker_logging`.
+    """
+    log_queue: "Queue[logging.LogRecord]" = multiprocessing.Queue()
+    listener = QueueListener(log_queue, _ParentLoggers())
+    listener.start()
+    try:
+        yield log_queue, logging.getLogger(PACKAGE_LOGGER).getEffectiveLevel()
+    finally:
+        listener.stop()
+        log_queue.close()
+        log_queue.join_thread()
+
+
+def init_worker_logging(
+    log_queue: "Queue[logging.LogRecord] | None" = None, level: int = logging.WARNING
+):
+    """
+    Drop the package log handlers a worker inherited, and log to `log_queue`.
+
+    Without a queue, records propagate to the worker's root logger.
+    """
+    package_logger = logging.getLogger(PACKAGE_LOGGER)
+    for handler in list(package_logger.handlers):
+        package_logger.removeHandler(handler)
+    if log_queue is None:
+        package_logger.addHandler(logging.NullHandler())
+        return
+    package_logger.addHandler(QueueHandler(log_queue))
+    package_logger.setLevel(level)
+    # The parent's loggers pass the record on to its own root logger.
+    package_logger.propagate = False
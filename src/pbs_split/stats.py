@@ -0,0 +1,307 @@
+"""
+Vectorized trip statistics, using numpy.
+
+Trips are loaded into flat numpy arrays, one element per trip, and aggregated
+per base and equipment with ``bincount`` and ``reduceat``, so the cost of a
+summary does not depend on Python loops over the trips. Columnar split output
+is loaded straight from the mapped file.
+
+Requires numpy, ``pip install pbs-split[stats]``.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from pbs_split.parse import parse_package
+from pbs_split.split.columnar import COLUMNAR_FILE_NAME, ColumnarTrips
+from pbs_split.split.rules import BoundaryRules
+from pbs_split.split.splitter import DEFAULT_ENCODING
+
+ARRAY_FIELDS = (
+    "group",
+    "credit",
+    "block",
+    "tafb",
+    "days",
+    "layover_trip",
+    "layover_station",
+)
+
+
+class Codes:
+    """Assign consecutive integer codes to labels."""
+
+    def __init__(self) -> None:
+        self.labels: list = []
+        self._codes: dict = {}
+
+    def code(self, label) -> int:
+        if (code := self._codes.get(label)) is None:
+            code = len(self.labels)
+            self._codes[label] = code
+            self.labels.append(label)
+        return code
+
+
+@dataclass
+class TripArrays:
+    """
+    Trip attributes as numpy arrays.
+
+    Groups are (base, equipment) pairs. Layovers are stored flat, with the index
+    of the trip each layover belongs to.
+    """
+
+    group_labels: list[tuple[str, str]]
+    group: np.ndarray
+    credit: np.ndarray
+    block: np.ndarray
+    tafb: np.ndarray
+    days: np.ndarray
+    station_labels: list[str]
+    layover_trip: np.ndarray
+    layover_station: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.group)
+
+
+@dataclass
+class GroupStats:
+    base: str
+    equipment: str
+    trips: int
+    credit_total: int
+    credit_mean: float
+    credit_min: int
+    credit_max: int
+    block_total: int
+    block_mean: float
+    tafb_mean: float
+    credit_per_tafb: float
+    days: dict[int, int] = field(default_factory=dict)
+    layovers: list[tuple[str, int]] = field(default_factory=list)
+
+
+def _build_arrays(
+    groups: Codes,
+    stations: Codes,
+    group: Sequence[int],
+    credit: Sequence[int],
+    block: Sequence[int],
+    tafb: Sequence[int],
+    days: Sequence[int],
+    layover_trip: Sequence[int],
+    layover_station: Sequence[int],
+) -> TripArrays:
+    return TripArrays(
+        group_labels=groups.labels,
+        group=np.asarray(group, dtype=np.int32),
+        credit=np.asarray(credit, dtype=np.int32),
+        block=np.asarray(block, dtype=np.int32),
+        tafb=np.asarray(tafb, dtype=np.int32),
+        days=np.asarray(days, dtype=np.int32),
+        station_labels=stations.labels,
+        layover_trip=np.asarray(layover_trip, dtype=np.int64),
+        layover_station=np.asarray(layover_station, dtype=np.int32),
+    )
+
+
+def arrays_from_columnar(path: Path) -> TripArrays:
+    """Load trip arrays from a columnar split file."""
+    with ColumnarTrips(path) as trips:
+        groups = Codes()
+        stations = Codes()
+        bases = trips.raw_column("base")
+        equipment = trips.raw_column("equipment")
+        # Map string table indexes to group codes once per distinct pair.
+        pair_codes: dict[tuple[int, int], int] = {}
+        group = []
+        for pair in zip(bases, equipment):
+            if (code := pair_codes.get(pair)) is None:
+                code = groups.code((trips.string(pair[0]), trips.string(pair[1])))
+                pair_codes[pair] = code
+            group.append(code)
+        layover_trip = []
+        layover_station = []
+        layover_strings: dict[int, list[int]] = {}
+        for trip_idx, string_idx in enumerate(trips.raw_column("layovers")):
+            if (codes := layover_strings.get(string_idx)) is None:
+                codes = [stations.code(s) for s in trips.string(string_idx).split()]
+                layover_strings[string_idx] = codes
+            layover_trip.extend([trip_idx] * len(codes))
+            layover_station.extend(codes)
+        # Copy the numeric columns, so the mapping can be closed.
+        return _build_arrays(
+            groups,
+            stations,
+            group,
+            np.array(trips.numpy_column("credit")),
+            np.array(trips.numpy_column("block")),
+            np.array(trips.numpy_column("tafb")),
+            np.array(trips.numpy_column("days")),
+            layover_trip,
+            layover_station,
+        )
+
+
+def arrays_from_package(
+    input_path: Path,
+    encoding: str = DEFAULT_ENCODING,
+    rules: BoundaryRules | None = None,
+) -> TripArrays:
+    """Load trip arrays by parsing a bid-package text file, split by `rules`."""
+    groups = Codes()
+    stations = Codes()
+    group, credit, block, tafb, days = [], [], [], [], []
+    layover_trip: list[int] = []
+    layover_station: list[int] = []
+    package = parse_package(input_path, encoding=encoding, rules=rules)
+    for trip_idx, trip in enumerate(package.trips()):
+        group.append(groups.code((trip.base, trip.equipment)))
+        credit.append(trip.credit)
+        block.append(trip.block)
+        tafb.append(trip.tafb)
+        days.append(trip.days)
+        for station in trip.layover_stations():
+            layover_trip.append(trip_idx)
+            layover_station.append(stations.code(station))
+    return _build_arrays(
+        groups,
+        stations,
+        group,
+        credit,
+        block,
+        tafb,
+        days,
+        layover_trip,
+        layover_station,
+    )
+
+
+def load_arrays(path: Path, rules: BoundaryRules | None = None) -> TripArrays:
+    """
+    Load trip arrays from a columnar file, a split directory holding a columnar
+    file, or a bid-package text file. A package is split by `rules`, the
+    columnar file was already split.
+
+    Raises:
+        ValueError: `path` is a directory without a columnar file.
+    """
+    if path.is_dir():
+        if not (path / COLUMNAR_FILE_NAME).is_file():
+            raise ValueError(
+                f"{path} is not a columnar split, "
+                "re-run split with --format columnar."
+            )
+        path = path / COLUMNAR_FILE_NAME
+    if path.suffix == Path(COLUMNAR_FILE_NAME).suffix:
+        return arrays_from_columnar(path)
+    return arrays_from_package(path, rules=rules)
+
+
+def concat_arrays(arrays: Iterable[TripArrays]) -> TripArrays:
+    """Combine trip arrays, merging their group and station labels."""
+    groups = Codes()
+    stations = Codes()
+    parts: dict[str, list[np.ndarray]] = {name: [] for name in ARRAY_FIELDS}
+    trip_offset = 0
+    for item in arrays:
+        group_map = np.array(
+            [groups.code(label) for label in item.group_labels], dtype=np.int32
+        )
+        station_map = np.array(
+            [stations.code(label) for label in item.station_labels], dtype=np.int32
+        )
+        parts["group"].append(group_map[item.group] if len(item) else item.group)
+        for name in ("credit", "block", "tafb", "days"):
+            parts[name].append(getattr(item, name))
+        parts["layover_trip"].append(item.layover_trip + trip_offset)
+        parts["layover_station"].append(
+            station_map[item.layover_station]
+            if len(item.layover_station)
+            else item.layover_station
+        )
+        trip_offset += len(item)
+    return _build_arrays(
+        groups,
+        stations,
+        *(np.concatenate(parts[name]) if parts[name] else [] for name in ARRAY_FIELDS),
+    )
+
+
+def summarize(arrays: TripArrays, top_layovers: int = 5) -> list[GroupStats]:
+    """
+    Summarize trips per base and equipment.
+
+    Args:
+        arrays: The trip arrays.
+        top_layovers: The number of most common layover stations to report.
+
+    Returns:
+        One summary per group, in order of first appearance.
+    """
+    group_count = len(arrays.group_labels)
+    if group_count == 0:
+        return []
+    counts = np.bincount(arrays.group, minlength=group_count)
+    credit_total = np.bincount(
+        arrays.group, weights=arrays.credit, minlength=group_count
+    )
+    block_total = np.bincount(arrays.group, weights=arrays.block, minlength=group_count)
+    tafb_total = np.bincount(arrays.group, weights=arrays.tafb, minlength=group_count)
+    order = np.argsort(arrays.group, kind="stable")
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sorted_credit = arrays.credit[order]
+    credit_min = np.minimum.reduceat(sorted_credit, starts)
+    credit_max = np.maximum.reduceat(sorted_credit, starts)
+    day_width = int(arrays.days.max()) + 1
+    day_counts = np.bincount(
+        arrays.group.astype(np.int64) * day_width + arrays.days,
+        minlength=group_count * day_width,
+    ).reshape(group_count, day_width)
+    station_count = max(len(arrays.station_labels), 1)
+    layover_counts = np.bincount(
+        arrays.group[arrays.layover_trip].astype(np.int64) * station_count
+        + arrays.layover_station,
+        minlength=group_count * station_count,
+    ).reshape(group_count, station_count)
+    top = np.argsort(-layover_counts, axis=1, kind="stable")[:, :top_layovers]
+    summaries = []
+    for idx, (base, equipment) in enumerate(arrays.group_labels):
+        trips = int(counts[idx])
+        summaries.append(
+            GroupStats(
+                base=base,
+                equipment=equipment,
+                trips=trips,
+                credit_total=int(credit_total[idx]),
+                credit_mean=float(credit_total[idx] / trips),
+                credit_min=int(credit_min[idx]),
+                credit_max=int(credit_max[idx]),
+                block_total=int(block_total[idx]),
+                block_mean=float(block_total[idx] / trips),
+                tafb_mean=float(tafb_total[idx] / trips),
+                credit_per_tafb=float(credit_total[idx] / max(tafb_total[idx], 1)),
+                days={
+                    day: int(count)
+                    for day, count in enumerate(day_counts[idx])
+                    if count
+                },
+                layovers=[
+                    (arrays.station_labels[code], int(layover_counts[idx, code]))
+                    for code in top[idx]
+                    if layover_counts[idx, code]
+                ],
+            )
+        )
+    return summaries
+
+
+def format_minutes(minutes: float) -> str:
+    """Format minutes as ``H.MM``, the way the bid package shows durations."""
+    hours, remainder = divmod(round(minutes), 60)
+    return f"{hours}.{remainder:02d}"
@@ -0,0 +1,292 @@
+"""
+A deterministic generator of synthetic bid packages.
+
+The generated text follows the layout described in
+:mod:`pbs_split.split.boundaries`, with consistent times, so it can be split,
+indexed and parsed like a real bid package. The same configuration always
+produces the same bytes, which makes it suitable for benchmarks::
+
+    config = config_for_size(100 * 2**20)
+    write_package(Path("package.txt"), config)
+
+:func:`text_to_pdf` lays the text out as a simple PDF, one pdf page per bid
+package page, for testing PDF input.
+"""
+
+import random
+from dataclasses import dataclass
+from math import ceil
+from pathlib import Path
+from typing import Iterator
+
+from pbs_split.split.boundaries import PAGE_BREAK
+
+STATIONS = (
+    "ATL", "BOS", "CLT", "DCA", "DEN", "DFW", "EWR", "IAH", "LAS", "LAX",
+    "LGA", "MCO", "MIA", "MSP", "PHL", "PHX", "SAN", "SEA", "SFO", "SLC",
+)  # fmt: skip
+GROUPS = (("ORD", "737"), ("LAX", "320"), ("DFW", "787"), ("MIA", "321"))
+SEPARATOR = "-" * 71
+ISSUED = "ISSUED 08APR2026  EFF 02MAY2026"
+
+
+@dataclass
+class SyntheticConfig:
+    """
+    The shape of a synthetic bid package.
+
+    Args:
+        pages: The number of pages.
+        trips_per_page: The number of trips that start on each page.
+        legs_per_trip: The number of flight legs in each trip.
+        legs_per_duty: The most legs in one duty period.
+        groups: (base, equipment) pairs, each used for an equal run of pages.
+        span_pages: Continue the last trip on a page onto the next page, if both
+            pages belong to the same group.
+        seed: The random seed.
+    """
+
+    pages: int = 10
+    trips_per_page: int = 20
+    legs_per_trip: int = 4
+    legs_per_duty: int = 2
+    groups: tuple[tuple[str, str], ...] = GROUPS[:1]
+    span_pages: bool = True
+    seed: int = 0
+
+    @property
+    def trips(self) -> int:
+        return self.pages * self.trips_per_page
+
+
+def clock(minutes: int) -> str:
+    """Format minutes as a ``HHMM`` clock time."""
+    hours, minutes = divmod(minutes % 1440, 60)
+    return f"{hours:02d}{minutes:02d}"
+
+
+def duration(minutes: int) -> str:
+    """Format minutes as a ``H.MM`` duration."""
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}.{minutes:02d}"
+
+
+def page_header(base: str, equipment: str, page: int) -> str:
+    return f"BASE {base}  EQP {equipment}  {ISSUED}{'':17}PAGE {page}\n"
+
+
+def trip_lines(
+    rng: random.Random,
+    trip_id: int,
+    base: str,
+    equipment: str,
+    legs: int,
+    per_duty: int,
+) -> list[str]:
+    """
+    Make the lines of one trip, starting and ending at `base`.
+
+    Times are kept on an absolute clock, so the duty, credit and TAFB totals
+    agree with the legs.
+    """
+    lines = [f"SEQ {trip_id}   {rng.randint(1, 9)} OPS   POSN CA FO\n"]
+    station = base
+    now = rng.randrange(300, 1200, 15)
+    trip_start = now
+    total_block = 0
+    total_credit = 0
+    remaining = legs
+    while remaining:
+        duty_legs = min(remaining, per_duty)
+        remaining -= duty_legs
+        report = now
+        lines.append(f"RPT {clock(report)}\n")
+        now += 60
+        duty_block = 0
+        for leg in range(duty_legs):
+            last_leg = remaining == 0 and leg == duty_legs - 1
+            arrival_station = base
+            if not last_leg:
+                arrival_station = rng.choice([s for s in STATIONS if s != station])
+            block = rng.randrange(45, 300, 5)
+            lines.append(
+                f" {report // 1440 + 1}  {rng.randint(100, 9999):<4}  {equipment}  "
+                f"{station} {clock(now)}  {arrival_station} {clock(now + block)}  "
+                f"{duration(block)}\n"
+            )
+            station = arrival_station
+            now += block
+            duty_block += block
+            if leg < duty_legs - 1:
+                now += rng.randrange(40, 120, 5)
+        now += 30
+        credit = max(duty_block, 300)
+        total_block += duty_block
+        total_credit += credit
+        lines.append(
+            f"RLS {clock(now)}  BLK {duration(duty_block)}  CRD {duration(credit)}  "
+            f"DUTY {duration(now - report)}\n"
+        )
+        if remaining:
+            rest = rng.randrange(600, 1800, 15)
+            lines.append(f"LAYOVER {station} {duration(rest)}\n")
+            now += rest
+    lines.append(
+        f"TTL  BLK {duration(total_block)}  CRD {duration(total_credit)}  "
+        f"TAFB {duration(now - trip_start)}\n"
+    )
+    return lines
+
+
+def iter_package_lines(config: SyntheticConfig) -> Iterator[str]:
+    """Generate the lines of a synthetic bid package."""
+    rng = random.Random(config.seed)
+    pages_per_group = max(ceil(config.pages / len(config.groups)), 1)
+
+    def group(page: int) -> tuple[str, str]:
+        return config.groups[min((page - 1) // pages_per_group, len(config.groups) - 1)]
+
+    trip_id = 10000
+    header_written = False
+    for page in range(1, config.pages + 1):
+        base, equipment = group(page)
+        if not header_written:
+            yield page_header(base, equipment, page)
+        header_written = False
+        for idx in range(config.trips_per_page):
+            trip_id += 1
+            lines = trip_lines(
+                rng,
+                trip_id,
+                base,
+                equipment,
+                config.legs_per_trip,
+                config.legs_per_duty,
+            )
+            span = (
+                config.span_pages
+                and idx == config.trips_per_page - 1
+                and page < config.pages
+                and group(page + 1) == (base, equipment)
+            )
+            # Break after the first duty period, or before the TTL line.
+            cut = next(
+                (n for n, line in enumerate(lines) if line.startswith("LAYOVER")),
+                len(lines) - 2,
+            )
+            if span:
+                yield from lines[: cut + 1]
+                yield PAGE_BREAK + page_header(base, equipment, page + 1)
+                header_written = True
+                yield from lines[cut + 1 :]
+            else:
+                yield from lines
+            yield SEPARATOR + "\n"
+        if page < config.pages and not header_written:
+            yield PAGE_BREAK
+    yield PAGE_BREAK
+
+
+def generate_package(config: SyntheticConfig) -> str:
+    """Generate a synthetic bid package as a string."""
+    return "".join(iter_package_lines(config))
+
+
+def write_package(output_path: Path, config: SyntheticConfig) -> int:
+    """
+    Write a synthetic bid package.
+
+    Returns:
+        The number of bytes written.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(output_path, mode="w", encoding="utf-8", newline="\n") as file_handle:
+        batch: list[str] = []
+        for line in iter_package_lines(config):
+            batch.append(line)
+            if len(batch) >= 4096:
+                written += file_handle.write("".join(batch))
+                batch.clear()
+        written += file_handle.write("".join(batch))
+    return written
+
+
+def config_for_size(
+    target_bytes: int,
+    trips_per_page: int = 20,
+    legs_per_trip: int = 4,
+    legs_per_duty: int = 2,
+    groups: tuple[tuple[str, str], ...] = GROUPS,
+    seed: int = 0,
+) -> SyntheticConfig:
+    """Make a configuration for a package of about `target_bytes` bytes."""
+    sample = SyntheticConfig(
+        pages=2,
+        trips_per_page=trips_per_page,
+        legs_per_trip=legs_per_trip,
+        legs_per_duty=legs_per_duty,
+        seed=seed,
+    )
+    page_bytes = len(generate_package(sample).encode()) / sample.pages
+    return SyntheticConfig(
+        pages=max(round(target_bytes / page_bytes), 1),
+        trips_per_page=trips_per_page,
+        legs_per_trip=legs_per_trip,
+        legs_per_duty=legs_per_duty,
+        groups=groups,
+        seed=seed,
+    )
+
+
+def _pdf_string(line: str) -> bytes:
+    escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return escaped.encode("latin-1", errors="replace")
+
+
+def text_to_pdf(text: str, font_size: int = 8) -> bytes:
+    """
+    Lay out bid-package text as a PDF, in a monospaced font.
+
+    Each page of the text, separated by form feeds, becomes a pdf page, with
+    one line of text per line of the page.
+    """
+    pages = [page.splitlines() for page in text.split(PAGE_BREAK) if page.strip()]
+    line_height = font_size + 2
+    height = max((len(lines) for lines in pages), default=0) * line_height + 72
+    objects: list[bytes] = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>"]
+    pages_id = 2 + 2 * len(pages)
+    page_ids = []
+    for lines in pages:
+        content = [
+            b"BT /F1 %d Tf %d TL 36 %d Td" % (font_size, line_height, height - 36)
+        ]
+        content.extend(b"(" + _pdf_string(line) + b") Tj T*" for line in lines)
+        content.append(b"ET")
+        stream = b"\n".join(content)
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 %d] "
+            b"/Resources << /Font << /F1 1 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, height, len(objects))
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects.append(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(pages)))
+    objects.append(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        len(objects),
+        xref,
+    )
+    return bytes(pdf)
@@ -0,0 +1,38 @@
+"""
+Compare two benchmark result files.
+
+Usage::
+
+    python -m tests.benchmarks.compare .benchmarks/OLD.json .benchmarks/NEW.json
+"""
+
+import json
+import sys
+from pathlib import Path
+
+
+def load(path: Path) -> tuple[str, dict[tuple[str, str], float]]:
+    data = json.loads(path.read_text())
+    best = {(item["name"], item["scale"]): item["best_s"] for item in data["results"]}
+    return data.get("commit", path.stem), best
+
+
+def compare(old_path: Path, new_path: Path) -> list[str]:
+    old_commit, old = load(old_path)
+    new_commit, new = load(new_path)
+    lines = [
+        f"{'benchmark':<16} {'scale':>6} {old_commit:>10} {new_commit:>10} {'change':>8}"
+    ]
+    for key in sorted(old.keys() & new.keys()):
+        change = new[key] / old[key] - 1
+        lines.append(
+            f"{key[0]:<16} {key[1]:>6} {old[key]:>9.3f}s {new[key]:>9.3f}s "
+            f"{change:>+8.1%}"
+        )
+    return lines
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+    print("\n".join(compare(Path(sys.argv[1]), Path(sys.argv[2]))))
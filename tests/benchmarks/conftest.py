@@ -0,0 +1,140 @@
+"""
+Fixtures for the benchmark suite.
+
+Benchmark results are collected for the session and saved as JSON, to
+``.benchmarks/<commit>.json`` by default, or to the file named by the
+``PBS_SPLIT_BENCH_RESULTS`` environment variable. Compare two result files with
+``python -m tests.benchmarks.compare OLD NEW``.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable
+
+import pytest
+
+from pbs_split.synthetic import config_for_size, write_package
+
+RESULTS_DIR = Path(".benchmarks")
+# name: size in MB. Select with PBS_SPLIT_BENCH_SCALES, e.g. "1MB,100MB".
+SCALES = {"1MB": 1, "100MB": 100, "1GB": 1024}
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    scale: str
+    input_bytes: int
+    rounds: int
+    best_s: float
+    mean_s: float
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.input_bytes / 2**20 / self.best_s
+
+
+class BenchmarkRecorder:
+    """Time benchmark functions, and keep the results for the session."""
+
+    def __init__(self) -> None:
+        self.results: list[BenchmarkResult] = []
+
+    def __call__(
+        self,
+        name: str,
+        scale: str,
+        input_bytes: int,
+        func: Callable[[], object],
+        rounds: int = 3,
+        setup: Callable[[], object] | None = None,
+    ) -> BenchmarkResult:
+        timings = []
+        for _ in range(rounds):
+            if setup is not None:
+                setup()
+            start = perf_counter_ns()
+            func()
+            timings.append((perf_counter_ns() - start) / 1e9)
+        result = BenchmarkResult(
+            name=name,
+            scale=scale,
+            input_bytes=input_bytes,
+            rounds=rounds,
+            best_s=min(timings),
+            mean_s=sum(timings) / len(timings),
+        )
+        self.results.append(result)
+        print(
+            f"\n{name} {scale}: best {result.best_s:.3f}s "
+            f"mean {result.mean_s:.3f}s {result.mb_per_s:.1f} MB/s"
+        )
+        return result
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def selected_scales() -> list[str]:
+    names = os.environ.get("PBS_SPLIT_BENCH_SCALES")
+    if not names:
+        return list(SCALES)
+    return [name.strip() for name in names.split(",") if name.strip() in SCALES]
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder():
+    recorder = BenchmarkRecorder()
+    yield recorder
+    if not recorder.results:
+        return
+    commit = _commit()
+    results_path = Path(
+        os.environ.get("PBS_SPLIT_BENCH_RESULTS", RESULTS_DIR / f"{commit}.json")
+    )
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": [
+            {**asdict(result), "mb_per_s": result.mb_per_s}
+            for result in recorder.results
+        ],
+    }
+    results_path.write_text(json.dumps(data, indent=1))
+    print(f"\nBenchmark results saved to {results_path}")
+
+
+@pytest.fixture(scope="session")
+def synthetic_package(tmp_path_factory) -> Callable[[str], Path]:
+    """Write a synthetic bid package for a scale, once per session."""
+    packages: dict[str, Path] = {}
+    package_dir = tmp_path_factory.mktemp("synthetic")
+
+    def make(scale: str) -> Path:
+        if scale not in packages:
+            path = package_dir / f"package_{scale}.txt"
+            write_package(path, config_for_size(SCALES[scale] * 2**20))
+            packages[scale] = path
+        return packages[scale]
+
+    return make
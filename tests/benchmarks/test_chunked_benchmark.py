@@ -0,0 +1,52 @@
+"""
+Compare the serial split of one package with a split in parallel chunks.
+
+Run with ``pytest --runslow -s tests/benchmarks/test_chunked_benchmark.py``.
+The chunked split only gains with more than one cpu, see ``cpu_count`` in the
+saved results.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from pbs_split.split.chunked import split_file_chunked
+from pbs_split.split.splitter import split_file
+from tests.benchmarks.conftest import BenchmarkRecorder, selected_scales
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("scale", selected_scales())
+def test_chunked_split(
+    benchmark_recorder: BenchmarkRecorder,
+    synthetic_package: Callable[[str], Path],
+    tmp_path: Path,
+    scale: str,
+):
+    input_path = synthetic_package(scale)
+    size = input_path.stat().st_size
+    output_dir = tmp_path / "out"
+
+    def clean():
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    benchmark_recorder(
+        "split_serial",
+        scale,
+        size,
+        lambda: split_file(input_path, output_dir),
+        rounds=2,
+        setup=clean,
+    )
+    jobs = os.cpu_count() or 1
+    benchmark_recorder(
+        f"split_chunked_{jobs}",
+        scale,
+        size,
+        lambda: split_file_chunked(input_path, output_dir, jobs=jobs),
+        rounds=2,
+        setup=clean,
+    )
@@ -0,0 +1,66 @@
+"""
+Compare the read modes of :func:`hash_binary_file`.
+
+Run with ``pytest --runslow -s tests/benchmarks``. The size of the large file
+can be set in MB with the ``PBS_SPLIT_BENCH_LARGE_MB`` environment variable.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from time import perf_counter_ns
+
+import pytest
+
+from pbs_split.snippets.hash.file_hash import hash_file
+
+MODES = ("read", "readinto", "mmap", "auto")
+LARGE_MB = int(os.environ.get("PBS_SPLIT_BENCH_LARGE_MB", "2048"))
+
+
+def _write_file(path: Path, size: int):
+    block = os.urandom(2**20)
+    with open(path, "wb") as file_handle:
+        remaining = size
+        while remaining > 0:
+            file_handle.write(block[: min(remaining, len(block))])
+            remaining -= len(block)
+
+
+def _time_modes(paths: list[Path]) -> dict[str, float]:
+    timings = {}
+    for mode in MODES:
+        start = perf_counter_ns()
+        for path in paths:
+            hash_file(path, hashlib.sha256(), mode=mode)
+        timings[mode] = (perf_counter_ns() - start) / 1e9
+    return timings
+
+
+def _report(label: str, total_bytes: int, timings: dict[str, float]):
+    print(f"\n{label} ({total_bytes / 2**20:.1f} MB)")
+    for mode, seconds in timings.items():
+        print(f"  {mode:>9}: {seconds:8.3f}s {total_bytes / 2**20 / seconds:9.1f} MB/s")
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "label,file_size,file_count",
+    [
+        ("small", 2**12, 2000),
+        ("medium", 2**20 * 32, 4),
+        ("large", 2**20 * LARGE_MB, 1),
+    ],
+)
+def test_hash_modes(tmp_path: Path, label: str, file_size: int, file_count: int):
+    paths = []
+    for idx in range(file_count):
+        path = tmp_path / f"{label}_{idx}.bin"
+        _write_file(path, file_size)
+        paths.append(path)
+    timings = _time_modes(paths)
+    _report(
+        f"{label}: {file_count} x {file_size} bytes", file_size * file_count, timings
+    )
+    expected = {hash_file(path, hashlib.sha256(), mode="read") for path in paths}
+    assert {hash_file(path, hashlib.sha256()) for path in paths} == expected
@@ -0,0 +1,70 @@
+"""
+Compare split throughput with debug logging off, queued, and synchronous.
+
+Run with ``pytest --runslow -s tests/benchmarks``. The input size can be set in
+MB with the ``PBS_SPLIT_BENCH_LOG_MB`` environment variable.
+
+Queued logging moves formatting, writes and rotation to the listener thread, so
+it only shortens the split when there is a spare core for the listener to run
+on. On a single core the two threads share the GIL, and the queued runs can be
+slower than synchronous logging.
+"""
+
+import logging
+import os
+from pathlib import Path
+from time import perf_counter_ns
+
+import pytest
+
+from pbs_split.snippets.logging.logging import queue_handler, rotating_file_handler
+from pbs_split.split.splitter import split_file
+from pbs_split.synthetic import config_for_size, write_package
+
+LOG_MB = int(os.environ.get("PBS_SPLIT_BENCH_LOG_MB", "16"))
+
+
+def _time_split(input_path: Path, output_dir: Path) -> float:
+    start = perf_counter_ns()
+    split_file(input_path, output_dir)
+    return (perf_counter_ns() - start) / 1e9
+
+
+@pytest.mark.slow
+def test_debug_logging_throughput(tmp_path: Path):
+    input_path = tmp_path / "package.txt"
+    write_package(input_path, config_for_size(LOG_MB * 2**20))
+    size_mb = input_path.stat().st_size / 2**20
+    package_logger = logging.getLogger("pbs_split")
+    timings = {"off": _time_split(input_path, tmp_path / "off")}
+
+    file_handler = rotating_file_handler(tmp_path / "sync", "sync", logging.DEBUG)
+    package_logger.addHandler(file_handler)
+    package_logger.setLevel(logging.DEBUG)
+    try:
+        timings["sync"] = _time_split(input_path, tmp_path / "sync_out")
+    finally:
+        package_logger.removeHandler(file_handler)
+        file_handler.close()
+
+    dropped = {}
+    for policy in ("block", "drop"):
+        file_handler = rotating_file_handler(tmp_path / policy, policy, logging.DEBUG)
+        handler, listener = queue_handler([file_handler], policy=policy)
+        package_logger.addHandler(handler)
+        try:
+            timings[f"queued-{policy}"] = _time_split(
+                input_path, tmp_path / f"{policy}_out"
+            )
+        finally:
+            listener.stop()
+            package_logger.removeHandler(handler)
+            file_handler.close()
+        dropped[policy] = handler.dropped
+    package_logger.setLevel(logging.NOTSET)
+
+    print(f"\nsplit {size_mb:.1f} MB with debug logging")
+    for label, seconds in timings.items():
+        print(f"  {label:>12}: {seconds:8.3f}s {size_mb / seconds:9.1f} MB/s")
+    print(f"  records dropped: {dropped['drop']}")
+    assert dropped["block"] == 0
@@ -0,0 +1,71 @@
+"""
+Measure the memory used per trip by the parsed model.
+
+The compact model, with ``__slots__``, integer minutes and interned strings, is
+compared against the same trips held as plain dicts of the matched strings,
+which is what loading the split text without the model looks like.
+
+Run with ``pytest --runslow -s tests/benchmarks``.
+"""
+
+import tracemalloc
+from importlib import resources
+from io import BytesIO
+
+import pytest
+
+from pbs_split.parse import LEG_RE, TOTAL_RE, TRIP_RE, parse_trip
+from pbs_split.split.splitter import iter_raw_lines, iter_split_units
+from tests.resources import RESOURCES_ANCHOR
+
+TRIP_COUNT = 20000
+
+
+def _package_text(trip_count: int) -> bytes:
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    text = sample.read_text()
+    copies = []
+    for idx in range(trip_count // 4):
+        copy = text
+        for trip_id in ("1001", "1002", "1003", "1004"):
+            copy = copy.replace(f"SEQ {trip_id}", f"SEQ {int(trip_id) * 100000 + idx}")
+        copies.append(copy)
+    return "".join(copies).encode()
+
+
+def _as_dict(text: str) -> dict:
+    lines = text.splitlines()
+    trip = TRIP_RE.match(lines[0]).groupdict()  # type: ignore[union-attr]
+    trip["legs"] = [
+        match.groupdict() for line in lines if (match := LEG_RE.match(line))
+    ]
+    for line in lines:
+        if match := TOTAL_RE.match(line):
+            trip.update(match.groupdict())
+    return trip
+
+
+def _measure(factory) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = factory()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(held) == TRIP_COUNT
+    return after - before
+
+
+@pytest.mark.slow
+def test_model_memory():
+    data = _package_text(TRIP_COUNT)
+
+    def units():
+        return iter_split_units(iter_raw_lines(BytesIO(data)))
+
+    dict_bytes = _measure(lambda: [_as_dict(unit.text) for unit in units()])
+    model_bytes = _measure(lambda: [parse_trip(unit) for unit in units()])
+    print(
+        f"\n{TRIP_COUNT} trips: dicts {dict_bytes / TRIP_COUNT:.0f} bytes/trip, "
+        f"model {model_bytes / TRIP_COUNT:.0f} bytes/trip"
+    )
+    assert model_bytes < dict_bytes
@@ -0,0 +1,125 @@
+"""
+Benchmark splitting, hashing, indexing and stats on synthetic bid packages.
+
+Run with ``pytest --runslow -s tests/benchmarks/test_pipeline_benchmark.py``.
+Packages of 1MB, 100MB and 1GB are generated once per session. Choose scales
+with the ``PBS_SPLIT_BENCH_SCALES`` environment variable, e.g. ``1MB,100MB``.
+Results are saved as JSON, see ``tests/benchmarks/conftest.py``.
+"""
+
+import hashlib
+import shutil
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from pbs_split.snippets.hash.file_hash import hash_file
+from pbs_split.split.columnar import COLUMNAR_FILE_NAME, ColumnarWriter
+from pbs_split.split.index import build_index
+from pbs_split.split.splitter import split_file
+from tests.benchmarks.conftest import BenchmarkRecorder, selected_scales
+
+SCALES = selected_scales()
+
+
+def _rounds(scale: str) -> int:
+    return 1 if scale == "1GB" else 3
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("scale", SCALES)
+def test_split_text(
+    benchmark_recorder: BenchmarkRecorder,
+    synthetic_package: Callable[[str], Path],
+    tmp_path: Path,
+    scale: str,
+):
+    if scale == "1GB":
+        pytest.skip("One text file per trip is measured up to 100MB.")
+    input_path = synthetic_package(scale)
+    output_dir = tmp_path / "text"
+    benchmark_recorder(
+        "split_text",
+        scale,
+        input_path.stat().st_size,
+        lambda: split_file(input_path, output_dir),
+        rounds=_rounds(scale),
+        setup=lambda: shutil.rmtree(output_dir, ignore_errors=True),
+    )
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("scale", SCALES)
+def test_split_columnar(
+    benchmark_recorder: BenchmarkRecorder,
+    synthetic_package: Callable[[str], Path],
+    tmp_path: Path,
+    scale: str,
+):
+    input_path = synthetic_package(scale)
+    output_dir = tmp_path / "columnar"
+    result = benchmark_recorder(
+        "split_columnar",
+        scale,
+        input_path.stat().st_size,
+        lambda: split_file(input_path, output_dir, writer=ColumnarWriter(output_dir)),
+        rounds=_rounds(scale),
+    )
+    assert result.best_s > 0
+    assert (output_dir / COLUMNAR_FILE_NAME).is_file()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("scale", SCALES)
+def test_hash(
+    benchmark_recorder: BenchmarkRecorder,
+    synthetic_package: Callable[[str], Path],
+    scale: str,
+):
+    input_path = synthetic_package(scale)
+    benchmark_recorder(
+        "hash_sha256",
+        scale,
+        input_path.stat().st_size,
+        lambda: hash_file(input_path, hashlib.sha256()),
+        rounds=_rounds(scale),
+    )
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("scale", SCALES)
+def test_build_index(
+    benchmark_recorder: BenchmarkRecorder,
+    synthetic_package: Callable[[str], Path],
+    scale: str,
+):
+    input_path = synthetic_package(scale)
+    benchmark_recorder(
+        "build_index",
+        scale,
+        input_path.stat().st_size,
+        lambda: build_index(input_path, save=False),
+        rounds=_rounds(scale),
+    )
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("scale", SCALES)
+def test_stats(
+    benchmark_recorder: BenchmarkRecorder,
+    synthetic_package: Callable[[str], Path],
+    tmp_path: Path,
+    scale: str,
+):
+    stats = pytest.importorskip("pbs_split.stats")
+    input_path = synthetic_package(scale)
+    output_dir = tmp_path / "columnar"
+    split_file(input_path, output_dir, writer=ColumnarWriter(output_dir))
+    benchmark_recorder(
+        "stats_columnar",
+        scale,
+        input_path.stat().st_size,
+        lambda: stats.summarize(stats.load_arrays(output_dir)),
+        rounds=_rounds(scale),
+    )
@@ -0,0 +1,62 @@
+"""
+Compare naive per-rule boundary matching with the combined rule matcher.
+
+Run with ``pytest --runslow -s tests/benchmarks/test_rules_benchmark.py``. Each
+run classifies every line of a synthetic package, decoded once up front, so
+only the matching is timed:
+
+* ``naive``: ``re.match`` on the pattern string of each rule in turn, as a
+  configurable matcher would without precompiling.
+* ``per_rule``: each rule precompiled, and tried in turn, as
+  :func:`~pbs_split.split.boundaries.classify_line`.
+* ``combined``: one regex combining every rule, see
+  :mod:`pbs_split.split.rules`.
+"""
+
+import re
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from pbs_split.split.boundaries import classify_line
+from pbs_split.split.rules import DEFAULT_RULES, RULE_KINDS, compile_rules
+from tests.benchmarks.conftest import BenchmarkRecorder, selected_scales
+
+SCALES = [scale for scale in selected_scales() if scale != "1GB"]
+
+
+def naive_classify(line: str):
+    if not line.strip():
+        return None
+    for attribute, kind in RULE_KINDS:
+        if match := re.match(getattr(DEFAULT_RULES, attribute), line):
+            return kind, match
+    return None
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("scale", SCALES)
+def test_boundary_matching(
+    benchmark_recorder: BenchmarkRecorder,
+    synthetic_package: Callable[[str], Path],
+    scale: str,
+):
+    input_path = synthetic_package(scale)
+    lines = [
+        line.lstrip("\f") for line in input_path.read_text().splitlines(keepends=True)
+    ]
+    classifiers = {
+        "naive": naive_classify,
+        "per_rule": classify_line,
+        "combined": compile_rules().classify,
+    }
+    results = {}
+    for name, classify in classifiers.items():
+        results[name] = benchmark_recorder(
+            f"boundary_{name}",
+            scale,
+            input_path.stat().st_size,
+            lambda classify=classify: [classify(line) for line in lines],
+        )
+    assert results["combined"].best_s < results["naive"].best_s
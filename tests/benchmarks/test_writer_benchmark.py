@@ -0,0 +1,58 @@
+"""
+Compare the text writer with the atomic, batched writer.
+
+Run with ``pytest --runslow -s tests/benchmarks/test_writer_benchmark.py``.
+Each run splits a synthetic package into a fresh directory:
+
+* ``direct``: :class:`~pbs_split.split.splitter.TextDirectoryWriter`, each file
+  written in place.
+* ``atomic``: :class:`~pbs_split.split.atomic.AtomicTextWriter`, each file
+  written to a temporary name and renamed, without syncing.
+* ``atomic_thread``: the same, with files written on a background thread.
+* ``atomic_batch_sync``: the same, syncing once per batch.
+"""
+
+import shutil
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from pbs_split.split.atomic import AtomicTextWriter
+from pbs_split.split.splitter import TextDirectoryWriter, split_file
+from tests.benchmarks.conftest import BenchmarkRecorder, selected_scales
+
+SCALES = [scale for scale in selected_scales() if scale != "1GB"]
+WRITERS: dict[str, Callable[[Path], object]] = {
+    "direct": TextDirectoryWriter,
+    "atomic": AtomicTextWriter,
+    "atomic_thread": lambda path: AtomicTextWriter(path, background=True),
+    "atomic_batch_sync": lambda path: AtomicTextWriter(path, fsync="batch"),
+}
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("scale", SCALES)
+def test_writers(
+    benchmark_recorder: BenchmarkRecorder,
+    synthetic_package: Callable[[str], Path],
+    tmp_path: Path,
+    scale: str,
+):
+    input_path = synthetic_package(scale)
+    output_dir = tmp_path / "out"
+
+    def clean():
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    for name, make in WRITERS.items():
+        benchmark_recorder(
+            f"writer_{name}",
+            scale,
+            input_path.stat().st_size,
+            lambda make=make: split_file(
+                input_path, output_dir, writer=make(output_dir)  # type: ignore[arg-type]
+            ),
+            rounds=2,
+            setup=clean,
+        )
@@ -0,0 +1,105 @@
+"""Tests for the asyncio split and hash api."""
+
+import asyncio
+import hashlib
+import threading
+import time
+from importlib import resources
+from pathlib import Path
+from typing import AsyncIterator
+
+import pytest
+
+from pbs_split.split import async_split
+from pbs_split.snippets.hash.async_hash import async_bytes_iterator_hash
+from pbs_split.split.async_split import (
+    DEFAULT_MAX_CONCURRENCY,
+    AsyncSplitter,
+    async_split_file,
+)
+from pbs_split.split.splitter import SplitResult, split_file
+from tests.resources import RESOURCES_ANCHOR
+
+
+async def _blocks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for idx in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[idx : idx + size]
+
+
+def test_async_bytes_iterator_hash():
+    data = bytes(range(256)) * 100
+    digest = asyncio.run(async_bytes_iterator_hash(_blocks(data, 1000), hashlib.md5()))
+    assert digest == hashlib.md5(data).hexdigest()
+
+
+def test_async_splitter(test_output_dir: Path):
+    work_dir = test_output_dir / "test_async_splitter"
+    work_dir.mkdir()
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    input_paths = []
+    for name in ("a", "b", "c"):
+        input_path = work_dir / f"{name}.txt"
+        input_path.write_bytes(sample.read_bytes())
+        input_paths.append(input_path)
+    input_paths.append(work_dir / "missing.txt")
+
+    async def run():
+        async with AsyncSplitter(max_concurrency=2) as splitter:
+            hashed = await splitter.hash_file(input_paths[0])
+            results = await splitter.split_many(input_paths, work_dir / "out")
+        return hashed, results
+
+    hashed, results = asyncio.run(run())
+    assert hashed.file_hash == hashlib.sha256(sample.read_bytes()).hexdigest()
+    assert [isinstance(result, SplitResult) for result in results] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert isinstance(results[3], FileNotFoundError)
+    assert len(list((work_dir / "out" / "b").iterdir())) == 4
+
+
+@pytest.mark.parametrize("max_concurrency", [None, 2])
+def test_async_split_file_is_limited(
+    monkeypatch: pytest.MonkeyPatch, test_output_dir: Path, max_concurrency
+):
+    work_dir = test_output_dir / f"test_async_split_file_is_limited_{max_concurrency}"
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    lock = threading.Lock()
+    running = 0
+    most = 0
+
+    def slow_split_file(**kwargs):
+        nonlocal running, most
+        with lock:
+            running += 1
+            most = max(most, running)
+        time.sleep(0.05)
+        try:
+            return split_file(**kwargs)
+        finally:
+            with lock:
+                running -= 1
+
+    monkeypatch.setattr(async_split, "split_file", slow_split_file)
+
+    async def run():
+        splitter = None
+        if max_concurrency is not None:
+            splitter = AsyncSplitter(max_concurrency=max_concurrency)
+        results = await asyncio.gather(
+            *(
+                async_split_file(sample, work_dir / str(number), splitter=splitter)
+                for number in range(10)
+            )
+        )
+        if splitter is not None:
+            splitter.close()
+        return results
+
+    results = asyncio.run(run())
+    assert all(result.stats.units == 4 for result in results)
+    assert 1 < most <= (max_concurrency or DEFAULT_MAX_CONCURRENCY)
@@ -0,0 +1,133 @@
+"""Tests for the atomic, batched text writer."""
+
+import hashlib
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from pbs_split.snippets.hash.file_hash import hash_file
+from pbs_split.split.atomic import MANIFEST_FILE_NAME, AtomicTextWriter
+from pbs_split.split.chunked import split_file_chunked
+from pbs_split.split.compression import open_compressed
+from pbs_split.split.formats import FsyncPolicy, WriterOptions, make_writer
+from pbs_split.split import splitter
+from pbs_split.split.splitter import SplitUnit, iter_split_units, split_file
+from pbs_split.synthetic import SyntheticConfig, generate_package
+
+
+@pytest.fixture(name="input_path")
+def _input_path(tmp_path: Path) -> Path:
+    input_path = tmp_path / "package.txt"
+    input_path.write_text(generate_package(SyntheticConfig(pages=12, trips_per_page=5)))
+    return input_path
+
+
+@pytest.mark.parametrize("background", [False, True])
+@pytest.mark.parametrize("fsync", list(FsyncPolicy))
+def test_same_as_text_writer(
+    tmp_path: Path, input_path: Path, fsync: FsyncPolicy, background: bool
+):
+    expected = split_file(input_path, tmp_path / "expected")
+    output_dir = tmp_path / "out"
+    writer = AtomicTextWriter(
+        output_dir, fsync=fsync, batch_size=7, background=background
+    )
+    result = split_file(input_path, output_dir, writer=writer)
+    assert result.stats == expected.stats
+    assert [path.name for path in result.outputs] == [
+        path.name for path in expected.outputs
+    ]
+    for expected_path, output_path in zip(expected.outputs, result.outputs):
+        assert output_path.read_bytes() == expected_path.read_bytes()
+    # The hashes taken while writing match the files.
+    assert writer.hashes == {
+        path.name: hash_file(path, hashlib.sha256()) for path in result.outputs
+    }
+    assert sorted(output_dir.iterdir()) == sorted(result.outputs)
+
+
+def test_compressed_hashes_and_manifest(tmp_path: Path, input_path: Path):
+    output_dir = tmp_path / "out"
+    writer = make_writer(
+        "text.gz", output_dir, WriterOptions(background=True, manifest=True)
+    )
+    result = split_file(input_path, output_dir, writer=writer)
+    manifest_path = output_dir / MANIFEST_FILE_NAME
+    assert result.outputs[-1] == manifest_path
+    trips = result.outputs[:-1]
+    lines = manifest_path.read_text().splitlines()
+    assert lines == [
+        f"{hash_file(path, hashlib.sha256(), opener=open_compressed)}  {path.name}"
+        for path in trips
+    ]
+
+
+def test_failed_write_keeps_old_file(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, input_path: Path
+):
+    output_dir = tmp_path / "out"
+    first = split_file(input_path, output_dir).outputs[0]
+    old = first.read_bytes()
+    write_file = AtomicTextWriter._write_file
+
+    def failing_write_file(self, path: Path, data: bytes, sync: bool):
+        write_file(self, path, data[: len(data) // 2], sync)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(AtomicTextWriter, "_write_file", failing_write_file)
+    input_path.write_text(input_path.read_text().replace("SEQ", "SEQ "))
+    with pytest.raises(OSError, match="disk full"):
+        split_file(
+            input_path,
+            output_dir,
+            writer=AtomicTextWriter(output_dir, background=True),
+        )
+    assert first.read_bytes() == old
+    assert not list(output_dir.glob(".*"))
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_abort(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    input_path: Path,
+    background: bool,
+):
+    def failing_units(*args, **kwargs) -> Iterator[SplitUnit]:
+        for number, unit in enumerate(iter_split_units(*args, **kwargs)):
+            if number == 10:
+                raise ValueError("bad input")
+            yield unit
+
+    monkeypatch.setattr(splitter, "iter_split_units", failing_units)
+    output_dir = tmp_path / "out"
+    writer = AtomicTextWriter(
+        output_dir, batch_size=4, background=background, manifest=True
+    )
+    with pytest.raises(ValueError, match="bad input"):
+        split_file(input_path, output_dir, writer=writer)
+    # At most the two full batches are written, and no manifest.
+    assert len(list(output_dir.glob("*.txt"))) <= 8
+    assert not (output_dir / MANIFEST_FILE_NAME).exists()
+    assert not list(output_dir.glob(".*"))
+
+
+def test_chunked_manifest(tmp_path: Path, input_path: Path):
+    # Repeated trip ids are written by the parent, the rest by the chunks.
+    input_path.write_text(input_path.read_text() * 2)
+    options = WriterOptions(fsync=FsyncPolicy.BATCH, manifest=True)
+    serial_dir = tmp_path / "serial"
+    serial = split_file(
+        input_path, serial_dir, writer=make_writer("text", serial_dir, options)
+    )
+    chunked = split_file_chunked(
+        input_path, tmp_path / "chunked", jobs=3, min_chunk_bytes=1, options=options
+    )
+    assert [path.name for path in chunked.outputs] == [
+        path.name for path in serial.outputs
+    ]
+    assert (tmp_path / "chunked" / MANIFEST_FILE_NAME).read_text() == (
+        serial_dir / MANIFEST_FILE_NAME
+    ).read_text()
+    assert not list((tmp_path / "chunked").glob(".*"))
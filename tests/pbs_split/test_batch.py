@@ -0,0 +1,28 @@
+"""Tests for batch splitting."""
+
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+from pbs_split.split.batch import collect_inputs, output_dirs, split_many
+from tests.resources import RESOURCES_ANCHOR
+
+
+def test_split_many_with_errors(test_output_dir: Path):
+    input_dir = test_output_dir / "test_split_many_with_errors"
+    input_dir.mkdir()
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    (input_dir / "b.txt").write_bytes(sample.read_bytes())
+    (input_dir / "a.txt").write_bytes(sample.read_bytes())
+    input_paths = collect_inputs(str(input_dir)) + [input_dir / "missing.txt"]
+    items = split_many(input_paths, output_root=input_dir / "out", jobs=2)
+    assert [item.input_path.name for item in items] == ["a.txt", "b.txt", "missing.txt"]
+    assert [item.ok for item in items] == [True, True, False]
+    assert items[0].result is not None and items[0].result.stats.units == 4
+    assert items[2].error is not None and "FileNotFoundError" in items[2].error
+
+
+def test_output_dirs_collision():
+    with pytest.raises(ValueError):
+        output_dirs([Path("a/x.txt"), Path("b/x.txt")], Path("out"))
@@ -0,0 +1,84 @@
+"""Tests for the SQLite trip bundle."""
+
+import gzip
+import hashlib
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from pbs_split.split.bundle import BUNDLE_FILE_NAME, BundleWriter, TripBundle
+from pbs_split.split.splitter import split_file
+from pbs_split.synthetic import SyntheticConfig, write_package
+
+
+@pytest.fixture(name="package")
+def _package(tmp_path: Path) -> Path:
+    path = tmp_path / "package.txt"
+    write_package(path, SyntheticConfig(pages=5, trips_per_page=7))
+    return path
+
+
+def test_bundle_matches_text_split(tmp_path: Path, package: Path):
+    expected = split_file(package, tmp_path / "text")
+    writer = BundleWriter(tmp_path / "bundle", batch_size=4)
+    result = split_file(package, tmp_path / "bundle", writer=writer)
+    assert result.outputs == [tmp_path / "bundle" / BUNDLE_FILE_NAME]
+    assert writer.rows == len(expected.outputs)
+    assert not (tmp_path / "bundle" / f"{BUNDLE_FILE_NAME}.tmp").exists()
+    with TripBundle(result.outputs[0]) as bundle:
+        assert len(bundle) == len(expected.outputs)
+        trips = list(bundle.trips())
+        assert [trip.name for trip in trips] == [path.name for path in expected.outputs]
+        data = package.read_bytes()
+        for trip in trips:
+            text = bundle.text(trip.trip_id)
+            assert trip.hash == hashlib.sha256(text.encode()).hexdigest()
+            assert text.startswith(f"SEQ {trip.trip_id}")
+            assert data[trip.offset : trip.offset + trip.length].startswith(
+                f"SEQ {trip.trip_id}".encode()
+            )
+        paths = bundle.export(tmp_path / "export")
+        assert [path.read_text() for path in paths] == [
+            path.read_text() for path in expected.outputs
+        ]
+        first, last = trips[0].trip_id, trips[-1].trip_id
+        assert [t.trip_id for t in bundle.trips([last, first])] == [first, last]
+        with pytest.raises(KeyError):
+            bundle.find("nope")
+
+
+def test_bundle_verify(tmp_path: Path, package: Path):
+    result = split_file(
+        package, tmp_path / "bundle", writer=BundleWriter(tmp_path / "bundle")
+    )
+    with sqlite3.connect(result.outputs[0]) as connection:
+        connection.execute("UPDATE trips SET text = x'00' WHERE row = 1")
+    connection.close()
+    with TripBundle(result.outputs[0]) as bundle:
+        name = next(bundle.trips()).name
+        with pytest.raises(ValueError):
+            bundle.data(name)
+        assert bundle.data(name, verify=False) == b"\x00"
+
+
+def test_not_a_bundle(tmp_path: Path):
+    path = tmp_path / "not.sqlite"
+    path.write_text("not a database")
+    with pytest.raises(ValueError):
+        TripBundle(path)
+    with pytest.raises(ValueError):
+        TripBundle(tmp_path / "missing.sqlite")
+
+
+def test_failed_split_keeps_old_bundle(tmp_path: Path, package: Path):
+    output_dir = tmp_path / "bundle"
+    split_file(package, output_dir, writer=BundleWriter(output_dir))
+    old = (output_dir / BUNDLE_FILE_NAME).read_bytes()
+    truncated = tmp_path / "truncated.txt.gz"
+    data = gzip.compress(package.read_bytes())
+    truncated.write_bytes(data[: len(data) // 2])
+    with pytest.raises(EOFError):
+        split_file(truncated, output_dir, writer=BundleWriter(output_dir, batch_size=2))
+    assert (output_dir / BUNDLE_FILE_NAME).read_bytes() == old
+    assert not (output_dir / f"{BUNDLE_FILE_NAME}.tmp").exists()
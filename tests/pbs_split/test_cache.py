@@ -0,0 +1,48 @@
+"""Tests for the incremental split cache."""
+
+from importlib import resources
+from pathlib import Path
+
+from pbs_split.split.cache import CACHE_FILE_NAME, SplitCache, cached_split_file
+from tests.resources import RESOURCES_ANCHOR
+
+
+def _split(input_path: Path, output_dir: Path, rebuild: bool = False):
+    cache = SplitCache(output_dir / CACHE_FILE_NAME, rebuild=rebuild)
+    cached = cached_split_file(input_path, output_dir, cache=cache)
+    if cached.new_entry is not None:
+        cache.add(cached.new_entry)
+        cache.save()
+    return cached
+
+
+def test_cached_split_file(test_output_dir: Path):
+    work_dir = test_output_dir / "test_cached_split_file"
+    work_dir.mkdir()
+    input_path = work_dir / "input.txt"
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    input_path.write_bytes(sample.read_bytes())
+    output_dir = work_dir / "output"
+
+    first = _split(input_path, output_dir)
+    assert first.cache_stats.misses == 1
+    assert not first.result.cached
+
+    second = _split(input_path, output_dir)
+    assert second.cache_stats.hits == 1
+    assert second.cache_stats.bytes_skipped == input_path.stat().st_size
+    assert second.result.cached
+    assert second.result.stats == first.result.stats
+
+    rebuilt = _split(input_path, output_dir, rebuild=True)
+    assert rebuilt.cache_stats.misses == 1
+
+    (output_dir / "1002.txt").unlink()
+    stale_output = _split(input_path, output_dir)
+    assert stale_output.cache_stats.misses == 1
+    assert (output_dir / "1002.txt").is_file()
+
+    input_path.write_bytes(sample.read_bytes().replace(b"SEQ 1004", b"SEQ 1005"))
+    changed_input = _split(input_path, output_dir)
+    assert changed_input.cache_stats.misses == 1
+    assert len(SplitCache(output_dir / CACHE_FILE_NAME).entries) == 1
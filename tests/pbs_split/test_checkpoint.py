@@ -0,0 +1,153 @@
+"""Tests for checkpointed, resumable splitting."""
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+from pbs_split.split.checkpoint import (
+    CHECKPOINT_FILE_NAME,
+    JOURNAL_FILE_NAME,
+    SplitCheckpoint,
+    checkpoint_path_for,
+    outputs_digest,
+    split_file_checkpointed,
+)
+from pbs_split.split.splitter import TextDirectoryWriter, split_file
+from pbs_split.synthetic import SyntheticConfig, generate_package
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture(name="input_path")
+def _input_path(tmp_path: Path) -> Path:
+    input_path = tmp_path / "package.txt"
+    input_path.write_text(generate_package(SyntheticConfig(pages=20, trips_per_page=5)))
+    return input_path
+
+
+def _interrupt_after(monkeypatch: pytest.MonkeyPatch, writes: int):
+    """Make the text writer fail after `writes` trips."""
+    write = TextDirectoryWriter.write
+    calls = 0
+
+    def failing_write(self, unit):
+        nonlocal calls
+        calls += 1
+        if calls > writes:
+            raise Interrupted()
+        return write(self, unit)
+
+    monkeypatch.setattr(TextDirectoryWriter, "write", failing_write)
+
+
+def _assert_same_split(expected_dir: Path, result):
+    expected = split_file(result.input_path, expected_dir)
+    assert result.stats == expected.stats
+    assert [path.name for path in result.outputs] == [
+        path.name for path in expected.outputs
+    ]
+    for expected_path, output_path in zip(expected.outputs, result.outputs):
+        assert output_path.read_bytes() == expected_path.read_bytes()
+
+
+def test_split_straight_through(tmp_path: Path, input_path: Path):
+    output_dir = tmp_path / "out"
+    result = split_file_checkpointed(input_path, output_dir, checkpoint_bytes=2000)
+    _assert_same_split(tmp_path / "expected", result)
+    assert not (output_dir / CHECKPOINT_FILE_NAME).exists()
+    assert not (output_dir / JOURNAL_FILE_NAME).exists()
+
+
+def test_resume(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, input_path: Path):
+    output_dir = tmp_path / "out"
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 57)
+        with pytest.raises(Interrupted):
+            split_file_checkpointed(input_path, output_dir, checkpoint_bytes=2000)
+    checkpoint = SplitCheckpoint.load(checkpoint_path_for(output_dir))
+    assert 0 < checkpoint.offset < input_path.stat().st_size
+    assert 0 < checkpoint.stats["units"] <= 57
+    result = split_file_checkpointed(
+        input_path, output_dir, resume=True, checkpoint_bytes=2000
+    )
+    _assert_same_split(tmp_path / "expected", result)
+    assert not (output_dir / CHECKPOINT_FILE_NAME).exists()
+
+
+def test_resume_duplicate_ids(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, input_path: Path
+):
+    # The same package twice over repeats every trip id.
+    input_path.write_text(input_path.read_text() * 2)
+    output_dir = tmp_path / "out"
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 140)
+        with pytest.raises(Interrupted):
+            split_file_checkpointed(input_path, output_dir, checkpoint_bytes=5000)
+    result = split_file_checkpointed(
+        input_path, output_dir, resume=True, checkpoint_bytes=5000
+    )
+    _assert_same_split(tmp_path / "expected", result)
+    assert any(path.stem.endswith("-2") for path in result.outputs)
+
+
+def test_resume_compressed(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, input_path: Path
+):
+    packed = tmp_path / "packed.txt.gz"
+    packed.write_bytes(gzip.compress(input_path.read_bytes()))
+    output_dir = tmp_path / "out"
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 30)
+        with pytest.raises(Interrupted):
+            split_file_checkpointed(
+                packed, output_dir, output_format="text.gz", checkpoint_bytes=2000
+            )
+    result = split_file_checkpointed(
+        packed, output_dir, output_format="text.gz", resume=True, checkpoint_bytes=2000
+    )
+    expected = split_file(input_path, tmp_path / "expected")
+    assert result.stats == expected.stats
+    assert [path.name for path in result.outputs] == [
+        f"{path.name}.gz" for path in expected.outputs
+    ]
+    assert [gzip.decompress(path.read_bytes()) for path in result.outputs] == [
+        path.read_bytes() for path in expected.outputs
+    ]
+
+
+def test_resume_checks_input_and_outputs(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, input_path: Path
+):
+    output_dir = tmp_path / "out"
+    with monkeypatch.context() as patch:
+        _interrupt_after(patch, 57)
+        with pytest.raises(Interrupted):
+            split_file_checkpointed(input_path, output_dir, checkpoint_bytes=2000)
+    checkpoint = SplitCheckpoint.load(checkpoint_path_for(output_dir))
+    assert checkpoint.outputs_digest != outputs_digest([])
+    with pytest.raises(ValueError, match="other options"):
+        split_file_checkpointed(
+            input_path,
+            output_dir,
+            output_format="text.gz",
+            resume=True,
+            checkpoint_bytes=2000,
+        )
+    (output_dir / checkpoint.last_unit).write_text("changed")
+    with pytest.raises(ValueError, match="have changed"):
+        split_file_checkpointed(input_path, output_dir, resume=True)
+    input_path.write_text(input_path.read_text() + "\n")
+    with pytest.raises(ValueError, match="has changed"):
+        split_file_checkpointed(input_path, output_dir, resume=True)
+    # Without resuming, the split starts over.
+    result = split_file_checkpointed(input_path, output_dir)
+    assert len(result.outputs) == 100
+
+
+def test_not_resumable(tmp_path: Path, input_path: Path):
+    with pytest.raises(ValueError):
+        split_file_checkpointed(input_path, tmp_path / "out", output_format="sqlite")
@@ -0,0 +1,78 @@
+"""Tests for splitting a single package in parallel chunks."""
+
+import gzip
+import hashlib
+import mmap
+from pathlib import Path
+
+import pytest
+
+from pbs_split.snippets.hash.file_hash import hash_file
+from pbs_split.split.chunked import page_aligned_cuts, split_file_chunked
+from pbs_split.split.splitter import SplitResult, split_file
+from pbs_split.synthetic import GROUPS, SyntheticConfig, generate_package
+
+
+@pytest.fixture(name="package_text")
+def _package_text() -> str:
+    return generate_package(
+        SyntheticConfig(pages=40, trips_per_page=5, groups=GROUPS[:2])
+    )
+
+
+def _output_hashes(result: SplitResult) -> dict[str, str]:
+    return {
+        output.name: hash_file(output, hashlib.sha256()) for output in result.outputs
+    }
+
+
+def _assert_same_as_serial(tmp_path: Path, input_path: Path, jobs: int):
+    expected = split_file(input_path, tmp_path / "serial")
+    result = split_file_chunked(
+        input_path, tmp_path / "chunked", jobs=jobs, min_chunk_bytes=1
+    )
+    assert result.stats == expected.stats
+    assert [path.name for path in result.outputs] == [
+        path.name for path in expected.outputs
+    ]
+    assert _output_hashes(result) == _output_hashes(expected)
+    assert sorted(path.name for path in (tmp_path / "chunked").iterdir()) == sorted(
+        path.name for path in expected.outputs
+    )
+
+
+@pytest.mark.parametrize("jobs", [2, 3, 7])
+def test_same_as_serial(tmp_path: Path, package_text: str, jobs: int):
+    input_path = tmp_path / "package.txt"
+    input_path.write_text(package_text)
+    _assert_same_as_serial(tmp_path, input_path, jobs)
+
+
+def test_repeated_trip_ids(tmp_path: Path, package_text: str):
+    input_path = tmp_path / "package.txt"
+    # Each chunk repeats trip ids from the others, and from itself.
+    input_path.write_text(package_text * 3)
+    _assert_same_as_serial(tmp_path, input_path, 4)
+
+
+def test_cuts_at_page_headers(tmp_path: Path, package_text: str):
+    input_path = tmp_path / "package.txt"
+    input_path.write_bytes(package_text.encode())
+    with (
+        open(input_path, mode="rb") as file_handle,
+        mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        cuts = page_aligned_cuts(mapped, 4)
+        assert cuts[0] == 0
+        assert len(cuts) == 4
+        assert cuts == sorted(set(cuts))
+        for cut in cuts[1:]:
+            assert mapped[cut - 1 : cut + 1] == b"\n\f"
+        assert page_aligned_cuts(mapped, 1) == [0]
+
+
+def test_serial_fallback(tmp_path: Path, package_text: str):
+    input_path = tmp_path / "package.txt.gz"
+    input_path.write_bytes(gzip.compress(package_text.encode()))
+    result = split_file_chunked(input_path, tmp_path / "out", jobs=4, min_chunk_bytes=1)
+    assert result.stats.units == 200
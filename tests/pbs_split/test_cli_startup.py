@@ -0,0 +1,71 @@
+"""
+Import time regression tests for the command-line interface.
+
+Command implementations are imported lazily, so importing the cli, and running
+``--help``, must not import them. The wall clock budget for ``--help`` can be
+set in seconds with the ``PBS_SPLIT_HELP_BUDGET_S`` environment variable.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import pbs_split
+
+HEAVY_MODULES = (
+    "numpy",
+    "mmap",
+    "sqlite3",
+    "concurrent.futures.process",
+    "pbs_split.parse",
+    "pbs_split.stats",
+    "pbs_split.split.splitter",
+    "pbs_split.split.batch",
+    "pbs_split.split.cache",
+    "pbs_split.split.columnar",
+    "pbs_split.split.index",
+    "pbs_split.split.watch",
+)
+# Self import time of the pbs_split modules imported by the cli, in microseconds.
+PBS_SPLIT_IMPORT_BUDGET_US = 20_000
+HELP_BUDGET_S = float(os.environ.get("PBS_SPLIT_HELP_BUDGET_S", "3.0"))
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    src_dir = str(Path(pbs_split.__file__).parent.parent)
+    env = {**os.environ, "PYTHONPATH": src_dir}
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+
+def _import_times() -> dict[str, int]:
+    result = _run("-X", "importtime", "-c", "import pbs_split.cli.main_typer")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(self_us)
+    return times
+
+
+def test_cli_import_is_light():
+    times = _import_times()
+    assert "pbs_split.cli.main_typer" in times
+    heavy = [module for module in HEAVY_MODULES if module in times]
+    assert not heavy, f"Importing the cli imported {heavy}"
+    pbs_split_us = sum(
+        self_us for module, self_us in times.items() if module.startswith("pbs_split")
+    )
+    assert pbs_split_us < PBS_SPLIT_IMPORT_BUDGET_US
+
+
+def test_help_wall_clock():
+    start = perf_counter()
+    result = _run("-m", "pbs_split.cli.main_typer", "--help")
+    elapsed = perf_counter() - start
+    assert "split-many" in result.stdout
+    assert elapsed < HELP_BUDGET_S, f"--help took {elapsed:.2f}s"
@@ -0,0 +1,56 @@
+"""Tests for the columnar binary format."""
+
+import sys
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+from pbs_split.split.columnar import COLUMNAR_FILE_NAME, ColumnarTrips
+from pbs_split.split.formats import make_writer
+from pbs_split.split.splitter import split_file
+from tests.resources import RESOURCES_ANCHOR
+
+
+def test_columnar_round_trip(test_output_dir: Path):
+    output_dir = test_output_dir / "test_columnar_round_trip"
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        result = split_file(
+            path, output_dir, writer=make_writer("columnar", output_dir)
+        )
+        data = path.read_bytes()
+    assert result.outputs == [output_dir / COLUMNAR_FILE_NAME]
+    assert not list(output_dir.glob("*.tmp"))
+    with ColumnarTrips(output_dir / COLUMNAR_FILE_NAME) as trips:
+        assert len(trips) == 4
+        assert trips.column("trip_id") == ["1001", "1002", "1003", "1004"]
+        assert list(trips.column("credit")) == [600, 300, 645, 600]
+        assert list(trips.column("days", 2, 4)) == [2, 2]
+        assert trips.column("base") == ["ORD"] * 4
+        (row,) = trips.rows(2, 3)
+        assert row["trip_id"] == "1003"
+        assert row["tafb"] == 2040
+        assert row["text"].startswith("SEQ 1003")
+        assert data[row["offset"] :].startswith(b"SEQ 1003")
+
+
+def test_big_endian_host(monkeypatch: pytest.MonkeyPatch, test_output_dir: Path):
+    # Both sides swap, so the values survive only if writer and reader agree.
+    monkeypatch.setattr(sys, "byteorder", "big")
+    output_dir = test_output_dir / "test_big_endian_host"
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        split_file(path, output_dir, writer=make_writer("columnar", output_dir))
+    with ColumnarTrips(output_dir / COLUMNAR_FILE_NAME) as trips:
+        assert trips.column("trip_id") == ["1001", "1002", "1003", "1004"]
+        assert list(trips.column("credit")) == [600, 300, 645, 600]
+
+
+def test_not_columnar(test_output_dir: Path):
+    path = test_output_dir / "test_not_columnar.pbsc"
+    path.write_bytes(b"\x00" * 100)
+    with pytest.raises(ValueError):
+        ColumnarTrips(path)
@@ -0,0 +1,147 @@
+"""Tests for compressed input and output."""
+
+import hashlib
+from pathlib import Path
+
+import pytest
+
+from pbs_split.snippets.hash.file_hash import hash_file
+from pbs_split.split.archive import iter_archive
+from pbs_split.split.batch import output_dirs
+from pbs_split.split.compression import (
+    Compression,
+    compressed_name,
+    compression_for,
+    open_compressed,
+)
+from pbs_split.split.formats import OutputFormat, make_writer
+from pbs_split.split.index import build_index
+from pbs_split.split.splitter import split_file
+from pbs_split.synthetic import SyntheticConfig, generate_package
+
+
+def _require(compression: Compression):
+    if compression == Compression.ZSTD:
+        pytest.importorskip("zstandard")
+
+
+@pytest.fixture(name="package_text")
+def _package_text() -> str:
+    return generate_package(SyntheticConfig(pages=6, trips_per_page=4))
+
+
+def _write_compressed(path: Path, text: str, compression: Compression) -> Path:
+    with open_compressed(path, "wb", compression) as file_handle:
+        file_handle.write(text.encode())
+    return path
+
+
+@pytest.mark.parametrize("compression", list(Compression))
+def test_round_trip(tmp_path: Path, compression: Compression):
+    _require(compression)
+    path = tmp_path / compressed_name("data.txt", compression)
+    assert compression_for(path) == compression
+    data = b"line\n" * 10000
+    _write_compressed(path, data.decode(), compression)
+    with open_compressed(path) as file_handle:
+        assert file_handle.read() == data
+    if compression != Compression.NONE:
+        assert path.stat().st_size < len(data)
+
+
+@pytest.mark.parametrize(
+    "compression", [c for c in Compression if c != Compression.NONE]
+)
+def test_split_compressed_input(
+    tmp_path: Path, package_text: str, compression: Compression
+):
+    _require(compression)
+    plain = tmp_path / "package.txt"
+    plain.write_text(package_text)
+    packed = _write_compressed(
+        tmp_path / compressed_name("package.txt", compression),
+        package_text,
+        compression,
+    )
+    expected = split_file(plain, tmp_path / "plain")
+    result = split_file(packed, tmp_path / "packed")
+    assert result.stats == expected.stats
+    for expected_path, output_path in zip(expected.outputs, result.outputs):
+        assert output_path.read_text() == expected_path.read_text()
+    with pytest.raises(ValueError):
+        build_index(packed)
+    assert output_dirs([packed], tmp_path) == [tmp_path / "package"]
+
+
+def test_hash_decompressed(tmp_path: Path, package_text: str):
+    path = _write_compressed(tmp_path / "package.txt.gz", package_text, "gzip")
+    raw = hash_file(path, hashlib.sha256())
+    assert raw == hashlib.sha256(path.read_bytes()).hexdigest()
+    decompressed = hash_file(path, hashlib.sha256(), opener=open_compressed)
+    assert decompressed == hashlib.sha256(package_text.encode()).hexdigest()
+
+
+@pytest.mark.parametrize("output_format", ["text.gz", "text.xz", "text.zst"])
+def test_compressed_text_output(tmp_path: Path, package_text: str, output_format: str):
+    _require(Compression.ZSTD if output_format.endswith("zst") else Compression.GZIP)
+    input_path = tmp_path / "package.txt"
+    input_path.write_text(package_text)
+    expected = split_file(input_path, tmp_path / "plain")
+    output_dir = tmp_path / "out"
+    result = split_file(
+        input_path, output_dir, writer=make_writer(output_format, output_dir)
+    )
+    assert len(result.outputs) == len(expected.outputs)
+    for expected_path, output_path in zip(expected.outputs, result.outputs):
+        assert output_path.name == f"{expected_path.name}{output_path.suffix}"
+        with open_compressed(output_path) as file_handle:
+            assert file_handle.read().decode() == expected_path.read_text()
+
+
+@pytest.mark.parametrize(
+    "output_format",
+    [OutputFormat.ARCHIVE_GZIP, OutputFormat.ARCHIVE_XZ, OutputFormat.ARCHIVE_ZSTD],
+)
+def test_archive_output(tmp_path: Path, package_text: str, output_format):
+    if output_format == OutputFormat.ARCHIVE_ZSTD:
+        _require(Compression.ZSTD)
+    input_path = tmp_path / "package.txt"
+    input_path.write_text(package_text)
+    expected = split_file(input_path, tmp_path / "plain")
+    output_dir = tmp_path / "archive"
+    result = split_file(
+        input_path, output_dir, writer=make_writer(output_format, output_dir)
+    )
+    assert result.outputs == [output_dir / f"trips.{output_format.value}"]
+    members = list(iter_archive(result.outputs[0]))
+    assert [name for name, _ in members] == [path.name for path in expected.outputs]
+    assert [text for _, text in members] == [
+        path.read_text() for path in expected.outputs
+    ]
+    # The archive is reproducible.
+    again = split_file(
+        input_path,
+        tmp_path / "again",
+        writer=make_writer(output_format, tmp_path / "again"),
+    )
+    assert again.outputs[0].read_bytes() == result.outputs[0].read_bytes()
+
+
+def test_failed_split_keeps_old_archive(tmp_path: Path, package_text: str):
+    input_path = tmp_path / "package.txt"
+    input_path.write_text(package_text)
+    output_dir = tmp_path / "archive"
+    output_format = OutputFormat.ARCHIVE_GZIP
+    result = split_file(
+        input_path, output_dir, writer=make_writer(output_format, output_dir)
+    )
+    old = result.outputs[0].read_bytes()
+    truncated = _write_compressed(
+        tmp_path / "truncated.txt.gz", package_text, Compression.GZIP
+    )
+    data = truncated.read_bytes()
+    truncated.write_bytes(data[: len(data) // 2])
+    with pytest.raises(EOFError):
+        split_file(truncated, output_dir, writer=make_writer(output_format, output_dir))
+    assert result.outputs[0].read_bytes() == old
+    assert [path.name for path in output_dir.iterdir()] == [result.outputs[0].name]
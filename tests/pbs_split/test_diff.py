@@ -0,0 +1,91 @@
+"""Tests for comparing the trips of two packages."""
+
+from pathlib import Path
+
+import pytest
+
+from pbs_split.split.bundle import BundleWriter
+from pbs_split.split.formats import make_writer
+from pbs_split.split.rules import BoundaryRules
+from pbs_split.split.diff import diff_packages, iter_line_diffs, trip_hashes
+from pbs_split.split.splitter import split_file
+from pbs_split.synthetic import SyntheticConfig, generate_package
+
+
+@pytest.fixture(name="packages")
+def _packages(tmp_path: Path) -> tuple[Path, Path]:
+    text = generate_package(SyntheticConfig(pages=3, trips_per_page=4))
+    old_path = tmp_path / "old.txt"
+    old_path.write_text(text)
+    # Change trip 10002, remove 10005, and add 99999.
+    new_text = text.replace("SEQ 10005 ", "SEQ 99999 ")
+    start = new_text.index("SEQ 10002 ")
+    rls = new_text.index("RLS ", start)
+    new_text = new_text[:rls] + "RLS 2359" + new_text[rls + 8 :]
+    new_path = tmp_path / "new.txt"
+    new_path.write_text(new_text)
+    return old_path, new_path
+
+
+def test_diff_packages(packages: tuple[Path, Path]):
+    old_path, new_path = packages
+    trip_diff = diff_packages(old_path, new_path)
+    assert trip_diff.added == ["99999"]
+    assert trip_diff.removed == ["10005"]
+    assert trip_diff.changed == ["10002"]
+    assert trip_diff.unchanged == 12 - 2
+    assert diff_packages(old_path, old_path).identical
+    lines = list(iter_line_diffs(trip_diff))
+    assert lines[0].startswith("---") and lines[0].rstrip().endswith(":10002")
+    assert sum(1 for line in lines if line.startswith("+RLS 2359")) == 1
+
+
+def test_diff_bundle(tmp_path: Path, packages: tuple[Path, Path]):
+    old_path, new_path = packages
+    split_file(old_path, tmp_path / "bundle", writer=BundleWriter(tmp_path / "bundle"))
+    assert trip_hashes(tmp_path / "bundle") == trip_hashes(old_path)
+    trip_diff = diff_packages(tmp_path / "bundle", new_path)
+    assert trip_diff.changed == ["10002"]
+    assert any(line.startswith("+RLS 2359") for line in iter_line_diffs(trip_diff))
+
+
+@pytest.mark.parametrize("output_format", ["text", "text.gz"])
+def test_diff_text_split(
+    tmp_path: Path, packages: tuple[Path, Path], output_format: str
+):
+    old_path, new_path = packages
+    old_dir = tmp_path / "old"
+    new_dir = tmp_path / "new"
+    split_file(old_path, old_dir, writer=make_writer(output_format, old_dir))
+    split_file(new_path, new_dir, writer=make_writer(output_format, new_dir))
+    assert trip_hashes(old_dir) == dict(sorted(trip_hashes(old_path).items()))
+    trip_diff = diff_packages(old_dir, new_dir)
+    assert (trip_diff.added, trip_diff.removed) == (["99999"], ["10005"])
+    assert trip_diff.changed == ["10002"]
+    assert any(line.startswith("+RLS 2359") for line in iter_line_diffs(trip_diff))
+    (tmp_path / "empty").mkdir()
+    with pytest.raises(ValueError, match="no SQLite bundle or trip files"):
+        trip_hashes(tmp_path / "empty")
+
+
+def test_repeated_trip_ids(tmp_path: Path):
+    text = generate_package(SyntheticConfig(pages=1, trips_per_page=3))
+    path = tmp_path / "repeated.txt"
+    path.write_text(text.replace("SEQ 10002 ", "SEQ 10001 "))
+    assert list(trip_hashes(path)) == ["10001", "10001-2", "10003"]
+
+
+def test_diff_rules(tmp_path: Path, packages: tuple[Path, Path]):
+    rules = BoundaryRules(trip_start=r"^\s*PAIRING\s+(?P<trip_id>\d+)")
+    paths = []
+    for path in packages:
+        pairing = tmp_path / f"pairing-{path.name}"
+        pairing.write_text(path.read_text().replace("SEQ ", "PAIRING "))
+        paths.append(pairing)
+    # The standard layout finds no trips.
+    assert not trip_hashes(paths[0])
+    trip_diff = diff_packages(*paths, rules=rules)
+    assert (trip_diff.added, trip_diff.removed) == (["99999"], ["10005"])
+    assert trip_diff.changed == ["10002"]
+    lines = list(iter_line_diffs(trip_diff, rules=rules))
+    assert any(line.startswith("+RLS 2359") for line in lines)
@@ -0,0 +1,59 @@
+"""Tests for the hash snippets."""
+
+import hashlib
+import os
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from pbs_split.snippets.hash.file_hash import hash_binary_file, hash_file
+from pbs_split.snippets.hash.multi_file_hash import (
+    hash_file_multi,
+    make_multi_hashed_files,
+)
+
+
+def _make_files(directory: Path, count: int) -> list[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for idx in range(count):
+        path = directory / f"file_{idx}.bin"
+        path.write_bytes(bytes(range(256)) * (idx * 300 + 1))
+        paths.append(path)
+    return paths
+
+
+def test_hash_file_multi(test_output_dir: Path):
+    (path,) = _make_files(test_output_dir / "test_hash_file_multi", 1)
+    digests = hash_file_multi(path, [hashlib.sha256(), hashlib.md5()], block_size=100)
+    assert digests == {
+        "sha256": hash_file(path, hashlib.sha256()),
+        "md5": hash_file(path, hashlib.md5()),
+    }
+
+
+def test_make_multi_hashed_files(test_output_dir: Path):
+    paths = _make_files(test_output_dir / "test_make_multi_hashed_files", 5)
+    results = make_multi_hashed_files(paths, ["sha256", "md5"], max_workers=3)
+    assert [result.file_path for result in results] == paths
+    for result in results:
+        assert result.digests["md5"] == hash_file(result.file_path, hashlib.md5())
+        assert result.hash_method == "sha256"
+        assert result.file_hash == hash_file(result.file_path, hashlib.sha256())
+
+
+@pytest.mark.parametrize("mode", ["auto", "read", "readinto", "mmap"])
+@pytest.mark.parametrize("size", [0, 1, 5000, 2**17 + 3])
+def test_hash_file_modes(test_output_dir: Path, mode, size: int):
+    path = test_output_dir / f"test_hash_file_modes_{size}.bin"
+    path.write_bytes(os.urandom(size))
+    expected = hashlib.sha256(path.read_bytes()).hexdigest()
+    assert hash_file(path, hashlib.sha256(), mode=mode) == expected
+    assert hash_file(path, hashlib.sha256(), block_size=1000, mode=mode) == expected
+
+
+def test_hash_binary_file_stream():
+    data = os.urandom(2**17)
+    digest = hash_binary_file(BytesIO(data), hashlib.sha256(), mode="mmap")
+    assert digest == hashlib.sha256(data).hexdigest()
@@ -0,0 +1,58 @@
+"""Tests for the page and trip offset index."""
+
+import os
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+from pbs_split.split.index import (
+    StaleIndexError,
+    index_path_for,
+    load_index,
+    load_or_build_index,
+    read_span,
+    read_trip,
+    split_file_with_index,
+)
+from pbs_split.split.splitter import TextDirectoryWriter
+from tests.resources import RESOURCES_ANCHOR
+
+
+def _input(directory: Path) -> Path:
+    directory.mkdir(parents=True)
+    input_path = directory / "input.txt"
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    input_path.write_bytes(sample.read_bytes())
+    return input_path
+
+
+def test_split_file_with_index(test_output_dir: Path):
+    input_path = _input(test_output_dir / "test_split_file_with_index")
+    output_dir = input_path.parent / "out"
+    _, index = split_file_with_index(
+        input_path, output_dir, writer=TextDirectoryWriter(output_dir)
+    )
+    assert index_path_for(input_path).is_file()
+    loaded = load_index(input_path)
+    assert loaded == index
+    assert len(index.pages) == 2
+    assert sum(length for _, length in index.pages) == input_path.stat().st_size
+    assert read_span(input_path, index.pages[1]).startswith(b"\fBASE ORD")
+    for trip_id in index.trips:
+        text = read_trip(input_path, index, trip_id)
+        assert text == (output_dir / f"{trip_id}.txt").read_text()
+
+
+def test_stale_index(test_output_dir: Path):
+    input_path = _input(test_output_dir / "test_stale_index")
+    load_or_build_index(input_path)
+    stat_result = input_path.stat()
+    os.utime(input_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10))
+    # Touched, but unchanged content is still valid.
+    load_index(input_path)
+    input_path.write_bytes(input_path.read_bytes().replace(b"SEQ 1002", b"SEQ 2002"))
+    with pytest.raises(StaleIndexError):
+        load_index(input_path)
+    index = load_or_build_index(input_path)
+    assert "2002" in index.trips
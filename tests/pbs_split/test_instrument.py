@@ -0,0 +1,79 @@
+"""Tests for the stage timing instrumentation."""
+
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+from pbs_split.instrument import (
+    Instruments,
+    count,
+    current_instruments,
+    disable_instruments,
+    enable_instruments,
+    timer,
+)
+from pbs_split.split.batch import split_many
+from pbs_split.split.columnar import ColumnarWriter
+from pbs_split.split.formats import OutputFormat
+from pbs_split.split.splitter import split_file
+from tests.resources import RESOURCES_ANCHOR
+
+SAMPLE = "sample_bid_package.txt"
+
+
+@pytest.fixture(name="instruments")
+def _instruments():
+    instruments = enable_instruments()
+    yield instruments
+    disable_instruments()
+
+
+def test_disabled_is_a_no_op():
+    assert current_instruments() is None
+    with timer("hash"):
+        count("bytes", 10)
+    assert current_instruments() is None
+
+
+def test_timers_and_counters(instruments: Instruments):
+    with timer("hash"):
+        pass
+    with timer("hash"):
+        pass
+    count("bytes", 10)
+    assert list(instruments.timed_iter("read", [1, 2, 3])) == [1, 2, 3]
+    assert instruments.timed_call("parse", len)("abc") == 3
+    assert instruments.calls == {"hash": 2, "read": 3, "parse": 1}
+    assert instruments.counters == {"bytes": 10}
+    lines = instruments.summary_lines(total_ns=10**9)
+    assert lines[0].split() == ["Stage", "Calls", "Seconds", "Share"]
+    assert any(line.startswith("bytes") for line in lines)
+
+
+def test_split_stages(instruments: Instruments, test_output_dir: Path):
+    output_dir = test_output_dir / "test_instrument_split"
+    with resources.as_file(resources.files(RESOURCES_ANCHOR).joinpath(SAMPLE)) as path:
+        split_file(path, output_dir, writer=ColumnarWriter(output_dir))
+    assert {"read", "boundary", "parse", "write"} <= set(instruments.times_ns)
+    assert instruments.calls["parse"] == 4
+    assert instruments.counters["trips"] == 4
+    assert instruments.counters["pages"] == 2
+    assert instruments.counters["bytes"] == path.stat().st_size
+
+
+def test_split_many_merges_workers(instruments: Instruments, test_output_dir: Path):
+    input_dir = test_output_dir / "test_instrument_split_many"
+    input_dir.mkdir()
+    sample = resources.files(RESOURCES_ANCHOR).joinpath(SAMPLE)
+    paths = []
+    for name in ("one", "two"):
+        paths.append(input_dir / f"{name}.txt")
+        paths[-1].write_bytes(sample.read_bytes())
+    items = split_many(
+        paths, input_dir / "out", jobs=2, output_format=OutputFormat.TEXT
+    )
+    assert all(item.ok for item in items)
+    assert current_instruments() is instruments
+    assert instruments.counters["trips"] == 8
+    assert instruments.calls["write"] == 8
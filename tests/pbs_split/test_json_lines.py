@@ -0,0 +1,88 @@
+"""Tests for the JSON-lines log formatter and split metrics records."""
+
+import json
+import logging
+import sys
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+from pbs_split.snippets.logging.json_lines import JsonLinesFormatter
+from pbs_split.split.cache import CACHE_FILE_NAME, SplitCache, cached_split_file
+from pbs_split.split.splitter import metrics_logger
+from tests.resources import RESOURCES_ANCHOR
+
+SAMPLE = "sample_bid_package.txt"
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lines: list[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.lines.append(self.format(record))
+
+
+@pytest.fixture(name="metrics_lines")
+def _metrics_lines():
+    handler = ListHandler()
+    handler.setFormatter(JsonLinesFormatter())
+    metrics_logger.addHandler(handler)
+    metrics_logger.setLevel(logging.INFO)
+    yield handler.lines
+    metrics_logger.removeHandler(handler)
+    metrics_logger.setLevel(logging.NOTSET)
+
+
+def _record(message: str, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "pbs_split.test", logging.WARNING, __file__, 1, message, args, None
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_format_fields():
+    formatter = JsonLinesFormatter()
+    line = formatter.format(_record('quote " and %s', "tab\t", metrics={"pages": 2}))
+    data = json.loads(line)
+    assert list(data) == ["time", "level", "logger", "message", "metrics"]
+    assert data["level"] == "WARNING"
+    assert data["logger"] == "pbs_split.test"
+    assert data["message"] == 'quote " and tab\t'
+    assert data["metrics"] == {"pages": 2}
+    assert "\n" not in line
+
+
+def test_format_custom_fields_and_exceptions():
+    formatter = JsonLinesFormatter(fields={"msg": "message", "line": "lineno"})
+    try:
+        raise KeyError("missing")
+    except KeyError:
+        record = _record("failed")
+        record.exc_info = sys.exc_info()
+    data = json.loads(formatter.format(record))
+    assert data["msg"] == "failed"
+    assert data["line"] == 1
+    assert "KeyError" in data["exc_info"]
+    with pytest.raises(ValueError):
+        JsonLinesFormatter(fields={})
+
+
+def test_split_metrics(metrics_lines: list[str], test_output_dir: Path):
+    output_dir = test_output_dir / "test_split_metrics"
+    cache = SplitCache(output_dir / CACHE_FILE_NAME)
+    with resources.as_file(resources.files(RESOURCES_ANCHOR).joinpath(SAMPLE)) as path:
+        cached = cached_split_file(path, output_dir, cache=cache)
+        assert cached.new_entry is not None
+        cache.add(cached.new_entry)
+        cached_split_file(path, output_dir, cache=cache)
+    records = [json.loads(line) for line in metrics_lines]
+    assert [record["metrics"]["cache_hit"] for record in records] == [False, True]
+    metrics = records[0]["metrics"]
+    assert metrics["input_bytes"] == path.stat().st_size
+    assert metrics["pages"] == 2
+    assert metrics["trips"] == 4
+    assert metrics["elapsed_ns"] > 0
@@ -0,0 +1,86 @@
+"""Tests for the queued logging handlers."""
+
+import logging
+import queue
+from pathlib import Path
+
+import pytest
+
+from pbs_split.snippets.logging.logging import (
+    BoundedQueueHandler,
+    queue_handler,
+    rotating_file_queue_logger,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.append(record.getMessage())
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_drop_policy():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), policy="drop")
+    for idx in range(5):
+        handler.handle(_record(f"message {idx}"))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_block_policy_timeout():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=1), policy="block", timeout=0.01)
+    handler.handle(_record("kept"))
+    handler.handle(_record("dropped"))
+    assert handler.dropped == 1
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(queue.Queue(), policy="wait")  # type: ignore[arg-type]
+
+
+def test_queue_handler_delivers_in_order():
+    target = ListHandler()
+    target.setLevel(logging.INFO)
+    handler, listener = queue_handler([target], max_size=100, policy="block")
+    test_logger = logging.getLogger("pbs_split.tests.queue")
+    test_logger.addHandler(handler)
+    test_logger.setLevel(logging.DEBUG)
+    try:
+        test_logger.debug("filtered by the target level")
+        for idx in range(50):
+            test_logger.info("message %s", idx)
+    finally:
+        listener.stop()
+        test_logger.removeHandler(handler)
+    assert target.messages == [f"message {idx}" for idx in range(50)]
+    assert handler.dropped == 0
+
+
+def test_stop_with_full_queue():
+    target = ListHandler()
+    handler, listener = queue_handler([target], max_size=5, policy="drop")
+    for idx in range(1000):
+        handler.handle(_record(f"message {idx}"))
+    listener.stop()
+    assert len(target.messages) + handler.dropped == 1000
+
+
+def test_rotating_file_queue_logger(test_output_dir: Path):
+    log_dir = test_output_dir / "test_queue_logs"
+    test_logger, listener = rotating_file_queue_logger(
+        "pbs_split.tests.queue_file", log_dir, logging.INFO
+    )
+    test_logger.info("written from the listener thread")
+    listener.stop()
+    for handler in list(test_logger.handlers):
+        test_logger.removeHandler(handler)
+    log_text = (log_dir / "pbs_split.tests.queue_file.log").read_text()
+    assert "written from the listener thread" in log_text
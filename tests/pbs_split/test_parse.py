@@ -0,0 +1,45 @@
+"""Tests for parsing split trips into the model."""
+
+from importlib import resources
+
+import pytest
+
+from pbs_split.model import Trip
+from pbs_split.parse import ParseError, parse_package, parse_trip
+from pbs_split.split.splitter import SplitUnit
+from tests.resources import RESOURCES_ANCHOR
+
+
+def test_parse_package():
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        package = parse_package(path)
+    assert [page.number for page in package.pages] == [1, 2]
+    trips = {trip.trip_id: trip for trip in package.trips()}
+    assert list(trips) == ["1001", "1002", "1003", "1004"]
+    trip = trips["1003"]
+    assert trip.ops == 2
+    assert trip.page == 1
+    assert (trip.block, trip.credit, trip.tafb) == (585, 645, 2040)
+    assert trip.days == 2
+    assert trip.report == 300
+    assert len(trip.duty_periods) == 2
+    first, second = trip.duty_periods
+    assert [leg.arrival_station for leg in first.legs] == ["SFO", "LAX"]
+    assert (first.release, first.duty, first.layover_rest) == (675, 375, 1215)
+    assert trip.layover_stations() == ["LAX"]
+    assert second.legs[0].departure_time == 510
+    assert trip.stations() == {"ORD", "SFO", "LAX"}
+    assert first.legs[0].departure_station is trips["1001"].base
+
+
+def test_slots():
+    trip = Trip(trip_id="1", ops=1, base="ORD", equipment="737", page=1)
+    assert not hasattr(trip, "__dict__")
+
+
+def test_parse_trip_error():
+    unit = SplitUnit("1", 1, "ORD", "737", 0, 4, "RPT 0600\n")
+    with pytest.raises(ParseError):
+        parse_trip(unit)
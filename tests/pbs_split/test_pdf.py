@@ -0,0 +1,56 @@
+"""Tests for reading bid packages directly from PDF."""
+
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+from pbs_split.parse import parse_package
+from pbs_split.split.index import build_index
+from pbs_split.split.pdf import iter_pdf_lines
+from pbs_split.split.splitter import split_file
+from pbs_split.synthetic import SyntheticConfig, generate_package, text_to_pdf
+from tests.resources import RESOURCES_ANCHOR
+
+pytest.importorskip("pdfminer")
+
+SAMPLE = "sample_bid_package.txt"
+
+
+@pytest.fixture(name="sample_pdf")
+def _sample_pdf(tmp_path: Path) -> Path:
+    text = resources.files(RESOURCES_ANCHOR).joinpath(SAMPLE).read_text()
+    path = tmp_path / "sample_bid_package.pdf"
+    path.write_bytes(text_to_pdf(text))
+    return path
+
+
+def test_parallel_extraction_matches_serial(tmp_path: Path):
+    path = tmp_path / "synthetic.pdf"
+    config = SyntheticConfig(pages=9, trips_per_page=3)
+    path.write_bytes(text_to_pdf(generate_package(config)))
+    serial = list(iter_pdf_lines(path, jobs=1, chunk_pages=100))
+    parallel = list(iter_pdf_lines(path, jobs=2, chunk_pages=2))
+    assert parallel == serial
+    offset = 0
+    for line_offset, line in parallel:
+        assert line_offset == offset
+        offset += len(line)
+    assert sum(line.count(b"\f") for _, line in serial) == config.pages
+
+
+def test_split_pdf_matches_text(sample_pdf: Path, test_output_dir: Path):
+    output_dir = test_output_dir / "test_split_pdf"
+    result = split_file(sample_pdf, output_dir)
+    assert result.stats.pages == 2
+    assert sorted(path.name for path in result.outputs) == [
+        f"{trip_id}.txt" for trip_id in ("1001", "1002", "1003", "1004")
+    ]
+    with resources.as_file(resources.files(RESOURCES_ANCHOR).joinpath(SAMPLE)) as path:
+        text_trips = list(parse_package(path).trips())
+    assert list(parse_package(sample_pdf).trips()) == text_trips
+
+
+def test_pdf_is_not_indexable(sample_pdf: Path):
+    with pytest.raises(ValueError):
+        build_index(sample_pdf)
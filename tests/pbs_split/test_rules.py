@@ -0,0 +1,124 @@
+"""Tests for the configurable boundary rules."""
+
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+from pbs_split.split.boundaries import classify_line
+from pbs_split.split.index import (
+    StaleIndexError,
+    load_index,
+    load_or_build_index,
+    read_trip,
+)
+from pbs_split.split.rules import (
+    DEFAULT_RULES,
+    BoundaryRules,
+    RuleMatcher,
+    compile_rules,
+    load_rules,
+)
+from pbs_split.split.search import update_search_index
+from pbs_split.split.splitter import split_file
+from pbs_split.synthetic import SyntheticConfig, generate_package
+from tests.resources import RESOURCES_ANCHOR
+
+PAIRING_RULES = """
+name = "pairing"
+trip_start = '^\\s*PAIRING\\s+(?P<trip_id>\\d+)\\b'
+trip_end = '^\\s*TOTAL\\b'
+"""
+
+
+def _lines() -> list[str]:
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    text = sample.read_text() + generate_package(SyntheticConfig(pages=3))
+    return [line.lstrip("\f") for line in text.splitlines(keepends=True)]
+
+
+def test_default_matcher_agrees_with_classify_line():
+    classify = compile_rules().classify
+    for line in _lines():
+        kind, groups = classify(line)
+        expected_kind, match = classify_line(line)
+        assert kind == expected_kind, line
+        if match is None:
+            assert not groups
+        else:
+            assert groups == match.groupdict()
+
+
+def test_compiled_once():
+    renamed = BoundaryRules(name="other")
+    assert renamed.config_hash() == DEFAULT_RULES.config_hash()
+    assert compile_rules(renamed) is compile_rules()
+    changed = BoundaryRules(trip_end=r"^\s*TOTAL\b")
+    assert compile_rules(changed) is compile_rules(BoundaryRules(**vars(changed)))
+    assert compile_rules(changed) is not compile_rules()
+
+
+def test_custom_rules(tmp_path: Path):
+    rules_path = tmp_path / "pairing.toml"
+    rules_path.write_text(PAIRING_RULES)
+    rules = load_rules(rules_path)
+    assert rules.name == "pairing"
+    text = generate_package(SyntheticConfig(pages=4, trips_per_page=5))
+    standard = tmp_path / "standard.txt"
+    standard.write_text(text)
+    pairing = tmp_path / "pairing.txt"
+    pairing.write_text(text.replace("SEQ ", "PAIRING ").replace("TTL ", "TOTAL "))
+    expected = split_file(standard, tmp_path / "standard")
+    result = split_file(pairing, tmp_path / "pairing", rules=rules)
+    assert [path.name for path in result.outputs] == [
+        path.name for path in expected.outputs
+    ]
+    assert split_file(pairing, tmp_path / "default").stats.units == 0
+
+
+def test_backreference():
+    rules = BoundaryRules(trip_end=r"^\s*(?P<mark>[#*])TTL(?P=mark)")
+    assert RuleMatcher(rules).classify("*TTL*")[0].name == "TRIP_END"
+    assert RuleMatcher(rules).classify("*TTL#")[0].name == "OTHER"
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        "trip_start = '^SEQ (\\d+)'",
+        "page_header = '^BASE (?P<base>\\S+)'",
+        "trip_end = '^TTL('",
+        "trip_ends = '^TTL'",
+        "trip_end = ",
+    ],
+)
+def test_invalid_rules(tmp_path: Path, config: str):
+    rules_path = tmp_path / "rules.toml"
+    rules_path.write_text(config)
+    with pytest.raises(ValueError):
+        load_rules(rules_path)
+
+
+def test_custom_rules_search_and_index(tmp_path: Path):
+    rules_path = tmp_path / "pairing.toml"
+    rules_path.write_text(PAIRING_RULES)
+    rules = load_rules(rules_path)
+    text = generate_package(SyntheticConfig(pages=4, trips_per_page=5))
+    pairing = tmp_path / "pairing.txt"
+    pairing.write_text(text.replace("SEQ ", "PAIRING ").replace("TTL ", "TOTAL "))
+    result = split_file(pairing, tmp_path / "split", rules=rules)
+    segment, rebuilt = update_search_index(pairing, tmp_path / "split", rules=rules)
+    assert rebuilt and len(segment) == result.stats.units
+    _, rebuilt = update_search_index(pairing, tmp_path / "split", rules=rules)
+    assert not rebuilt
+    # Other rules find other trips, so the segment is rebuilt.
+    segment, rebuilt = update_search_index(pairing, tmp_path / "split")
+    assert rebuilt and len(segment) == 0
+
+    index = load_or_build_index(pairing, rules=rules)
+    assert len(index.trips) == result.stats.units
+    output = result.outputs[0]
+    assert read_trip(pairing, index, output.stem, rules=rules) == output.read_text()
+    assert load_index(pairing, rules) == index
+    with pytest.raises(StaleIndexError):
+        load_index(pairing)
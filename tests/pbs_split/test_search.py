@@ -0,0 +1,130 @@
+"""Tests for the inverted search index."""
+
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from pbs_split.parse import parse_package
+from pbs_split.split.batch import split_many
+from pbs_split.split.cache import SplitCache, cached_split_file
+from pbs_split.split.rules import BoundaryRules, rules_hash
+from pbs_split.split.search import (
+    SEARCH_FILE_NAME,
+    SearchIndexingWriter,
+    SearchSegment,
+    SegmentBuilder,
+    find_segments,
+    finish_search_index,
+    parse_query,
+    search,
+    update_search_index,
+)
+from pbs_split.split.splitter import TextDirectoryWriter, split_file
+from pbs_split.synthetic import GROUPS, SyntheticConfig, write_package
+
+
+@pytest.fixture(name="package")
+def _package(tmp_path: Path) -> Path:
+    path = tmp_path / "package.txt"
+    write_package(path, SyntheticConfig(pages=8, trips_per_page=10, groups=GROUPS))
+    return path
+
+
+QUERIES = {
+    "layover=ATL": lambda t: "ATL" in t.layover_stations(),
+    "station=BOS,SEA credit>10": lambda t: bool(t.stations() & {"BOS", "SEA"})
+    and t.credit > 600,
+    "equipment=787 tafb=24..48": lambda t: t.equipment == "787"
+    and 1440 <= t.tafb <= 2880,
+    "report<=0700 or base=LAX station!=DEN": lambda t: t.report <= 420
+    or (t.base == "LAX" and "DEN" not in t.stations()),
+    "days=1,2 credit=..10.30": lambda t: t.days in (1, 2) and t.credit <= 630,
+    "days>=2 and block<8:00": lambda t: t.days >= 2 and t.block < 480,
+}
+
+
+@pytest.mark.parametrize("query", list(QUERIES))
+def test_query_matches_parsed_trips(tmp_path: Path, package: Path, query: str):
+    update_search_index(package, tmp_path / "out")
+    expected = [
+        trip.trip_id for trip in parse_package(package).trips() if QUERIES[query](trip)
+    ]
+    found = [
+        segment.trips[number]
+        for segment, number in search(find_segments([tmp_path / "out"]), query)
+    ]
+    assert found == expected
+    assert found, "The query should match something."
+
+
+def test_incremental(tmp_path: Path, package: Path):
+    other = tmp_path / "other.txt"
+    write_package(other, SyntheticConfig(pages=2, seed=1))
+    assert update_search_index(package, tmp_path / "out" / "package")[1]
+    assert update_search_index(other, tmp_path / "out" / "other")[1]
+    assert not update_search_index(package, tmp_path / "out" / "package")[1]
+    segments = find_segments([tmp_path / "out"])
+    assert segments == [
+        tmp_path / "out" / "other" / SEARCH_FILE_NAME,
+        tmp_path / "out" / "package" / SEARCH_FILE_NAME,
+    ]
+    mtime = segments[0].stat().st_mtime_ns
+    write_package(package, SyntheticConfig(pages=3, seed=2))
+    segment, rebuilt = update_search_index(package, tmp_path / "out" / "package")
+    assert rebuilt and len(segment) == 3 * 20
+    assert segments[0].stat().st_mtime_ns == mtime
+    assert len(list(search(segments, "ops>0"))) == 2 * 20 + 3 * 20
+
+
+@pytest.mark.parametrize(
+    "query", ["nope=1", "credit>ten", "layover>NRT", "credit>1,2", "", "days=1 or"]
+)
+def test_invalid_query(query: str):
+    with pytest.raises(ValueError):
+        parse_query(query)
+
+
+def test_indexed_while_split(tmp_path: Path, package: Path):
+    builder = SegmentBuilder()
+    writer = SearchIndexingWriter(TextDirectoryWriter(tmp_path / "split"), builder)
+    split_file(package, tmp_path / "split", writer=writer)
+    segment = finish_search_index(package, tmp_path / "split", builder)
+    expected, _ = update_search_index(package, tmp_path / "out")
+    assert asdict(segment) == asdict(expected)
+    assert not update_search_index(package, tmp_path / "split")[1]
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_split_many_search(tmp_path: Path, package: Path, cached: bool):
+    other = tmp_path / "other.txt"
+    write_package(other, SyntheticConfig(pages=2, seed=1))
+    cache = SplitCache(tmp_path / "cache.json") if cached else None
+    for rebuilt in (True, not cached):
+        items = split_many(
+            [package, other], tmp_path / "out", jobs=2, cache=cache, search=True
+        )
+        # A cache hit keeps the segment, which is up to date.
+        assert [item.search_rebuilt for item in items] == [rebuilt, rebuilt]
+    segments = find_segments([tmp_path / "out"])
+    assert len(list(search(segments, "ops>0"))) == 8 * 10 + 2 * 20
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_cached_split_search_rules(tmp_path: Path, package: Path, jobs: int):
+    pairing = tmp_path / "pairing.txt"
+    pairing.write_text(package.read_text().replace("SEQ ", "PAIRING "))
+    rules = BoundaryRules(trip_start=r"^\s*PAIRING\s+(?P<trip_id>\d+)")
+    cache = SplitCache(tmp_path / "cache.json")
+    cached = cached_split_file(
+        pairing, tmp_path / "out", cache, jobs=jobs, rules=rules, search=True
+    )
+    assert cached.search_rebuilt
+    cache.add(cached.new_entry)
+    segment = SearchSegment.load(tmp_path / "out" / SEARCH_FILE_NAME)
+    assert len(segment) == cached.result.stats.units == 8 * 10
+    assert segment.rules_hash == rules_hash(rules)
+    cached = cached_split_file(
+        pairing, tmp_path / "out", cache, jobs=jobs, rules=rules, search=True
+    )
+    assert cached.result.cached and cached.search_rebuilt is False
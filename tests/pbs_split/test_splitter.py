@@ -0,0 +1,58 @@
+"""Tests for the streaming splitter."""
+
+from importlib import resources
+from io import BytesIO
+from pathlib import Path
+
+from pbs_split.split.splitter import (
+    SplitStats,
+    iter_raw_lines,
+    iter_split_units,
+    split_file,
+)
+from tests.resources import RESOURCES_ANCHOR
+
+SAMPLE = "sample_bid_package.txt"
+
+
+def test_iter_split_units():
+    data = resources.files(RESOURCES_ANCHOR).joinpath(SAMPLE).read_bytes()
+    stats = SplitStats()
+    units = list(iter_split_units(iter_raw_lines(BytesIO(data)), stats=stats))
+    assert [unit.trip_id for unit in units] == ["1001", "1002", "1003", "1004"]
+    assert stats.pages == 2
+    assert stats.units == 4
+    assert stats.bytes_read == len(data)
+    spanning = units[2]
+    assert spanning.page == 1
+    assert "PAGE 2" not in spanning.text
+    assert spanning.text.startswith("SEQ 1003")
+    assert spanning.text.rstrip().endswith("TAFB 34.00")
+    assert units[3].page == 2
+    assert units[3].base == "ORD"
+    assert units[3].equipment == "737"
+    for unit in units:
+        raw = data[unit.offset : unit.offset + unit.length]
+        assert raw.startswith(f"SEQ {unit.trip_id}".encode())
+        assert raw.endswith(unit.text.splitlines(keepends=True)[-1].encode())
+
+
+def test_unclosed_trip():
+    data = b"SEQ 1 1 OPS\nRPT 0600\nSEQ 2 1 OPS\nTTL BLK 1.00\n"
+    units = list(iter_split_units(iter_raw_lines(BytesIO(data))))
+    assert [unit.trip_id for unit in units] == ["1", "2"]
+    assert units[0].text == "SEQ 1 1 OPS\nRPT 0600\n"
+
+
+def test_split_file(test_output_dir: Path):
+    output_dir = test_output_dir / "test_split_file"
+    with resources.as_file(resources.files(RESOURCES_ANCHOR).joinpath(SAMPLE)) as path:
+        result = split_file(input_path=path, output_dir=output_dir)
+    assert result.stats.units == 4
+    assert sorted(file.name for file in output_dir.iterdir()) == [
+        "1001.txt",
+        "1002.txt",
+        "1003.txt",
+        "1004.txt",
+    ]
+    assert (output_dir / "1002.txt").read_text().startswith("SEQ 1002")
@@ -0,0 +1,83 @@
+"""Tests for the vectorized trip statistics."""
+
+from importlib import resources
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+# pylint: disable=wrong-import-position
+from pbs_split.split.columnar import COLUMNAR_FILE_NAME, ColumnarWriter
+from pbs_split.split.rules import BoundaryRules
+from pbs_split.split.splitter import split_file
+from pbs_split.stats import (
+    arrays_from_columnar,
+    arrays_from_package,
+    concat_arrays,
+    format_minutes,
+    load_arrays,
+    summarize,
+)
+from tests.resources import RESOURCES_ANCHOR
+
+
+@pytest.fixture(name="sample_path")
+def sample_path_():
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        yield path
+
+
+def test_summarize(sample_path: Path):
+    (summary,) = summarize(arrays_from_package(sample_path))
+    assert (summary.base, summary.equipment, summary.trips) == ("ORD", "737", 4)
+    assert summary.credit_total == 600 + 300 + 645 + 600
+    assert (summary.credit_min, summary.credit_max) == (300, 645)
+    assert summary.block_total == 390 + 165 + 585 + 360
+    assert summary.days == {1: 1, 2: 3}
+    assert sorted(summary.layovers) == [("BOS", 1), ("LAX", 1), ("MIA", 1)]
+
+
+def test_columnar_matches_package(sample_path: Path, test_output_dir: Path):
+    output_dir = test_output_dir / "test_columnar_matches_package"
+    split_file(sample_path, output_dir, writer=ColumnarWriter(output_dir))
+    from_columnar = summarize(arrays_from_columnar(output_dir / COLUMNAR_FILE_NAME))
+    assert from_columnar == summarize(arrays_from_package(sample_path))
+
+
+def test_concat_arrays(sample_path: Path, test_output_dir: Path):
+    other_path = test_output_dir / "test_concat_arrays.txt"
+    other_path.write_text(
+        sample_path.read_text().replace("ORD  EQP 737", "LAX  EQP 320")
+    )
+    arrays = concat_arrays(
+        [arrays_from_package(sample_path), arrays_from_package(other_path)]
+    )
+    summaries = summarize(arrays)
+    assert [(item.base, item.equipment) for item in summaries] == [
+        ("ORD", "737"),
+        ("LAX", "320"),
+    ]
+    assert summaries[0].credit_total == summaries[1].credit_total
+
+
+def test_format_minutes():
+    assert format_minutes(645) == "10.45"
+    assert format_minutes(5.4) == "0.05"
+
+
+def test_rules(sample_path: Path, test_output_dir: Path):
+    path = test_output_dir / "test_rules.txt"
+    path.write_text(
+        sample_path.read_text().replace("BASE ORD  EQP", "DOMICILE ORD  FLEET")
+    )
+    rules = BoundaryRules(
+        page_header=r"^\s*DOMICILE\s+(?P<base>[A-Z]{3})\s+FLEET\s+(?P<equipment>\S+)"
+        r".*?\bPAGE\s+(?P<page>\d+)\s*$"
+    )
+    assert summarize(load_arrays(path, rules)) == summarize(
+        arrays_from_package(sample_path)
+    )
+    assert [item.base for item in summarize(load_arrays(path))] != ["ORD"]
@@ -0,0 +1,51 @@
+"""Tests for the synthetic bid-package generator."""
+
+from io import BytesIO
+from pathlib import Path
+
+from pbs_split.parse import parse_trip
+from pbs_split.split.splitter import SplitStats, iter_raw_lines, iter_split_units
+from pbs_split.synthetic import (
+    GROUPS,
+    SyntheticConfig,
+    config_for_size,
+    generate_package,
+    write_package,
+)
+
+
+def test_generate_package_splits_and_parses():
+    config = SyntheticConfig(
+        pages=6, trips_per_page=3, legs_per_trip=5, groups=GROUPS[:2]
+    )
+    text = generate_package(config)
+    assert text == generate_package(config)
+    stats = SplitStats()
+    units = list(iter_split_units(iter_raw_lines(BytesIO(text.encode())), stats=stats))
+    assert stats.pages == config.pages
+    assert len(units) == config.trips
+    assert len({unit.trip_id for unit in units}) == config.trips
+    assert {(unit.base, unit.equipment) for unit in units} == set(GROUPS[:2])
+    for unit in units:
+        trip = parse_trip(unit)
+        assert sum(len(duty.legs) for duty in trip.duty_periods) == 5
+        assert len(trip.duty_periods) == 3
+        assert trip.block == sum(duty.block for duty in trip.duty_periods)
+        assert trip.credit == sum(duty.credit for duty in trip.duty_periods)
+        assert trip.duty_periods[-1].legs[-1].arrival_station == trip.base
+    # Trips continued onto the next page, within a group, keep their first page.
+    assert [unit.page for unit in units[:3]] == [1, 1, 1]
+
+
+def test_seed_changes_output():
+    assert generate_package(SyntheticConfig(seed=1)) != generate_package(
+        SyntheticConfig(seed=2)
+    )
+
+
+def test_config_for_size(test_output_dir: Path):
+    target = 256 * 1024
+    path = test_output_dir / "synthetic_256k.txt"
+    written = write_package(path, config_for_size(target))
+    assert written == path.stat().st_size
+    assert 0.9 * target < written < 1.1 * target
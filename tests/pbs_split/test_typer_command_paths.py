@@ -1,8 +1,16 @@
 """Test cases for the cli app default path."""
 
+import gzip
+import json
+from importlib import resources
+from pathlib import Path
+
+import pytest
 from typer.testing import CliRunner
 
 from pbs_split.cli.main_typer import app
+from pbs_split.synthetic import text_to_pdf
+from tests.resources import RESOURCES_ANCHOR
 
 
 def test_app(runner: CliRunner) -> None:
@@ -23,3 +31,399 @@ def test_default_options(runner: CliRunner) -> None:
     if result.stderr_bytes is not None:
         print(result.stderr)
     assert result.exit_code == 0
+
+
+def test_split(runner: CliRunner, test_output_dir: Path) -> None:
+    output_dir = test_output_dir / "test_split_cli"
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        result = runner.invoke(app, ["split", str(path), str(output_dir)])
+    print(result.stdout)
+    assert result.exit_code == 0
+    assert "Split 4 trips from 2 pages" in result.stdout
+    assert "MB/s" in result.stdout
+    assert len(list(output_dir.glob("*.txt"))) == 4
+
+
+def test_split_many(runner: CliRunner, test_output_dir: Path) -> None:
+    input_dir = test_output_dir / "test_split_many_input"
+    input_dir.mkdir()
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    for name in ("ORD_737", "LAX_320", "DFW_787"):
+        (input_dir / f"{name}.txt").write_bytes(sample.read_bytes())
+    (input_dir / "bad.txt").mkdir()
+    output_dir = test_output_dir / "test_split_many_output"
+    result = runner.invoke(
+        app, ["-vv", "split-many", str(input_dir), str(output_dir), "--jobs", "2"]
+    )
+    print(result.stdout)
+    assert result.exit_code == 0
+    assert "Split 3 of 3 files" in result.stdout
+    lines = [line for line in result.stdout.splitlines() if line.startswith("Split 4")]
+    assert [Path(line.split()[-1]).name for line in lines] == [
+        "DFW_787",
+        "LAX_320",
+        "ORD_737",
+    ]
+    assert len(list((output_dir / "LAX_320").iterdir())) == 4
+
+
+def test_split_cache(runner: CliRunner, test_output_dir: Path) -> None:
+    output_dir = test_output_dir / "test_split_cache_cli"
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        first = runner.invoke(app, ["split", str(path), str(output_dir)])
+        second = runner.invoke(app, ["split", str(path), str(output_dir)])
+        no_cache = runner.invoke(
+            app, ["split", str(path), str(output_dir), "--no-cache"]
+        )
+    assert "Cache: 0 hits, 1 misses" in first.stdout
+    assert "Cache: 1 hits, 0 misses" in second.stdout
+    assert "Cache:" not in no_cache.stdout
+
+
+def test_split_columnar(runner: CliRunner, test_output_dir: Path) -> None:
+    output_dir = test_output_dir / "test_split_columnar_cli"
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        result = runner.invoke(
+            app, ["split", str(path), str(output_dir), "--format", "columnar"]
+        )
+    assert result.exit_code == 0
+    assert (output_dir / "trips.pbsc").is_file()
+
+
+def test_show(runner: CliRunner, test_output_dir: Path) -> None:
+    work_dir = test_output_dir / "test_show_cli"
+    work_dir.mkdir()
+    input_path = work_dir / "input.txt"
+    input_path.write_bytes(
+        resources.files(RESOURCES_ANCHOR)
+        .joinpath("sample_bid_package.txt")
+        .read_bytes()
+    )
+    result = runner.invoke(
+        app, ["split", str(input_path), str(work_dir / "out"), "--index"]
+    )
+    assert result.exit_code == 0
+    assert (work_dir / "input.txt.pbs-index.json").is_file()
+    result = runner.invoke(app, ["show", str(input_path), "1003"])
+    assert result.exit_code == 0
+    assert "SEQ 1003" in result.stdout
+    assert "PAGE 2" not in result.stdout
+    result = runner.invoke(app, ["show", str(input_path), "9999"])
+    assert result.exit_code == 1
+    packed = test_output_dir / "test_show.txt.gz"
+    packed.write_bytes(gzip.compress(input_path.read_bytes()))
+    result = runner.invoke(app, ["show", str(packed), "1001"])
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert "test_show.txt.gz" in result.stderr
+
+
+def test_stats(runner: CliRunner) -> None:
+    pytest.importorskip("numpy")
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        result = runner.invoke(app, ["stats", str(path)])
+    print(result.stdout)
+    assert result.exit_code == 0
+    assert "ORD 737: 4 trips, credit 35.45 total" in result.stdout
+    assert "days: 1=1 2=3" in result.stdout
+
+
+def test_stats_text_split(runner: CliRunner, test_output_dir: Path) -> None:
+    pytest.importorskip("numpy")
+    output_dir = test_output_dir / "test_stats_text_split"
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        runner.invoke(app, ["split", "--no-cache", str(path), str(output_dir)])
+    result = runner.invoke(app, ["stats", str(output_dir)])
+    assert result.exit_code == 1
+    assert "--format columnar" in result.stderr
+
+
+def test_debug_and_profile(runner: CliRunner, test_output_dir: Path) -> None:
+    output_dir = test_output_dir / "test_split_debug"
+    profile_path = test_output_dir / "split.prof"
+    with resources.as_file(
+        resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    ) as path:
+        result = runner.invoke(
+            app,
+            [
+                "--debug",
+                "--profile",
+                str(profile_path),
+                "split",
+                "--no-cache",
+                str(path),
+                str(output_dir),
+            ],
+        )
+    print(result.output)
+    assert result.exit_code == 0
+    assert "Stage" in result.output
+    assert "boundary" in result.output
+    assert profile_path.stat().st_size > 0
+
+
+def test_metrics_file(runner: CliRunner, test_output_dir: Path) -> None:
+    input_dir = test_output_dir / "test_metrics_file_input"
+    input_dir.mkdir()
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    for name in ("one", "two"):
+        (input_dir / f"{name}.txt").write_bytes(sample.read_bytes())
+    metrics_path = test_output_dir / "metrics.jsonl"
+    result = runner.invoke(
+        app,
+        [
+            "-vv",
+            "--metrics-file",
+            str(metrics_path),
+            "split-many",
+            str(input_dir),
+            str(test_output_dir / "test_metrics_file_output"),
+            "--jobs",
+            "2",
+        ],
+    )
+    print(result.output)
+    assert result.exit_code == 0
+    # Metrics records are kept out of the log.
+    assert "pbs_split.metrics" not in result.stderr
+    records = [json.loads(line) for line in metrics_path.read_text().splitlines()]
+    assert sorted(Path(r["metrics"]["input_path"]).name for r in records) == [
+        "one.txt",
+        "two.txt",
+    ]
+    assert all(record["metrics"]["trips"] == 4 for record in records)
+
+
+def test_split_pdf(runner: CliRunner, test_output_dir: Path) -> None:
+    pytest.importorskip("pdfminer")
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    pdf_path = test_output_dir / "test_split_pdf_cli.pdf"
+    pdf_path.write_bytes(text_to_pdf(sample.read_text()))
+    output_dir = test_output_dir / "test_split_pdf_cli"
+    result = runner.invoke(app, ["split", str(pdf_path), str(output_dir)])
+    print(result.output)
+    assert result.exit_code == 0
+    assert "Split 4 trips from 2 pages" in result.stdout
+    result = runner.invoke(app, ["split", "--index", str(pdf_path), str(output_dir)])
+    assert result.exit_code == 1
+
+
+def test_split_compressed(runner: CliRunner, test_output_dir: Path) -> None:
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    input_path = test_output_dir / "test_split_compressed.txt.gz"
+    input_path.write_bytes(gzip.compress(sample.read_bytes()))
+    output_dir = test_output_dir / "test_split_compressed"
+    result = runner.invoke(
+        app,
+        ["split", "--no-cache", "--format", "tar.gz", str(input_path), str(output_dir)],
+    )
+    print(result.output)
+    assert result.exit_code == 0
+    assert "Split 4 trips from 2 pages" in result.stdout
+    assert (output_dir / "trips.tar.gz").is_file()
+    result = runner.invoke(app, ["split", "--index", str(input_path), str(output_dir)])
+    assert result.exit_code == 1
+
+
+def test_export(runner: CliRunner, test_output_dir: Path) -> None:
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    input_path = test_output_dir / "test_export.txt"
+    input_path.write_bytes(sample.read_bytes())
+    output_dir = test_output_dir / "test_export"
+    result = runner.invoke(
+        app,
+        ["split", "--no-cache", "--format", "sqlite", str(input_path), str(output_dir)],
+    )
+    assert result.exit_code == 0
+    export_dir = test_output_dir / "test_export_files"
+    result = runner.invoke(app, ["export", str(output_dir), str(export_dir), "1003"])
+    print(result.output)
+    assert result.exit_code == 0
+    assert "Exported 1 trips" in result.stdout
+    assert (export_dir / "1003.txt").read_text().startswith("SEQ 1003")
+    result = runner.invoke(app, ["export", str(output_dir), str(export_dir)])
+    assert "Exported 4 trips" in result.stdout
+    result = runner.invoke(app, ["export", str(output_dir), str(export_dir), "9999"])
+    assert result.exit_code == 1
+
+
+def test_diff(runner: CliRunner, test_output_dir: Path) -> None:
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    old_path = test_output_dir / "test_diff_old.txt"
+    old_path.write_bytes(sample.read_bytes())
+    new_path = test_output_dir / "test_diff_new.txt"
+    new_path.write_text(sample.read_text().replace("SEQ 1003", "SEQ 1009"))
+    result = runner.invoke(app, ["diff", "--lines", str(old_path), str(new_path)])
+    print(result.output)
+    assert result.exit_code == 0
+    assert "- 1003\n+ 1009\n" in result.stdout
+    assert "1 added, 1 removed, 0 changed, 3 unchanged." in result.stdout
+
+
+def test_diff_rules(runner: CliRunner, test_output_dir: Path) -> None:
+    text = (
+        resources.files(RESOURCES_ANCHOR)
+        .joinpath("sample_bid_package.txt")
+        .read_text()
+        .replace("SEQ ", "PAIRING ")
+    )
+    old_path = test_output_dir / "test_diff_rules_old.txt"
+    old_path.write_text(text)
+    new_path = test_output_dir / "test_diff_rules_new.txt"
+    new_path.write_text(text.replace("PAIRING 1003", "PAIRING 1009"))
+    rules_path = test_output_dir / "test_diff_rules.toml"
+    rules_path.write_text("trip_start = '^\\s*PAIRING\\s+(?P<trip_id>\\d+)'\n")
+    args = ["diff", "--rules", str(rules_path), str(old_path), str(new_path)]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    assert "1 added, 1 removed, 0 changed, 3 unchanged." in result.stdout
+
+
+def test_query(runner: CliRunner, test_output_dir: Path) -> None:
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    input_dir = test_output_dir / "test_query_input"
+    input_dir.mkdir()
+    (input_dir / "package.txt").write_bytes(sample.read_bytes())
+    output_dir = test_output_dir / "test_query"
+    args = ["split-many", "--search", "-j", "1", str(input_dir), str(output_dir)]
+    result = runner.invoke(app, args)
+    print(result.output)
+    assert result.exit_code == 0
+    assert "Search index: 1 rebuilt, 0 up to date" in result.stdout
+    result = runner.invoke(app, args)
+    assert "Search index: 0 rebuilt, 1 up to date" in result.stdout
+    result = runner.invoke(app, ["query", "ops>0", str(output_dir)])
+    print(result.output)
+    assert result.exit_code == 0
+    assert "4 trips." in result.stdout
+    assert "package.txt  1003" in result.stdout
+    result = runner.invoke(app, ["query", "--count", "nope=1", str(output_dir)])
+    assert result.exit_code == 1
+
+
+def test_split_rules(runner: CliRunner, test_output_dir: Path) -> None:
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    input_path = test_output_dir / "test_split_rules.txt"
+    input_path.write_text(sample.read_text().replace("SEQ ", "PAIRING "))
+    rules_path = test_output_dir / "test_split_rules.toml"
+    rules_path.write_text("trip_start = '^\\s*PAIRING\\s+(?P<trip_id>\\d+)'\n")
+    output_dir = test_output_dir / "test_split_rules"
+    args = ["split", "--rules", str(rules_path), str(input_path), str(output_dir)]
+    result = runner.invoke(app, args)
+    print(result.output)
+    assert result.exit_code == 0
+    assert "Split 4 trips from 2 pages" in result.stdout
+    rules_path.write_text("trip_start = '^\\s*PAIRING'\n")
+    result = runner.invoke(app, args)
+    assert result.exit_code == 1
+
+
+def test_show_rules(runner: CliRunner, test_output_dir: Path) -> None:
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    input_path = test_output_dir / "test_show_rules.txt"
+    input_path.write_text(sample.read_text().replace("SEQ ", "PAIRING "))
+    rules_path = test_output_dir / "test_show_rules.toml"
+    rules_path.write_text("trip_start = '^\\s*PAIRING\\s+(?P<trip_id>\\d+)'\n")
+    result = runner.invoke(app, ["show", str(input_path), "1003"])
+    assert result.exit_code == 1
+    args = ["show", "--rules", str(rules_path), str(input_path), "1003"]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0
+    assert "PAIRING 1003" in result.stdout
+
+
+def test_split_jobs_rejected(runner: CliRunner, test_output_dir: Path) -> None:
+    input_path = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    output_dir = test_output_dir / "test_split_jobs_rejected"
+    for option in ["--index", "--checkpoint"]:
+        args = ["split", "--jobs", "2", option, str(input_path), str(output_dir)]
+        result = runner.invoke(app, args)
+        assert result.exit_code == 2
+        assert "--jobs" in result.stderr
+    assert not output_dir.exists()
+
+
+def test_split_resume(runner: CliRunner, test_output_dir: Path) -> None:
+    input_path = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    output_dir = test_output_dir / "test_split_resume"
+    result = runner.invoke(app, ["split", "--resume", str(input_path), str(output_dir)])
+    print(result.output)
+    assert result.exit_code == 0
+    assert "Split 4 trips from 2 pages" in result.stdout
+    assert not (output_dir / ".pbs-split-checkpoint.json").exists()
+    result = runner.invoke(
+        app,
+        [
+            "split",
+            "--checkpoint",
+            "--format",
+            "sqlite",
+            str(input_path),
+            str(output_dir),
+        ],
+    )
+    assert result.exit_code == 1
+
+
+def test_split_jobs(runner: CliRunner, test_output_dir: Path) -> None:
+    input_path = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    output_dir = test_output_dir / "test_split_jobs"
+    result = runner.invoke(
+        app, ["split", "--no-cache", "-j", "2", str(input_path), str(output_dir)]
+    )
+    print(result.output)
+    assert result.exit_code == 0
+    assert "Split 4 trips from 2 pages" in result.stdout
+
+
+def test_split_atomic(runner: CliRunner, test_output_dir: Path) -> None:
+    input_path = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    output_dir = test_output_dir / "test_split_atomic"
+    args = ["split", "--fsync", "batch", "--write-thread", "--manifest"]
+    result = runner.invoke(app, [*args, str(input_path), str(output_dir)])
+    print(result.output)
+    assert result.exit_code == 0
+    assert "Split 4 trips from 2 pages" in result.stdout
+    assert len((output_dir / "trips.sha256").read_text().splitlines()) == 4
+    result = runner.invoke(
+        app, [*args, "--checkpoint", str(input_path), str(output_dir)]
+    )
+    assert result.exit_code == 1
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_split_many_worker_logging(
+    runner: CliRunner, test_output_dir: Path, jobs: str
+) -> None:
+    input_dir = test_output_dir / f"test_split_many_worker_logging_{jobs}"
+    input_dir.mkdir()
+    sample = resources.files(RESOURCES_ANCHOR).joinpath("sample_bid_package.txt")
+    for name in ("ORD_737", "LAX_320", "DFW_787"):
+        (input_dir / f"{name}.txt").write_bytes(sample.read_bytes())
+    result = runner.invoke(
+        app,
+        [
+            "-vvv",
+            "--log-queue-policy",
+            "block",
+            "split-many",
+            str(input_dir),
+            str(input_dir / "out"),
+            "--jobs",
+            jobs,
+        ],
+    )
+    assert result.exit_code == 0
+    # Records logged in the workers reach the parent's handlers.
+    assert result.stderr.count("Split trip") == 12
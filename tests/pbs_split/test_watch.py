@@ -0,0 +1,148 @@
+"""Tests for the watch-folder service."""
+
+import threading
+from importlib import resources
+from pathlib import Path
+from time import monotonic, sleep
+
+import pytest
+
+from pbs_split.split.batch import BatchItem
+from pbs_split.split.cache import CACHE_FILE_NAME, SplitCache
+from pbs_split.split.rules import BoundaryRules
+from pbs_split.split.watch import (
+    Debouncer,
+    InotifyWatcher,
+    PollingWatcher,
+    WatchService,
+)
+from tests.resources import RESOURCES_ANCHOR
+
+SAMPLE = "sample_bid_package.txt"
+
+
+def _sample() -> bytes:
+    return resources.files(RESOURCES_ANCHOR).joinpath(SAMPLE).read_bytes()
+
+
+def _wait_for(condition, timeout: float = 10.0):
+    deadline = monotonic() + timeout
+    while not condition():
+        assert monotonic() < deadline, "timed out"
+        sleep(0.02)
+
+
+def test_debouncer_waits_for_quiet(tmp_path: Path):
+    now = [0.0]
+    debouncer = Debouncer(quiet_s=1.0, clock=lambda: now[0])
+    path = tmp_path / "package.txt"
+    path.write_bytes(b"partial")
+    debouncer.touch(path)
+    now[0] = 0.5
+    assert not debouncer.ready()
+    with open(path, "ab") as file_handle:
+        file_handle.write(b" more")
+    now[0] = 1.2
+    assert not debouncer.ready()
+    now[0] = 2.3
+    assert debouncer.ready() == [path]
+    assert len(debouncer) == 0
+    debouncer.touch(tmp_path / "missing.txt")
+    assert len(debouncer) == 0
+
+
+def test_polling_watcher(tmp_path: Path):
+    (tmp_path / "one.txt").write_bytes(b"1")
+    (tmp_path / "skip.pdf").write_bytes(b"1")
+    watcher = PollingWatcher(tmp_path)
+    assert watcher.changes(0) == {tmp_path / "one.txt"}
+    assert watcher.changes(0) == set()
+    (tmp_path / "two.txt").write_bytes(b"2")
+    (tmp_path / "one.txt").write_bytes(b"11")
+    assert watcher.changes(0) == {tmp_path / "one.txt", tmp_path / "two.txt"}
+
+
+def test_inotify_watcher(tmp_path: Path):
+    pytest.importorskip("inotify_simple")
+    (tmp_path / "one.txt").write_bytes(b"1")
+    watcher = InotifyWatcher(tmp_path)
+    try:
+        assert watcher.changes(0) == {tmp_path / "one.txt"}
+        (tmp_path / "two.txt").write_bytes(b"2")
+        assert watcher.changes(1.0) == {tmp_path / "two.txt"}
+    finally:
+        watcher.close()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("polling", [True, False])
+def test_watch_service(tmp_path: Path, jobs: int, polling: bool):
+    if not polling:
+        pytest.importorskip("inotify_simple")
+    watch_dir = tmp_path / "incoming"
+    watch_dir.mkdir()
+    output_dir = tmp_path / "split"
+    (watch_dir / "ORD_737.txt").write_bytes(_sample())
+    items: list[BatchItem] = []
+    service = WatchService(
+        watch_dir,
+        output_dir,
+        jobs=jobs,
+        quiet_s=0.1,
+        poll_interval_s=0.05,
+        polling=polling,
+        cache=SplitCache(output_dir / CACHE_FILE_NAME),
+        on_item=items.append,
+    )
+    stop = threading.Event()
+    thread = threading.Thread(target=service.run, kwargs={"stop": stop})
+    thread.start()
+    try:
+        _wait_for(lambda: service.processed == 1)
+        # A copy of a file that was already split is skipped.
+        (watch_dir / "copy.txt").write_bytes(_sample())
+        _wait_for(lambda: service.skipped == 1)
+        # A file written in parts is split once, after it is complete.
+        data = _sample().replace(b"SEQ 1001", b"SEQ 9001")
+        with open(watch_dir / "LAX_320.txt", "wb") as file_handle:
+            file_handle.write(data[:100])
+            file_handle.flush()
+            sleep(0.05)
+            file_handle.write(data[100:])
+        _wait_for(lambda: service.processed == 2)
+    finally:
+        stop.set()
+        thread.join()
+    assert [item.input_path.name for item in items] == ["ORD_737.txt", "LAX_320.txt"]
+    assert all(item.ok and item.result.stats.units == 4 for item in items)
+    assert (output_dir / "LAX_320" / "9001.txt").is_file()
+    assert not (output_dir / "copy").exists()
+    assert len(SplitCache(output_dir / CACHE_FILE_NAME).entries) == 2
+
+
+def test_watch_service_rules(tmp_path: Path):
+    watch_dir = tmp_path / "incoming"
+    watch_dir.mkdir()
+    output_dir = tmp_path / "split"
+    (watch_dir / "ORD_737.txt").write_bytes(_sample().replace(b"SEQ ", b"PAIRING "))
+    items: list[BatchItem] = []
+    service = WatchService(
+        watch_dir,
+        output_dir,
+        jobs=1,
+        quiet_s=0.1,
+        poll_interval_s=0.05,
+        polling=True,
+        rules=BoundaryRules(trip_start=r"^\s*PAIRING\s+(?P<trip_id>\d+)"),
+        on_item=items.append,
+    )
+    stop = threading.Event()
+    thread = threading.Thread(target=service.run, kwargs={"stop": stop})
+    thread.start()
+    try:
+        _wait_for(lambda: service.processed == 1)
+    finally:
+        stop.set()
+        thread.join()
+    assert items[0].ok and items[0].result.stats.units == 4
+    assert (output_dir / "ORD_737" / "1001.txt").is_file()